@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Расчет файла со сборками без интерфейса.
+
+Пример:
+    python batch_eval.py builds.jsonl -o results.csv --workers 8 --no-trace
+
+Формат входа и выхода определяется по расширению (.csv или .jsonl), "-"
+означает стандартный ввод или вывод. Описание формата сборок - в
+models/build_io.py.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Добавляем текущую директорию в путь импорта
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from models.build_io import DEFAULT_CHUNK_SIZE, FORMATS, detect_format, evaluate_stream
+
+
+def parse_args(argv=None):
+    """Разбор аргументов командной строки."""
+    parser = argparse.ArgumentParser(description="Расчет урона для сборок из файла JSONL или CSV")
+    parser.add_argument("input", help="входной файл со сборками (- для стандартного ввода)")
+    parser.add_argument("-o", "--output", default="-", help="файл результатов (- для стандартного вывода)")
+    parser.add_argument("--input-format", choices=FORMATS, help="формат входа (по умолчанию по расширению)")
+    parser.add_argument("--output-format", choices=FORMATS, help="формат выхода (по умолчанию по расширению)")
+    parser.add_argument("--trace", action=argparse.BooleanOptionalAction, default=False,
+                        help="добавлять в результаты текст расчета (calculation_steps)")
+    parser.add_argument("--workers", type=int, default=1, help="число процессов (0 - по числу ядер)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="строк в одном куске")
+    return parser.parse_args(argv)
+
+
+def _open(path, mode):
+    """Открывает файл или возвращает стандартный поток для "-"."""
+    if path == "-":
+        return sys.stdin if mode == "r" else sys.stdout
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def main(argv=None):
+    """Точка входа пакетного расчета."""
+    args = parse_args(argv)
+    input_format = args.input_format or detect_format(args.input)
+    output_format = args.output_format or detect_format(args.output)
+
+    source = _open(args.input, "r")
+    target = _open(args.output, "w")
+    start = time.perf_counter()
+    try:
+        done, failed = evaluate_stream(source, target, input_format, output_format, trace=args.trace,
+                                       workers=args.workers or None, chunk_size=args.chunk_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Рассчитано сборок: {done}, с ошибками: {failed} ({elapsed:.1f} с)", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+"""
+Пакет benchmarks содержит замеры производительности модели и интерфейса.
+
+Запуск: python -m benchmarks.run (см. benchmarks/run.py).
+"""
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Замеряемые сценарии.
+
+Каждый сценарий - функция подготовки, которая получает набор сборок и
+возвращает пару (функция прогона, число операций в прогоне). Время одной
+операции - время прогона, деленное на число операций. Сценарии группы "ui"
+получают еще и окно приложения и требуют дисплея.
+"""
+
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from models.build import Build
+from models.damage_calculator import DamageCalculatorModel
+from models.jade import calculate_jade_bonuses
+from models.trace import CalculationTrace
+
+
+class Case(NamedTuple):
+    """Описание сценария замера."""
+    name: str
+    group: str
+    setup: Callable[..., Tuple[Callable[[], None], int]]
+    repeat: int = 5
+
+
+def _models(builds: List[Build]) -> List[DamageCalculatorModel]:
+    """Создает модель для каждой сборки."""
+    return [DamageCalculatorModel.from_build(build) for build in builds]
+
+
+def _full_calculation(trace: bool):
+    """Полный расчет: все узлы графа помечаются устаревшими перед каждым вызовом."""
+    def setup(builds):
+        models = _models(builds)
+
+        def run():
+            for model in models:
+                model.invalidate()
+                model.calculate(trace=trace)
+        return run, len(models)
+    return setup
+
+
+def _incremental_calculation(builds):
+    """Переключение одного таланта и расчет без трассы, как при работе с интерфейсом."""
+    models = _models(builds)
+
+    def run():
+        for model in models:
+            model.tessa_f = not model.tessa_f
+            model.calculate(trace=False)
+    return run, len(models)
+
+
+def _specialized_evaluator(builds):
+    """Перебор сознания специализированным вычислителем при неизменных переключателях."""
+    evaluators = []
+    for model in _models(builds):
+        bonuses = model.jade_bonuses
+        evaluators.append((model.specialize(), model.consciousness, bonuses.get("Атака", 0.0),
+                           bonuses.get("Лед. взрыв", 0.0), bonuses.get("Атака по боссу", 0.0),
+                           bonuses.get("Атака по монстрам", 0.0)))
+
+    def run():
+        for evaluate, consciousness, attack, ice_blast, boss, monster in evaluators:
+            evaluate(consciousness + 1, attack, ice_blast, boss, monster)
+    return run, len(evaluators)
+
+
+def _reroll_simulation(builds):
+    """Моделирование переброса двух ячеек первой сборки (время одного испытания)."""
+    from models.reroll import simulate_reroll
+
+    model = _models(builds[:1])[0]
+    trials = 200_000
+
+    def run():
+        simulate_reroll(model, [(0, 0), (1, 1)], trials=trials, seed=0)
+    return run, trials
+
+
+def _fight_simulation(builds):
+    """Пакетное моделирование боев всех сборок (время одного боя)."""
+    from models.batch import columns_from_builds
+    from models.fight import FightSpec, simulate_fights
+
+    columns = columns_from_builds(builds)
+    spec = FightSpec()
+
+    def run():
+        simulate_fights(columns, 300_000, spec, curve_step=1.0)
+    return run, len(builds)
+
+
+def _kill_breakpoints(builds):
+    """Точки перелома по сознанию для всех сборок и четырех значений здоровья (время одной пары)."""
+    from models.batch import columns_from_builds
+    from models.breakpoints import kill_breakpoints
+
+    columns = columns_from_builds(builds)
+    hp = [5e4, 2e5, 1e6, 3e6]
+
+    def run():
+        kill_breakpoints(columns, hp)
+    return run, len(builds) * len(hp)
+
+
+def _solve_required(builds):
+    """Нужное сознание для тысячи целей урона нефрита по каждой сборке (время одной пары)."""
+    import numpy as np
+
+    from models.batch import calculate_batch, columns_from_builds
+    from models.inverse import solve_required
+
+    columns = columns_from_builds(builds)
+    current = calculate_batch(**columns)["jade_total_damage_boss"]
+    goals = current[:, None] * np.linspace(1.0, 3.0, 1000)
+
+    def run():
+        solve_required(columns, "jade_total_damage_boss", goals)
+    return run, goals.size
+
+
+def _jade_bonuses(builds):
+    jade_sets = [build.jades for build in builds]
+
+    def run():
+        for jades in jade_sets:
+            calculate_jade_bonuses(jades)
+    return run, len(jade_sets)
+
+
+def _effective_stats(builds):
+    jades = [jade for build in builds for jade in build.jades]
+
+    def run():
+        for jade in jades:
+            jade.get_effective_stats()
+    return run, len(jades)
+
+
+def _update_results(builds, window):
+    results = [model.calculate(trace=False) for model in _models(builds)]
+    main_tab = window.main_tab
+
+    def run():
+        for result in results:
+            main_tab.update_results(result)
+        window.update_idletasks()
+    return run, len(results)
+
+
+def _update_calculation_text(builds, window):
+    steps = [model.calculate(trace=True)["calculation_steps"].steps for model in _models(builds)]
+    details_tab = window.details_tab
+
+    # Вкладка должна быть видна, иначе отображение откладывается до ее показа
+    window.notebook.select(details_tab)
+    window.update()
+
+    def run():
+        for step_list in steps:
+            # Новая трасса на каждый вызов: текст трассы кешируется внутри нее
+            trace = CalculationTrace()
+            trace.extend(step_list)
+            details_tab.update_calculation_text(trace)
+        window.update_idletasks()
+    return run, len(steps)
+
+
+def _startup(builds, window):
+    from ui.main_window import DamageCalculatorWindow
+
+    def run():
+        app = DamageCalculatorWindow()
+        app.update()
+        app.destroy()
+    return run, 1
+
+
+CASES: Dict[str, Case] = {case.name: case for case in (
+    Case("model.calculate_trace", "model", _full_calculation(True)),
+    Case("model.calculate_no_trace", "model", _full_calculation(False)),
+    Case("model.calculate_incremental", "model", _incremental_calculation),
+    Case("model.specialized_evaluator", "model", _specialized_evaluator),
+    Case("model.reroll_simulation", "model", _reroll_simulation),
+    Case("model.fight_simulation", "model", _fight_simulation),
+    Case("model.kill_breakpoints", "model", _kill_breakpoints),
+    Case("model.solve_required", "model", _solve_required),
+    Case("jade.calculate_jade_bonuses", "model", _jade_bonuses),
+    Case("jade.get_effective_stats", "model", _effective_stats),
+    Case("ui.update_results", "ui", _update_results),
+    Case("ui.update_calculation_text", "ui", _update_calculation_text),
+    Case("ui.startup", "ui", _startup, repeat=3),
+)}
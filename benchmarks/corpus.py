@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Детерминированный набор сборок для замеров.
+
+Сборки генерируются из зерна, поэтому каждый запуск замеряет одни и те же
+входные данные, и результаты разных запусков можно сравнивать.
+"""
+
+import random
+from typing import List
+
+from config import FUSION_VALUES
+from models.build import JADE_COUNT, TALENT_FLAGS, Build
+from models.jade import JadeConfig
+from models.ruleset import DEFAULT_RULESET
+
+
+# Зерно и размер набора по умолчанию
+DEFAULT_SEED = 20240601
+DEFAULT_SIZE = 200
+
+# Типы статов, из которых собираются нефриты
+_STAT_TYPES = ("Атака", "Лед. взрыв", "Атака по боссу", "Атака по монстрам", "Слияние", "Пусто")
+
+
+def _random_jade(rng: random.Random, index: int) -> JadeConfig:
+    """Создает нефрит со случайными статами."""
+    stats = []
+    for _ in range(4):
+        stat_type = rng.choice(_STAT_TYPES)
+        if stat_type == "Слияние":
+            value = rng.choice(FUSION_VALUES)
+        elif stat_type == "Пусто":
+            value = "0"
+        else:
+            value = str(rng.randint(1, 20))
+        stats.append((stat_type, value))
+    return JadeConfig.from_stats(index, stats)
+
+
+def generate_builds(size: int = DEFAULT_SIZE, seed: int = DEFAULT_SEED) -> List[Build]:
+    """
+    Генерирует набор сборок.
+
+    Args:
+        size: Число сборок
+        seed: Зерно генератора
+
+    Returns:
+        Список сборок
+    """
+    rng = random.Random(seed)
+    levels = list(DEFAULT_RULESET.level_thresholds)
+    builds = []
+    for _ in range(size):
+        flags = {name: rng.random() < 0.5 for name in TALENT_FLAGS}
+        builds.append(Build(
+            consciousness=float(rng.randint(500, 2000)),
+            hero_level=rng.randint(1, levels[-1] + 5),
+            jades=[_random_jade(rng, i) for i in range(JADE_COUNT)],
+            **flags
+        ))
+    return builds
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Запуск замеров производительности.
+
+    python -m benchmarks.run [--filter calculate] [--size 200] [--threshold 0.1]
+
+Результаты каждого запуска дописываются в файл истории (по умолчанию
+benchmarks/history.jsonl, в репозиторий не попадает) и сравниваются с
+предыдущим запуском: сценарий, у которого лучшее время выросло больше
+порога, отмечается как регрессия.
+
+Сценарии интерфейса выполняются под виртуальным дисплеем Xvfb, если
+переменная DISPLAY не задана. Если нет ни дисплея, ни Xvfb, они
+пропускаются.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Iterator, Optional
+
+# Добавляем корень проекта в путь импорта
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+from benchmarks.cases import CASES
+from benchmarks.corpus import DEFAULT_SEED, DEFAULT_SIZE, generate_builds
+
+
+# Файл истории и порог регрессии по умолчанию
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "history.jsonl")
+DEFAULT_THRESHOLD = 0.10
+
+
+@contextlib.contextmanager
+def virtual_display() -> Iterator[Optional[str]]:
+    """
+    Обеспечивает дисплей для сценариев интерфейса.
+
+    Yields:
+        Имя дисплея или None, если дисплей недоступен
+    """
+    if os.environ.get("DISPLAY"):
+        yield os.environ["DISPLAY"]
+        return
+
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        yield None
+        return
+
+    # Ищем свободный номер дисплея по файлам блокировки X-сервера
+    number = 99
+    while os.path.exists(f"/tmp/.X{number}-lock"):
+        number += 1
+    display = f":{number}"
+
+    process = subprocess.Popen([xvfb, display, "-screen", "0", "1920x1080x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    try:
+        # Ждем, пока сервер начнет принимать подключения
+        for _ in range(50):
+            if os.path.exists(f"/tmp/.X11-unix/X{number}"):
+                break
+            time.sleep(0.1)
+        yield display
+    finally:
+        del os.environ["DISPLAY"]
+        process.terminate()
+        process.wait()
+
+
+def measure(run, ops: int, repeat: int) -> Dict[str, float]:
+    """
+    Замеряет прогоны сценария.
+
+    Args:
+        run: Функция прогона
+        ops: Число операций в прогоне
+        repeat: Число замеряемых прогонов (плюс один прогрев)
+
+    Returns:
+        Лучшее и медианное время одной операции в микросекундах
+    """
+    run()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) / ops * 1e6)
+    return {"best_us": min(timings), "median_us": statistics.median(timings)}
+
+
+def _git_revision() -> Optional[str]:
+    """Текущий коммит репозитория, если он доступен."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_dir,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_previous(path: str, size: int, seed: int) -> Optional[dict]:
+    """
+    Находит последний запуск с тем же набором сборок.
+
+    Args:
+        path: Файл истории
+        size: Размер набора
+        seed: Зерно набора
+
+    Returns:
+        Запись запуска или None
+    """
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            record = json.loads(line)
+            if record.get("corpus") == {"size": size, "seed": seed}:
+                previous = record
+    return previous
+
+
+def main(argv=None) -> int:
+    """Точка входа замеров."""
+    parser = argparse.ArgumentParser(description="Замеры производительности модели и интерфейса")
+    parser.add_argument("--filter", default="", help="выполнять только сценарии, имя которых содержит строку")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="число сборок в наборе")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="зерно набора сборок")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="файл истории запусков")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="допустимый рост лучшего времени (0.1 = 10%%)")
+    parser.add_argument("--no-save", action="store_true", help="не записывать запуск в историю")
+    args = parser.parse_args(argv)
+
+    builds = generate_builds(args.size, args.seed)
+    cases = [case for case in CASES.values() if args.filter in case.name]
+    previous = load_previous(args.history, args.size, args.seed)
+    previous_results = previous["results"] if previous else {}
+
+    results = {}
+    regressions = []
+    with virtual_display() as display:
+        window = None
+        for case in cases:
+            if case.group == "ui":
+                if display is None:
+                    print(f"{case.name:34} пропущен: нет дисплея и Xvfb")
+                    continue
+                if window is None:
+                    from ui.main_window import DamageCalculatorWindow
+                    window = DamageCalculatorWindow()
+                    window.update()
+                run, ops = case.setup(builds, window)
+            else:
+                run, ops = case.setup(builds)
+
+            result = measure(run, ops, case.repeat)
+            results[case.name] = result
+
+            line = f"{case.name:34} {result['best_us']:12.2f} мкс  (медиана {result['median_us']:.2f})"
+            old = previous_results.get(case.name)
+            if old:
+                change = result["best_us"] / old["best_us"] - 1
+                line += f"  {change:+.1%}"
+                if change > args.threshold:
+                    line += "  РЕГРЕССИЯ"
+                    regressions.append(case.name)
+            print(line)
+
+        if window is not None:
+            window.destroy()
+
+    if not args.no_save and results:
+        record = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "corpus": {"size": args.size, "seed": args.seed},
+            "results": results,
+        }
+        with open(args.history, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    if regressions:
+        print(f"Регрессии относительно запуска {previous.get('revision') or previous['time']}: "
+              f"{', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
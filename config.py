@@ -62,6 +62,15 @@ WINDOW_TITLE = "Калькулятор урона"
 WINDOW_SIZE = "1200x800"
 PADDING = 10
 
+# Задержка автоматического пересчета (мс): изменения ввода за это время объединяются в один расчет
+LIVE_RECALC_DELAY_MS = 150
+
+# Число строк деталей расчета, выводимых за один шаг: длинные отчеты выводятся частями
+DETAILS_RENDER_CHUNK_LINES = 2000
+
+# Период проверки файла загруженного набора правил на изменения (мс)
+RULESET_POLL_INTERVAL_MS = 1000
+
 # Информация о приложении
 APP_VERSION = "2.0.0"
 APP_AUTHOR = "Claude"
@@ -4,8 +4,18 @@
 """
 Точка входа для приложения "Калькулятор урона".
 Инициализирует и запускает главное окно приложения с современным дизайном.
+
+Экран загрузки показывается, пока по шагам создается главное окно, и
+отражает реальный ход работы. Флаг --no-splash запускает окно сразу.
 """
 
+import time
+
+# Отсчет времени до готовности интерфейса начинаем до импорта модулей приложения
+_START_TIME = time.perf_counter()
+
+import argparse
+import logging
 import tkinter as tk
 import os
 import sys
@@ -18,13 +28,29 @@ if current_dir not in sys.path:
 from ui.main_window import DamageCalculatorWindow
 
 
-def show_splash_screen():
+logger = logging.getLogger("damage_calculator")
+
+# Размеры главного окна при запуске
+WINDOW_WIDTH = 1450
+WINDOW_HEIGHT = 950
+
+
+def show_splash_screen(app):
     """
-    Показывает экран загрузки перед запуском основного приложения.
-    Простая анимация для улучшения UX.
+    Показывает экран загрузки, пока по шагам создается главное окно.
+
+    Экран загрузки - дочернее окно того же корня Tk. Полоса прогресса
+    сдвигается после каждого выполненного шага создания интерфейса, а когда
+    окно готово, экран загрузки закрывается и окно показывается.
+
+    Args:
+        app: Главное окно, созданное с build_widgets=False
     """
+    # Главное окно скрыто, пока не построено
+    app.withdraw()
+
     # Создаем окно загрузки
-    splash = tk.Tk()
+    splash = tk.Toplevel(app)
     splash.overrideredirect(True)  # Убираем рамку окна
 
     # Размеры экрана загрузки
@@ -64,7 +90,6 @@ def show_splash_screen():
     progress_frame = tk.Frame(splash, bg="#3498db")
     progress_frame.pack(pady=20, padx=50, fill=tk.X)
 
-    progress_var = tk.DoubleVar()
     progress_bar = tk.Canvas(
         progress_frame,
         width=300,
@@ -74,49 +99,80 @@ def show_splash_screen():
     )
     progress_bar.pack(fill=tk.X)
 
-    # Функция для анимации загрузки
-    def update_progress(current=0):
-        if current <= 100:
-            # Очищаем и рисуем прогресс-бар
-            progress_bar.delete("progress")
-            width = current * 3  # 300 пикселей - полная ширина
-            progress_bar.create_rectangle(
-                0, 0, width, 20,
-                fill="#2ecc71",
-                tags="progress"
-            )
-            subtitle_label.config(text=f"Загрузка приложения... {current}%")
-
-            # Рекурсивно вызываем с увеличенным значением
-            splash.after(30, update_progress, current + 2)
-        else:
-            # Закрываем экран загрузки и открываем основное приложение
+    steps = app.build_steps()
+
+    def build_next_step():
+        try:
+            done, total, text = next(steps)
+        except StopIteration:
+            # Закрываем экран загрузки и показываем основное приложение
             splash.destroy()
-            launch_app()
+            show_app(app)
+            return
+
+        # Рисуем прогресс по выполненным шагам
+        progress_bar.delete("progress")
+        progress_bar.create_rectangle(0, 0, 300 * done // total, 20, fill="#2ecc71", tags="progress")
+        subtitle_label.config(text=f"{text}... {100 * done // total}%")
+
+        # Отрисовываем экран загрузки до следующего шага: шаги блокируют цикл событий
+        splash.update_idletasks()
+        app.after(1, build_next_step)
 
-    # Запускаем анимацию
-    splash.after(500, update_progress)
-    splash.mainloop()
+    build_next_step()
 
 
-def launch_app():
-    """Основная функция для запуска приложения."""
-    app = DamageCalculatorWindow()
+def show_app(app):
+    """
+    Показывает главное окно по центру экрана и записывает время до готовности.
 
+    Args:
+        app: Главное окно
+    """
     # Настраиваем отображение по центру экрана
-    window_width = 1450
-    window_height = 950
     screen_width = app.winfo_screenwidth()
     screen_height = app.winfo_screenheight()
-    x = (screen_width - window_width) // 2
-    y = (screen_height - window_height) // 2
+    x = (screen_width - WINDOW_WIDTH) // 2
+    y = (screen_height - WINDOW_HEIGHT) // 2
 
     # Устанавливаем позицию и размеры окна
-    app.geometry(f"{window_width}x{window_height}+{x}+{y}")
+    app.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}+{x}+{y}")
+    app.deiconify()
+
+    # Окно готово к работе, когда цикл событий обработал его отрисовку
+    def log_time_to_interactive():
+        elapsed = (time.perf_counter() - _START_TIME) * 1000
+        logger.info("Время до готовности интерфейса: %.0f мс", elapsed)
+
+    app.after_idle(log_time_to_interactive)
+
+
+def launch_app(splash=True):
+    """
+    Основная функция для запуска приложения.
+
+    Args:
+        splash: Показывать ли экран загрузки
+    """
+    if splash:
+        app = DamageCalculatorWindow(build_widgets=False)
+        show_splash_screen(app)
+    else:
+        app = DamageCalculatorWindow()
+        show_app(app)
 
     app.mainloop()
 
 
+def main(argv=None):
+    """Разбирает аргументы командной строки и запускает приложение."""
+    parser = argparse.ArgumentParser(description="Калькулятор урона")
+    parser.add_argument("--no-splash", action="store_true", help="запустить без экрана загрузки")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    launch_app(splash=not args.no_splash)
+
+
 if __name__ == "__main__":
-    # Запускаем с экраном загрузки для лучшего UX
-    show_splash_screen()
\ No newline at end of file
+    main()
@@ -3,6 +3,7 @@
 """
 
 from models.jade import JadeConfig, JadeStat
+from models.build import Build
 from models.damage_calculator import DamageCalculatorModel
 
-__all__ = ['JadeConfig', 'JadeStat', 'DamageCalculatorModel']
\ No newline at end of file
+__all__ = ['JadeConfig', 'JadeStat', 'Build', 'DamageCalculatorModel']
\ No newline at end of file
@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Векторизованный пакетный расчет урона на NumPy.
+
+Принимает входные данные в виде столбцов (массивов) и возвращает столбцы для
+всех ключей, которые выдает DamageCalculatorModel.calculate(). Константы
+берутся из тех же таблиц набора правил (models.ruleset), что и в скалярной
+модели, а порядок операций повторяет ее, поэтому результаты совпадают с
+ней бит в бит, включая округление взрывов нефрита (round() и np.rint оба
+округляют половины к четному).
+
+Модуль требует NumPy и не импортируется пакетом models автоматически.
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, Any, Optional, Sequence
+
+import numpy as np
+
+from models.build import TALENT_FLAGS
+from models.jade import calculate_jade_bonuses
+from models.ruleset import DEFAULT_RULESET, Ruleset
+
+
+# Столбцы с бонусами нефритов и соответствующие им типы статов
+JADE_COLUMNS = {
+    "jade_attack": "Атака",
+    "jade_ice_blast": "Лед. взрыв",
+    "jade_boss_attack": "Атака по боссу",
+    "jade_monster_attack": "Атака по монстрам",
+}
+
+# Ключи результатов в том же порядке, что и в DamageCalculatorModel.calculate()
+OUTPUT_KEYS = (
+    "base_attack", "base_ice_blast_percent", "final_attack", "final_ice_blast_percent",
+    "physical_damage",
+    "boss_attack_bonus", "boss_ice_blast_percent", "boss_damage", "boss_flower_damage",
+    "jade_first_blast_boss", "jade_second_blast_boss", "jade_third_blast_boss", "jade_total_damage_boss",
+    "monster_attack_bonus", "monster_ice_blast_percent", "monster_damage", "monster_flower_damage",
+    "jade_first_blast_monster", "jade_second_blast_monster", "jade_third_blast_monster",
+    "jade_total_damage_monster",
+)
+
+# Целочисленные результаты (округленные взрывы нефрита)
+INT_OUTPUT_KEYS = frozenset(key for key in OUTPUT_KEYS if key.startswith("jade_"))
+
+# Промежуточные узлы расчета, которые можно запросить у calculate_batch(nodes=True)
+NODE_KEYS = ("attack_base", "combat_attack_bonus")
+
+
+@lru_cache(maxsize=8)
+def _ruleset_tables(ruleset: Ruleset) -> Dict[str, np.ndarray]:
+    """Таблицы набора правил в виде массивов NumPy (строятся один раз для набора)."""
+    return {
+        "level_thresholds": np.array(ruleset.level_thresholds),
+        "level_bonus_prefix": np.array(ruleset.level_bonus_prefix),
+        "base_attack_terms": _terms_table(ruleset.base_attack_terms),
+        "combat_attack_terms": _terms_table(ruleset.combat_attack_terms),
+        "ice_blast_terms": _terms_table(ruleset.ice_blast_terms),
+        "post_jade_ice_blast_terms": _terms_table(ruleset.post_jade_ice_blast_terms),
+        "combat_ice_blast_terms": _terms_table(ruleset.combat_ice_blast_terms),
+        "tessa_multipliers": np.array(ruleset.tessa_multipliers),
+        "match_multipliers": np.array(ruleset.match_multipliers),
+    }
+
+
+def _terms_table(terms) -> np.ndarray:
+    """
+    Слагаемые группы талантов в виде матрицы (маска, номер слагаемого).
+
+    Кортежи дополняются нулями в конце: x + 0.0 == x, поэтому лишние
+    сложения не меняют результат.
+    """
+    width = max(len(row) for row in terms)
+    table = np.zeros((len(terms), width))
+    for mask, row in enumerate(terms):
+        table[mask, :len(row)] = row
+    return table
+
+
+def _add_terms(value: np.ndarray, table: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Прибавляет слагаемые группы по одному, в том же порядке, что и скалярная модель."""
+    terms = table[mask]
+    for i in range(table.shape[1]):
+        value = value + terms[..., i]
+    return value
+
+
+def calculate_batch(consciousness,
+                    hero_level,
+                    jade_attack=0.0,
+                    jade_ice_blast=0.0,
+                    jade_boss_attack=0.0,
+                    jade_monster_attack=0.0,
+                    ruleset: Optional[Ruleset] = None,
+                    nodes: bool = False,
+                    **flags) -> Dict[str, np.ndarray]:
+    """
+    Рассчитывает урон для множества сборок сразу.
+
+    Все аргументы могут быть скалярами или массивами, которые приводятся к
+    общей форме по правилам NumPy.
+
+    Args:
+        consciousness: Значения сознания
+        hero_level: Уровни героя
+        jade_attack: Бонус атаки от нефритов (доля, 0.1 = 10%)
+        jade_ice_blast: Бонус % ледяного взрыва от нефритов
+        jade_boss_attack: Бонус атаки по боссам от нефритов
+        jade_monster_attack: Бонус атаки по монстрам от нефритов
+        ruleset: Набор правил (по умолчанию DEFAULT_RULESET)
+        nodes: Вернуть также промежуточные узлы NODE_KEYS
+        **flags: Таланты и боевые параметры из TALENT_FLAGS (bool или массивы bool)
+
+    Returns:
+        Словарь столбцов для каждого ключа из OUTPUT_KEYS (и NODE_KEYS при nodes)
+    """
+    unknown = set(flags) - set(TALENT_FLAGS)
+    if unknown:
+        raise ValueError(f"Неизвестные параметры: {', '.join(sorted(unknown))}")
+
+    consciousness = np.asarray(consciousness, dtype=np.float64)
+    hero_level = np.asarray(hero_level)
+    jade_attack = np.asarray(jade_attack, dtype=np.float64)
+    jade_ice_blast = np.asarray(jade_ice_blast, dtype=np.float64)
+    jade_boss_attack = np.asarray(jade_boss_attack, dtype=np.float64)
+    jade_monster_attack = np.asarray(jade_monster_attack, dtype=np.float64)
+    f = {name: np.asarray(flags.get(name, False), dtype=bool) for name in TALENT_FLAGS}
+
+    shape = np.broadcast_shapes(
+        consciousness.shape, hero_level.shape, jade_attack.shape, jade_ice_blast.shape,
+        jade_boss_attack.shape, jade_monster_attack.shape, *(v.shape for v in f.values())
+    )
+
+    ruleset = ruleset or DEFAULT_RULESET
+    tables = _ruleset_tables(ruleset)
+
+    # Бонус от уровня героя: префиксная сумма по числу пройденных порогов
+    hero_level_bonus = tables["level_bonus_prefix"][
+        np.searchsorted(tables["level_thresholds"], hero_level, side="right")]
+
+    # Маска включенных талантов индексирует таблицы набора правил
+    mask = np.zeros((), dtype=np.intp)
+    for bit, name in enumerate(TALENT_FLAGS):
+        mask = mask | (f[name].astype(np.intp) << bit)
+
+    # Бонус атаки от нефритов учитывается, только если он положительный
+    jade_attack_term = np.where(jade_attack > 0, jade_attack, 0.0)
+    jade_ice_blast_term = np.where(jade_ice_blast > 0, jade_ice_blast, 0.0)
+
+    attack_base = ruleset.base_attack + (consciousness / 10)
+
+    # Базовые параметры
+    base_attack_bonus = _add_terms(1.0 + hero_level_bonus, tables["base_attack_terms"], mask)
+    base_attack_bonus = base_attack_bonus + jade_attack_term
+    base_attack = attack_base * base_attack_bonus
+
+    base_ice_blast_percent = _add_terms(np.float64(1.0), tables["ice_blast_terms"], mask)
+    base_ice_blast_percent = base_ice_blast_percent + jade_ice_blast_term
+    base_ice_blast_percent = _add_terms(base_ice_blast_percent, tables["post_jade_ice_blast_terms"], mask)
+
+    # Боевые параметры
+    combat_attack_bonus = _add_terms(base_attack_bonus, tables["combat_attack_terms"], mask)
+    tessa_multiplier = tables["tessa_multipliers"][mask]
+    consciousness_match_multiplier = tables["match_multipliers"][mask]
+    final_attack = attack_base * combat_attack_bonus * tessa_multiplier * consciousness_match_multiplier
+
+    final_ice_blast_percent = _add_terms(base_ice_blast_percent, tables["combat_ice_blast_terms"], mask)
+
+    results = {
+        "attack_base": attack_base,
+        "combat_attack_bonus": combat_attack_bonus,
+        "base_attack": base_attack,
+        "base_ice_blast_percent": base_ice_blast_percent,
+        "final_attack": final_attack,
+        "final_ice_blast_percent": final_ice_blast_percent,
+        "physical_damage": final_attack,
+    }
+
+    # Ветки для боссов и обычных монстров
+    for target, bonus in (("boss", jade_boss_attack), ("monster", jade_monster_attack)):
+        ice_blast_percent = (1 * (1 + bonus)) + (final_ice_blast_percent - 1)
+        blast = final_attack * ice_blast_percent * ruleset.explosion_coef
+        first_blast = np.rint(blast * ruleset.jade_first_blast_multiplier)
+        other_blast = np.rint(blast * ruleset.jade_other_blast_multiplier)
+        first_blast = first_blast.astype(np.int64)
+        other_blast = other_blast.astype(np.int64)
+
+        results[f"{target}_attack_bonus"] = bonus
+        results[f"{target}_ice_blast_percent"] = ice_blast_percent
+        results[f"{target}_damage"] = blast
+        results[f"{target}_flower_damage"] = final_attack * ice_blast_percent * ruleset.flower_explosion_coef
+        results[f"jade_first_blast_{target}"] = first_blast
+        results[f"jade_second_blast_{target}"] = other_blast
+        results[f"jade_third_blast_{target}"] = other_blast
+        results[f"jade_total_damage_{target}"] = first_blast + other_blast + other_blast
+
+    # Приводим все столбцы к общей форме и порядку ключей calculate()
+    keys = OUTPUT_KEYS + NODE_KEYS if nodes else OUTPUT_KEYS
+    return {key: np.broadcast_to(results[key], shape).copy() for key in keys}
+
+
+def calculate_states(columns: Dict[str, Any], toggles: Sequence[str],
+                     ruleset: Optional[Ruleset] = None) -> Dict[str, np.ndarray]:
+    """
+    Рассчитывает все сочетания переключателей для каждой сборки за один проход.
+
+    Состояние - число, в котором бит i означает, что включен toggles[i].
+    Значения этих переключателей в columns игнорируются.
+
+    Args:
+        columns: Входные столбцы calculate_batch (скаляры или массивы)
+        toggles: Переключатели из TALENT_FLAGS
+        ruleset: Набор правил
+
+    Returns:
+        Столбцы для каждого ключа из OUTPUT_KEYS с дополнительной последней
+        осью длины 2 ** len(toggles) по состояниям
+    """
+    unknown = set(toggles) - set(TALENT_FLAGS)
+    if unknown:
+        raise ValueError(f"Неизвестные параметры: {', '.join(sorted(unknown))}")
+
+    states = np.arange(1 << len(toggles))
+    inputs = {name: np.asarray(value)[..., None] for name, value in columns.items()}
+    for bit, name in enumerate(toggles):
+        inputs[name] = (states >> bit & 1).astype(bool)
+    return calculate_batch(ruleset=ruleset, **inputs)
+
+
+def columns_from_model(model) -> Dict[str, np.ndarray]:
+    """
+    Собирает входные столбцы для calculate_batch из текущих входных данных модели.
+
+    Args:
+        model: Модель расчета урона
+
+    Returns:
+        Словарь столбцов длины 1
+    """
+    columns = {"consciousness": model.consciousness, "hero_level": model.hero_level}
+
+    bonuses = calculate_jade_bonuses(model.jade_configs)
+    for column, stat_type in JADE_COLUMNS.items():
+        columns[column] = bonuses.get(stat_type, 0.0)
+
+    for name in TALENT_FLAGS:
+        columns[name] = getattr(model, name)
+
+    return {name: np.array([value]) for name, value in columns.items()}
+
+
+def columns_from_builds(builds: Iterable) -> Dict[str, np.ndarray]:
+    """
+    Собирает входные столбцы для calculate_batch из списка сборок.
+
+    Args:
+        builds: Сборки (models.build.Build)
+
+    Returns:
+        Словарь столбцов, который можно передать в calculate_batch(**columns)
+    """
+    columns = {name: [] for name in ("consciousness", "hero_level", *JADE_COLUMNS, *TALENT_FLAGS)}
+
+    for build in builds:
+        columns["consciousness"].append(build.consciousness)
+        columns["hero_level"].append(build.hero_level)
+
+        bonuses = calculate_jade_bonuses(build.jades)
+        for column, stat_type in JADE_COLUMNS.items():
+            columns[column].append(bonuses.get(stat_type, 0.0))
+
+        for name in TALENT_FLAGS:
+            columns[name].append(getattr(build, name))
+
+    return {
+        name: np.array(values, dtype=bool if name in TALENT_FLAGS else
+                       np.int64 if name == "hero_level" else np.float64)
+        for name, values in columns.items()
+    }
+
+
+def iter_rows(results: Dict[str, np.ndarray]) -> Iterator[Dict[str, Any]]:
+    """
+    Перебирает результаты пакетного расчета построчно.
+
+    Args:
+        results: Столбцы, полученные от calculate_batch
+
+    Yields:
+        Словари с теми же ключами и типами значений, что и у calculate()
+    """
+    columns = [(key, results[key].ravel().tolist()) for key in OUTPUT_KEYS]
+    size = len(columns[0][1])
+
+    for i in range(size):
+        yield {key: values[i] for key, values in columns}
@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Число взрывов до убийства цели и точки перелома (breakpoints).
+
+Для каждой сборки и каждого значения здоровья цели считается, сколько
+ледяных, цветочных взрывов или взрывов нефрита нужно, чтобы ее убить, а
+также наименьшие значения сознания или стата нефрита, при которых это
+число уменьшается или округленный взрыв нефрита (round() в
+_calculate_jade_damage) вырастает на единицу.
+
+Точки находятся обращением цепочки формул, а не перебором значений: урон
+по цели линеен по каждой переменной в отдельности,
+
+    урон(x) = урон(x0) * L(x) / L(x0),
+
+где L - множитель, в который переменная входит слагаемым (база атаки для
+сознания, боевой бонус атаки для Атаки, % ледяного взрыва по цели для
+Лед. взрыва и бонуса по цели). Нужный урон выражается через здоровье цели
+или порог округления, и из него получается x. Затем значение уточняется
+до наименьшего числа с плавающей точкой, при котором расчет
+(models.batch) действительно дает новый результат: обращение дает оценку
+с точностью до нескольких единиц последнего разряда, и уточнение
+сводится к нескольким пакетным расчетам на всех сборках сразу.
+
+Модуль требует NumPy и не импортируется пакетом models автоматически.
+"""
+
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from models.batch import calculate_batch
+from models.ruleset import DEFAULT_RULESET, Ruleset
+
+
+# Переменные, по которым ищутся точки перелома
+BREAKPOINT_VARIABLES = ("consciousness", "jade_attack", "jade_ice_blast", "jade_boss_attack",
+                        "jade_monster_attack")
+
+# Виды взрывов, для которых считается число взрывов до убийства
+BLAST_KINDS = ("ice", "flower", "jade")
+
+# Относительная ширина начального отрезка уточнения вокруг оценки обращения
+REFINE_WINDOW = 1e-12
+
+# Предельное число шагов уточнения (расширение отрезка и деление пополам)
+MAX_REFINE_STEPS = 200
+
+
+def hits_to_kill(hp, damage) -> np.ndarray:
+    """
+    Число одинаковых ударов, нужное, чтобы нанести урон не меньше здоровья цели.
+
+    Args:
+        hp: Здоровье цели
+        damage: Урон одного удара
+
+    Returns:
+        Наименьшее n, при котором n * damage >= hp (0 при hp <= 0, inf при damage <= 0)
+    """
+    hp = np.asarray(hp, dtype=np.float64)
+    damage = np.asarray(damage, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hits = np.ceil(hp / damage)
+        # Деление округляется: поправляем на единицу, чтобы выполнялось само условие n * damage >= hp
+        hits = np.where((hits > 0) & ((hits - 1) * damage >= hp), hits - 1, hits)
+        hits = np.where(hits * damage < hp, hits + 1, hits)
+    hits = np.where(hp <= 0, 0.0, hits)
+    return np.where((damage <= 0) & (hp > 0), np.inf, hits)
+
+
+def jade_blasts_to_kill(hp, first_blast, other_blast) -> np.ndarray:
+    """
+    Число взрывов нефрита до убийства цели.
+
+    Нефрит взрывается тройками: первый взрыв, затем два одинаковых.
+
+    Args:
+        hp: Здоровье цели
+        first_blast: Урон первого взрыва
+        other_blast: Урон второго и третьего взрывов
+
+    Returns:
+        Наименьшее число взрывов, суммарный урон которых не меньше здоровья
+    """
+    hp = np.asarray(hp, dtype=np.float64)
+    first_blast = np.asarray(first_blast, dtype=np.float64)
+    other_blast = np.asarray(other_blast, dtype=np.float64)
+    cycle = first_blast + 2 * other_blast
+
+    # Полные тройки перед последней и остаток здоровья на последнюю тройку (0 < остаток <= cycle)
+    cycles = np.maximum(hits_to_kill(hp, cycle) - 1, 0)
+    rest = hp - cycles * cycle
+    blasts = 3 * cycles + np.where(rest <= first_blast, 1, np.where(rest <= first_blast + other_blast, 2, 3))
+    blasts = np.where(hp <= 0, 0.0, blasts)
+    return np.where((cycle <= 0) & (hp > 0), np.inf, blasts)
+
+
+def blasts_to_kill(results: Dict[str, np.ndarray], hp, target: str = "boss") -> Dict[str, np.ndarray]:
+    """
+    Число взрывов каждого вида до убийства цели.
+
+    Args:
+        results: Результаты calculate_batch (или calculate() одной сборки)
+        hp: Здоровье цели; массив здоровья добавляет последнюю ось к результатам
+        target: "boss" или "monster"
+
+    Returns:
+        Словарь {вид взрыва из BLAST_KINDS: число взрывов}
+    """
+    _check_target(target)
+    hp = np.asarray(hp, dtype=np.float64)
+
+    def column(key):
+        value = np.asarray(results[key])
+        return value[..., None] if hp.ndim else value
+
+    return _blasts({key: column(key) for key in _blast_keys(target)}, hp, target)
+
+
+def _check_target(target: str) -> None:
+    """Проверяет название цели."""
+    if target not in ("boss", "monster"):
+        raise ValueError(f"Неизвестная цель: {target!r}")
+
+
+class _Inversion:
+    """Обращение урона по цели относительно одной переменной при остальных неизменных входах."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], variable: str, target: str,
+                 ruleset: Optional[Ruleset], extra_axis: bool):
+        if variable not in BREAKPOINT_VARIABLES:
+            raise ValueError(f"Неизвестная переменная: {variable!r}")
+        _check_target(target)
+
+        self.ruleset = ruleset or DEFAULT_RULESET
+        self.variable = variable
+        self.target = target
+        # Входы сборок; ось значений здоровья (если есть) добавляется последней
+        self.columns = {name: np.asarray(value)[..., None] if extra_axis else np.asarray(value)
+                        for name, value in columns.items()}
+        self.x0 = np.asarray(self.columns.get(variable, 0.0), dtype=np.float64)
+
+        self.results = self.evaluate(self.x0)
+        self.damage = self.results[f"{target}_damage"]
+
+        # Множитель L, в который переменная входит слагаемым, и скорость его роста
+        if variable == "consciousness":
+            self.factor, self.slope, self.x_base = self.results["attack_base"], 0.1, self.x0
+        elif variable == "jade_attack":
+            # Бонус атаки от нефритов учитывается, только если он положительный
+            self.factor, self.slope, self.x_base = self.results["combat_attack_bonus"], 1.0, np.maximum(self.x0, 0)
+        elif variable == "jade_ice_blast":
+            self.factor, self.slope, self.x_base = (
+                self.results[f"{target}_ice_blast_percent"], 1.0, np.maximum(self.x0, 0))
+        elif variable == f"jade_{target}_attack":
+            self.factor, self.slope, self.x_base = self.results[f"{target}_ice_blast_percent"], 1.0, self.x0
+        else:
+            # Бонус по другой цели не влияет на урон по этой
+            self.factor, self.slope, self.x_base = None, 0.0, self.x0
+
+    def evaluate(self, x) -> Dict[str, np.ndarray]:
+        """Пакетный расчет при значении переменной x."""
+        columns = dict(self.columns)
+        columns[self.variable] = x
+        return calculate_batch(ruleset=self.ruleset, nodes=True, **columns)
+
+    def invert(self, damage) -> np.ndarray:
+        """Значение переменной, при котором урон одного ледяного взрыва по цели равен damage."""
+        if self.factor is None:
+            return np.full(np.shape(damage), np.inf)
+        return self.x_base + self.factor * (damage / self.damage - 1.0) / self.slope
+
+    def refine(self, predicate: Callable[[Dict[str, np.ndarray]], np.ndarray], estimate) -> np.ndarray:
+        """
+        Уточняет оценку до наименьшего x > x0, при котором predicate истинно.
+
+        Предикат должен быть монотонным по x и ложным при x0. Отрезок
+        [нижняя, верхняя] строится вокруг оценки и при необходимости
+        расширяется вдвое, затем делится пополам до соседних чисел.
+        """
+        estimate = np.asarray(estimate, dtype=np.float64)
+        shape = np.broadcast_shapes(estimate.shape, np.shape(self.damage))
+        estimate = np.broadcast_to(estimate, shape)
+        x0 = np.broadcast_to(self.x0, shape)
+        active = np.isfinite(estimate)
+        estimate = np.where(active, np.maximum(estimate, x0), x0)
+
+        def check(x):
+            return predicate(self.evaluate(x))
+
+        # Расширяем отрезок, пока нижняя граница не станет ложной, а верхняя - истинной
+        width = (np.abs(estimate) + 1.0) * REFINE_WINDOW
+        low = np.maximum(estimate - width, x0)
+        high = estimate + width
+        for _ in range(MAX_REFINE_STEPS):
+            low_true = active & (low > x0) & check(low)
+            high_false = active & ~check(high)
+            if not (low_true.any() or high_false.any()):
+                break
+            width = np.where(low_true | high_false, width * 2, width)
+            high = np.where(low_true, low, high)
+            low = np.where(low_true, np.maximum(low - width, x0), low)
+            low = np.where(high_false, high, low)
+            high = np.where(high_false, high + width, high)
+
+        # Делим отрезок пополам, пока границы не станут соседними числами
+        for _ in range(MAX_REFINE_STEPS):
+            middle = low + (high - low) / 2
+            open_ = active & (middle > low) & (middle < high)
+            if not open_.any():
+                break
+            middle_true = check(middle)
+            high = np.where(open_ & middle_true, middle, high)
+            low = np.where(open_ & ~middle_true, middle, low)
+
+        return np.where(active, high, np.inf)
+
+
+def kill_breakpoints(columns: Dict[str, np.ndarray],
+                     hp,
+                     variable: str = "consciousness",
+                     target: str = "boss",
+                     ruleset: Optional[Ruleset] = None) -> Dict[str, np.ndarray]:
+    """
+    Число взрывов до убийства и значения переменной, при которых оно уменьшается.
+
+    Args:
+        columns: Входные столбцы calculate_batch (columns_from_builds, columns_from_model, ...)
+        hp: Здоровье цели: скаляр или таблица значений (добавляет последнюю ось)
+        variable: Переменная из BREAKPOINT_VARIABLES
+        target: "boss" или "monster"
+        ruleset: Набор правил
+
+    Returns:
+        Для каждого вида взрыва из BLAST_KINDS: "<вид>_blasts" - число взрывов
+        сейчас и "<вид>_breakpoint" - наименьшее значение переменной, при
+        котором взрывов нужно на один меньше (inf, если уменьшить нельзя)
+    """
+    hp = np.asarray(hp, dtype=np.float64)
+    inversion = _Inversion(columns, variable, target, ruleset, extra_axis=hp.ndim > 0)
+    ruleset = inversion.ruleset
+    # Столбцы сборок уже получили ось здоровья, поэтому результаты приводятся к форме hp сами
+    current = _blasts(inversion.results, hp, target)
+
+    output = {}
+    flower_ratio = ruleset.flower_explosion_coef / ruleset.explosion_coef
+    for kind in ("ice", "flower"):
+        blasts = current[kind]
+        # Урон одного взрыва, при котором хватает на один взрыв меньше
+        with np.errstate(divide="ignore", invalid="ignore"):
+            needed = np.where(blasts >= 2, hp / (blasts - 1), np.inf)
+        if kind == "flower":
+            needed = needed / flower_ratio
+        key = f"{target}_damage" if kind == "ice" else f"{target}_flower_damage"
+        output[f"{kind}_blasts"] = blasts
+        output[f"{kind}_breakpoint"] = inversion.refine(
+            lambda r, key=key, blasts=blasts: hits_to_kill(hp, r[key]) < blasts, inversion.invert(needed))
+
+    blasts = current["jade"]
+    needed = _jade_damage_needed(hp, blasts - 1, ruleset)
+    output["jade_blasts"] = blasts
+    output["jade_breakpoint"] = inversion.refine(
+        lambda r: _blasts(r, hp, target)["jade"] < blasts, inversion.invert(needed))
+    return output
+
+
+def _blast_keys(target: str):
+    """Результаты с уроном одного взрыва каждого вида."""
+    return (f"{target}_damage", f"{target}_flower_damage",
+            f"jade_first_blast_{target}", f"jade_second_blast_{target}")
+
+
+def _blasts(results: Dict[str, np.ndarray], hp: np.ndarray, target: str) -> Dict[str, np.ndarray]:
+    """Число взрывов для результатов, уже приведенных к форме здоровья."""
+    return {
+        "ice": hits_to_kill(hp, results[f"{target}_damage"]),
+        "flower": hits_to_kill(hp, results[f"{target}_flower_damage"]),
+        "jade": jade_blasts_to_kill(hp, results[f"jade_first_blast_{target}"], results[f"jade_second_blast_{target}"]),
+    }
+
+
+def _jade_damage_needed(hp: np.ndarray, blasts: np.ndarray, ruleset: Ruleset) -> np.ndarray:
+    """
+    Наименьший урон ледяного взрыва, при котором цель убивается за blasts взрывов нефрита.
+
+    Сумма blasts взрывов - это a * round(урон * m1) + b * round(урон * m2),
+    где a и b - число первых и прочих взрывов. Без округления урон равен
+    hp / (a * m1 + b * m2), а округление сдвигает сумму не больше чем на
+    (a + b) / 2, поэтому искомый урон лежит в узком отрезке и совпадает с
+    одним из порогов округления внутри него (или с его правым концом).
+    Порогов в отрезке не больше нескольких, и все они проверяются сразу.
+    """
+    first_multiplier = ruleset.jade_first_blast_multiplier
+    other_multiplier = ruleset.jade_other_blast_multiplier
+
+    blasts = np.where(blasts >= 1, blasts, np.nan)
+    cycles, rest = np.divmod(blasts, 3)
+    firsts = cycles + (rest >= 1)
+    others = 2 * cycles + (rest >= 2)
+    weight = firsts * first_multiplier + others * other_multiplier
+    spread = (firsts + others) / 2
+    low = (hp - spread) / weight
+    high = (hp + spread) / weight
+
+    def total(first, other):
+        return firsts * first + others * other
+
+    best = high
+    # Порогов одного вида в отрезке не больше count
+    count = int(max(first_multiplier, other_multiplier) / min(first_multiplier, other_multiplier)) + 2
+    for multiplier, is_first in ((first_multiplier, True), (other_multiplier, False)):
+        start = np.ceil(low * multiplier + 0.5)
+        for step in range(count):
+            value = start + step
+            damage = (value - 0.5) / multiplier
+            if is_first:
+                reached = total(value, np.floor(damage * other_multiplier + 0.5))
+            else:
+                reached = total(np.floor(damage * first_multiplier + 0.5), value)
+            candidate = (damage <= high) & (reached >= hp)
+            best = np.where(candidate & (damage < best), damage, best)
+
+    return np.where(np.isnan(blasts), np.inf, best)
+
+
+def jade_tick_breakpoints(columns: Dict[str, np.ndarray],
+                          variable: str = "consciousness",
+                          target: str = "boss",
+                          ruleset: Optional[Ruleset] = None) -> Dict[str, np.ndarray]:
+    """
+    Значения переменной, при которых округленные взрывы нефрита вырастают на единицу.
+
+    Args:
+        columns: Входные столбцы calculate_batch
+        variable: Переменная из BREAKPOINT_VARIABLES
+        target: "boss" или "monster"
+        ruleset: Набор правил
+
+    Returns:
+        "first_blast" и "other_blast" - текущие значения первого и прочих
+        взрывов, "first_breakpoint" и "other_breakpoint" - наименьшие значения
+        переменной, при которых эти взрывы становятся больше (inf, если
+        переменная на них не влияет)
+    """
+    inversion = _Inversion(columns, variable, target, ruleset, extra_axis=False)
+    results = inversion.results
+    ruleset = inversion.ruleset
+
+    output = {}
+    for name, key, multiplier in (
+            ("first", f"jade_first_blast_{target}", ruleset.jade_first_blast_multiplier),
+            ("other", f"jade_second_blast_{target}", ruleset.jade_other_blast_multiplier)):
+        value = results[key]
+        # round(урон * m) становится value + 1, когда урон * m проходит value + 0.5
+        needed = (value + 0.5) / multiplier
+        output[f"{name}_blast"] = value
+        output[f"{name}_breakpoint"] = inversion.refine(
+            lambda r, key=key, value=value: r[key] > value, inversion.invert(needed))
+    return output
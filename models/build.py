@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Описание сборки персонажа для расчетов без интерфейса.
+Сборка объединяет все входные данные модели: сознание, уровень героя,
+таланты и нефриты.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from config import DEFAULT_CONSCIOUSNESS, DEFAULT_HERO_LEVEL
+from models.jade import JadeConfig
+
+
+# Флаги талантов и боевых параметров в том порядке, в котором их принимает модель
+BASE_FLAGS = ("untouchable_talent", "power", "ice_root", "ice_flash")
+COMBAT_FLAGS = ("aroma_aura", "frost_bloom", "frost_seal", "tundra_power",
+                "frostbound_lotus", "tessa_f", "consciousness_match")
+TALENT_FLAGS = BASE_FLAGS + COMBAT_FLAGS
+
+# Количество нефритов в сборке
+JADE_COUNT = 6
+
+# Строковые значения флагов, которые считаются включенными (для CSV и JSON)
+_TRUE_STRINGS = frozenset({"1", "true", "yes", "on", "да"})
+
+
+def _parse_flag(value: Any) -> bool:
+    """Приводит значение флага из файла к bool: строки сравниваются с _TRUE_STRINGS."""
+    if isinstance(value, str):
+        return value.strip().lower() in _TRUE_STRINGS
+    return bool(value)
+
+
+class Build:
+    """Сборка персонажа: все входные данные для расчета урона."""
+
+    __slots__ = ("consciousness", "hero_level", "jades") + TALENT_FLAGS
+
+    def __init__(self,
+                 consciousness: float = DEFAULT_CONSCIOUSNESS,
+                 hero_level: int = DEFAULT_HERO_LEVEL,
+                 jades: Optional[List[JadeConfig]] = None,
+                 **flags: bool):
+        """
+        Инициализация сборки.
+
+        Args:
+            consciousness: Значение сознания
+            hero_level: Уровень героя
+            jades: Список конфигураций нефритов (по умолчанию шесть пустых)
+            **flags: Таланты и боевые параметры из TALENT_FLAGS
+        """
+        unknown = set(flags) - set(TALENT_FLAGS)
+        if unknown:
+            raise ValueError(f"Неизвестные параметры сборки: {', '.join(sorted(unknown))}")
+
+        self.consciousness = float(consciousness)
+        self.hero_level = int(hero_level)
+        self.jades = jades if jades is not None else [JadeConfig(i) for i in range(JADE_COUNT)]
+
+        for name in TALENT_FLAGS:
+            setattr(self, name, bool(flags.get(name, False)))
+
+    @classmethod
+    def from_model(cls, model) -> "Build":
+        """
+        Снять сборку с текущего состояния модели.
+
+        Args:
+            model: Модель расчета урона
+
+        Returns:
+            Сборка с копией нефритов модели
+        """
+        jades = [JadeConfig.from_stats(jade.index, jade.get_stats()) for jade in model.jade_configs]
+        flags = {name: getattr(model, name) for name in TALENT_FLAGS}
+        return cls(model.consciousness, model.hero_level, jades, **flags)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Build":
+        """
+        Создать сборку из словаря (строки JSONL или CSV).
+
+        Недостающие поля берут значения по умолчанию. Флаги могут быть bool,
+        числами или строками ("1", "true", "да"); нефриты - списком списков
+        статов [["Атака", "10"], ...], недостающие нефриты пустые.
+
+        Args:
+            data: Словарь с полями consciousness, hero_level, jades и флагами из TALENT_FLAGS
+
+        Returns:
+            Сборка
+        """
+        data = dict(data)
+        consciousness = data.pop("consciousness", DEFAULT_CONSCIOUSNESS)
+        hero_level = data.pop("hero_level", DEFAULT_HERO_LEVEL)
+        jade_stats = data.pop("jades", None) or []
+        if len(jade_stats) > JADE_COUNT:
+            raise ValueError(f"В сборке не может быть больше {JADE_COUNT} нефритов")
+
+        jades = [JadeConfig.from_stats(i, stats) for i, stats in enumerate(jade_stats)]
+        jades.extend(JadeConfig(i) for i in range(len(jades), JADE_COUNT))
+
+        flags = {name: _parse_flag(value) for name, value in data.items()}
+        return cls(float(consciousness), int(float(hero_level)), jades, **flags)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Представить сборку словарем в формате from_dict.
+
+        Returns:
+            Словарь, пригодный для записи в JSON
+        """
+        data = {"consciousness": self.consciousness, "hero_level": self.hero_level}
+        for name in TALENT_FLAGS:
+            data[name] = getattr(self, name)
+        data["jades"] = [[list(stat) for stat in jade.get_stats()] for jade in self.jades]
+        return data
+
+    def apply_to(self, model) -> None:
+        """
+        Перенести сборку в модель.
+
+        Статы нефритов копируются в существующие конфигурации модели, поэтому
+        связанные с ними элементы интерфейса остаются валидными.
+
+        Args:
+            model: Модель расчета урона
+        """
+        model.set_consciousness(self.consciousness)
+        model.set_hero_level(self.hero_level)
+        model.set_base_params(*(getattr(self, name) for name in BASE_FLAGS))
+        model.set_combat_params(*(getattr(self, name) for name in COMBAT_FLAGS), True)
+
+        for target, source in zip(model.jade_configs, self.jades):
+            target.set_stats(source.get_stats())
+
+    def __repr__(self) -> str:
+        flags = ", ".join(name for name in TALENT_FLAGS if getattr(self, name))
+        return f"Build(consciousness={self.consciousness}, hero_level={self.hero_level}, flags=[{flags}])"
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Потоковый расчет файлов со сборками (JSONL и CSV).
+
+Файл читается построчно, строки группируются в куски, куски считаются в
+пуле процессов (models.pool.ordered_map) и записываются в выходной файл в
+исходном порядке. В памяти одновременно находится лишь несколько кусков,
+поэтому размер файла не ограничен.
+
+Формат строки JSONL - объект Build.to_dict() с необязательным полем "id".
+В CSV те же поля - столбцы, а столбец "jades" содержит список нефритов в
+виде JSON.
+"""
+
+import csv
+import io
+import json
+import sys
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from models.batch import OUTPUT_KEYS
+from models.build import Build
+from models.cache import CachedCalculator
+from models.damage_calculator import DamageCalculatorModel
+from models.pool import ordered_map
+
+
+# Поддерживаемые форматы файлов
+FORMATS = ("jsonl", "csv")
+
+# Строк в одном куске по умолчанию
+DEFAULT_CHUNK_SIZE = 500
+
+# Модель процесса с кешем: переиспользуется для всех сборок, повторяющиеся сборки берутся из кеша
+_calculator: Optional[CachedCalculator] = None
+
+
+def detect_format(path: str, default: str = "jsonl") -> str:
+    """
+    Определить формат файла по расширению.
+
+    Args:
+        path: Путь к файлу ("-" - стандартный поток)
+        default: Формат, если расширение не распознано
+
+    Returns:
+        "jsonl" или "csv"
+    """
+    return "csv" if path.lower().endswith(".csv") else default
+
+
+def output_fields(trace: bool) -> List[str]:
+    """
+    Поля выходной записи.
+
+    Args:
+        trace: Добавлять ли текст расчета
+
+    Returns:
+        Список полей: id, результаты calculate() и, если нужно, calculation_steps
+    """
+    return ["id", *OUTPUT_KEYS] + (["calculation_steps"] if trace else [])
+
+
+def iter_records(file: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Перебирает записи входного файла без разбора JSON.
+
+    Разбор строк JSONL выполняется в процессах пула, поэтому здесь строки
+    только нумеруются.
+
+    Args:
+        file: Открытый входной файл
+        fmt: Формат файла
+
+    Yields:
+        Пары (номер строки, строка JSONL или словарь строки CSV)
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(file)
+        for record in reader:
+            yield reader.line_num, record
+    else:
+        for line_number, line in enumerate(file, 1):
+            if line.strip():
+                yield line_number, line
+
+
+def _parse_record(record: Any, fmt: str) -> Dict[str, Any]:
+    """Приводит запись файла к словарю для Build.from_dict."""
+    if fmt == "csv":
+        data = {key: value for key, value in record.items() if value not in (None, "")}
+        if "jades" in data:
+            data["jades"] = json.loads(data["jades"])
+        return data
+    return json.loads(record)
+
+
+def evaluate_record(data: Dict[str, Any], trace: bool) -> Dict[str, Any]:
+    """
+    Рассчитать одну сборку.
+
+    Args:
+        data: Сборка в формате Build.from_dict с необязательным полем "id"
+        trace: Добавлять ли текст расчета
+
+    Returns:
+        Выходная запись с полями output_fields(trace)
+    """
+    global _calculator
+    data = dict(data)
+    record_id = data.pop("id", None)
+    build = Build.from_dict(data)
+
+    if _calculator is None:
+        _calculator = CachedCalculator(DamageCalculatorModel.from_build(build))
+    else:
+        build.apply_to(_calculator.model)
+
+    results = _calculator.calculate(trace=trace)
+    output = {"id": record_id}
+    for key in OUTPUT_KEYS:
+        output[key] = results[key]
+    if trace:
+        output["calculation_steps"] = str(results["calculation_steps"])
+    return output
+
+
+def _evaluate_chunk(task) -> Tuple[str, int, List[str]]:
+    """
+    Задача процесса пула: рассчитать кусок записей и отформатировать результат.
+
+    Returns:
+        Текст для выходного файла, число рассчитанных записей и сообщения об ошибках
+    """
+    records, input_format, output_format, trace = task
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, output_fields(trace), lineterminator="\n") if output_format == "csv" else None
+    errors = []
+    done = 0
+
+    for line_number, record in records:
+        try:
+            data = _parse_record(record, input_format)
+            data.setdefault("id", line_number)
+            output = evaluate_record(data, trace)
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            errors.append(f"Строка {line_number}: {e}")
+            continue
+
+        if writer is not None:
+            writer.writerow(output)
+        else:
+            buffer.write(json.dumps(output, ensure_ascii=False))
+            buffer.write("\n")
+        done += 1
+
+    return buffer.getvalue(), done, errors
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    """Разбивает итератор на списки длины size."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def evaluate_stream(source: TextIO,
+                    target: TextIO,
+                    input_format: str = "jsonl",
+                    output_format: str = "jsonl",
+                    trace: bool = False,
+                    workers: Optional[int] = 1,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    errors: TextIO = sys.stderr) -> Tuple[int, int]:
+    """
+    Рассчитать все сборки входного потока и записать результаты.
+
+    Args:
+        source: Входной поток
+        target: Выходной поток
+        input_format: Формат входа ("jsonl" или "csv")
+        output_format: Формат выхода ("jsonl" или "csv")
+        trace: Добавлять ли текст расчета
+        workers: Число процессов (None - по числу ядер, 1 - в текущем процессе)
+        chunk_size: Строк в одном куске
+        errors: Поток для сообщений о строках, которые не удалось рассчитать
+
+    Returns:
+        Пара (рассчитано строк, строк с ошибками)
+    """
+    for fmt in (input_format, output_format):
+        if fmt not in FORMATS:
+            raise ValueError(f"Неизвестный формат: {fmt}")
+
+    if output_format == "csv":
+        target.write(",".join(output_fields(trace)) + "\n")
+
+    tasks = ((chunk, input_format, output_format, trace)
+             for chunk in _chunks(iter_records(source, input_format), chunk_size))
+    done = failed = 0
+    for text, chunk_done, chunk_errors in ordered_map(_evaluate_chunk, tasks, workers):
+        target.write(text)
+        for message in chunk_errors:
+            print(message, file=errors)
+        done += chunk_done
+        failed += len(chunk_errors)
+    return done, failed
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Кеш результатов расчета урона.
+
+Игроки часто нажимают "Рассчитать урон" повторно и переключают таланты
+туда и обратно, а в пакетных файлах много одинаковых сборок. Кеш хранит
+результаты DamageCalculatorModel.calculate() для последних сборок по их
+каноническому ключу (DamageCalculatorModel.fingerprint()), поэтому
+повторный расчет сводится к поиску в словаре. Отчет о приросте от
+улучшений (models.marginal) хранится вместе с результатами по тому же ключу.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from models.damage_calculator import DamageCalculatorModel
+from models.marginal import MarginalGain, marginal_gains
+
+
+# Размер кеша по умолчанию
+DEFAULT_CACHE_SIZE = 1024
+
+
+class CachedCalculator:
+    """LRU-кеш перед DamageCalculatorModel.calculate()."""
+
+    def __init__(self, model: DamageCalculatorModel, maxsize: int = DEFAULT_CACHE_SIZE):
+        """
+        Инициализация кеша.
+
+        Args:
+            model: Модель, входные данные которой используются для расчета
+            maxsize: Наибольшее число хранимых результатов
+        """
+        if maxsize <= 0:
+            raise ValueError("Размер кеша должен быть положительным")
+
+        self.model = model
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        # Отчеты о приросте для ключей из _entries (вытесняются вместе с ними) и
+        # статы нефритов, для которых они построены
+        self._gains: Dict[tuple, Tuple[tuple, List[MarginalGain]]] = {}
+
+        # Счетчики обращений
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def calculate(self, trace: bool = True) -> Dict[str, Any]:
+        """
+        Получить результаты расчета для текущих входных данных модели.
+
+        Результат без трассы переиспользуется и для запроса с трассой: трасса
+        достраивается моделью, а запрос считается промахом.
+
+        Args:
+            trace: Нужна ли трасса расчета (см. DamageCalculatorModel.calculate)
+
+        Returns:
+            Копия словаря результатов
+        """
+        key = self.model.fingerprint()
+        entries = self._entries
+        entry = entries.get(key)
+
+        if entry is not None and (not trace or entry["calculation_steps"] is not None):
+            entries.move_to_end(key)
+            self.hits += 1
+            results = dict(entry)
+            if not trace:
+                results["calculation_steps"] = None
+            return results
+
+        self.misses += 1
+        entry = self.model.calculate(trace=trace)
+        entries[key] = entry
+        entries.move_to_end(key)
+        if len(entries) > self.maxsize:
+            evicted, _ = entries.popitem(last=False)
+            self._gains.pop(evicted, None)
+            self.evictions += 1
+        return dict(entry)
+
+    def marginal_gains(self) -> List[MarginalGain]:
+        """
+        Получить отчет о приросте от улучшений для текущих входных данных модели.
+
+        Отчет считается один раз для сборки и хранится вместе с ее
+        результатами, поэтому повторный показ той же сборки не пересчитывает
+        модель. Ключ результатов содержит только суммы бонусов нефритов, а
+        улучшения слияния зависят от ячеек каждого нефрита, поэтому отчет
+        переиспользуется, только если совпадают и статы нефритов.
+
+        Returns:
+            Приросты (models.marginal.marginal_gains)
+        """
+        key = self.model.fingerprint()
+        jades = tuple(tuple(jade.get_stats()) for jade in self.model.jade_configs)
+        cached = self._gains.get(key)
+        if cached is not None and cached[0] == jades:
+            return cached[1]
+
+        gains = marginal_gains(self.model)
+        # Отчет хранится, только пока в кеше есть результаты этой сборки
+        if key in self._entries:
+            self._gains[key] = (jades, gains)
+        return gains
+
+    def clear(self) -> None:
+        """Очищает кеш; счетчики сохраняются."""
+        self._entries.clear()
+        self._gains.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Получить статистику кеша.
+
+        Returns:
+            Словарь с числом попаданий, промахов, вытеснений и текущим размером
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -6,19 +6,106 @@
 Содержит всю логику расчета параметров и урона.
 """
 
-import tkinter as tk
 from typing import List, Dict, Any, Optional, Tuple
 
-from config import (
-    BASE_ATTACK, EXPLOSION_COEF, FLOWER_EXPLOSION_COEF,
-    JADE_FIRST_BLAST_MULTIPLIER, JADE_OTHER_BLAST_MULTIPLIER,
-    TALENT_VALUES, DEFAULT_HERO_LEVEL, HERO_LEVEL_ATTACK_BONUS
+from config import DEFAULT_HERO_LEVEL
+from models.build import TALENT_FLAGS
+from models.jade import JadeConfig, calculate_jade_bonuses, jade_revision
+from models.ruleset import DEFAULT_RULESET
+from models.specialize import Evaluator, compile_evaluator
+from models.trace import CalculationTrace
+
+
+# Узлы графа расчета в порядке вычисления
+NODES = (
+    "jade_bonuses", "hero_level_bonus",
+    "base_attack", "base_ice_blast",
+    "combat_attack", "final_ice_blast",
+    "boss", "monster",
+    "jade_boss", "jade_monster",
 )
-from models.jade import JadeConfig, calculate_jade_bonuses
+
+# Прямые зависимости узлов от входных параметров и других узлов.
+# Набор правил (ruleset) - тоже вход: его замена пересчитывает все узлы, кроме бонусов нефритов
+NODE_DEPENDENCIES = {
+    "jade_bonuses": ("jade_configs",),
+    "hero_level_bonus": ("hero_level", "ruleset"),
+    "base_attack": ("consciousness", "hero_level_bonus", "untouchable_talent", "power", "jade_bonuses",
+                    "ruleset"),
+    "base_ice_blast": ("ice_root", "ice_flash", "jade_bonuses", "ruleset"),
+    "combat_attack": ("base_attack", "aroma_aura", "frost_seal", "tundra_power", "frostbound_lotus",
+                      "tessa_f", "consciousness_match", "ruleset"),
+    "final_ice_blast": ("base_ice_blast", "frost_bloom", "ruleset"),
+    "boss": ("combat_attack", "final_ice_blast", "jade_bonuses", "ruleset"),
+    "monster": ("combat_attack", "final_ice_blast", "jade_bonuses", "ruleset"),
+    "jade_boss": ("boss", "ruleset"),
+    "jade_monster": ("monster", "ruleset"),
+}
+
+
+def _collect_downstream() -> Dict[str, frozenset]:
+    """
+    Строит для каждого входа и узла множество всех зависящих от него узлов.
+
+    Returns:
+        Словарь: имя входа или узла -> узлы, которые нужно пересчитать при его изменении
+    """
+    downstream = {}
+    for node in reversed(NODES):
+        for dependency in NODE_DEPENDENCIES[node]:
+            downstream.setdefault(dependency, set()).update({node}, downstream.get(node, ()))
+    return {name: frozenset(nodes) for name, nodes in downstream.items()}
+
+
+DOWNSTREAM = _collect_downstream()
+
+
+class _Input:
+    """Входной параметр модели: при изменении помечает зависимые узлы устаревшими."""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.downstream = DOWNSTREAM.get(name, frozenset())
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance.__dict__[self.name]
+
+    def __set__(self, instance, value):
+        values = instance.__dict__
+        old = values.get(self.name, _Input)
+        if old is value or (type(old) is type(value) and old == value):
+            return
+        values[self.name] = value
+        instance._dirty |= self.downstream
 
 
 class DamageCalculatorModel:
-    """Класс для расчета урона и показателей персонажа."""
+    """
+    Класс для расчета урона и показателей персонажа.
+
+    Расчет устроен как граф кешируемых узлов (NODES). Изменение входного
+    параметра помечает устаревшими только зависящие от него узлы, и
+    calculate() пересчитывает лишь их. Константы берутся из скомпилированного
+    набора правил (models.ruleset) и складываются в его каноническом порядке.
+    """
+
+    ruleset = _Input()
+    consciousness = _Input()
+    hero_level = _Input()
+    jade_configs = _Input()
+    untouchable_talent = _Input()
+    power = _Input()
+    ice_root = _Input()
+    ice_flash = _Input()
+    aroma_aura = _Input()
+    frost_bloom = _Input()
+    frost_seal = _Input()
+    tundra_power = _Input()
+    frostbound_lotus = _Input()
+    tessa_f = _Input()
+    consciousness_match = _Input()
 
     def __init__(self, jade_configs: List[JadeConfig]):
         """
@@ -27,6 +114,14 @@ class DamageCalculatorModel:
         Args:
             jade_configs: Список конфигураций нефритов
         """
+        # Устаревшие узлы графа и номер изменения нефритов, с которым считались бонусы
+        self._dirty = set(NODES)
+        self._jade_revision = -1
+
+        # Набор правил расчета (можно заменить на лету) и маска включенных талантов для его таблиц
+        self.ruleset = DEFAULT_RULESET
+        self.talent_mask = 0
+
         self.consciousness = 0.0
         self.hero_level = DEFAULT_HERO_LEVEL  # Добавляем уровень героя
         self.jade_configs = jade_configs
@@ -79,8 +174,37 @@ class DamageCalculatorModel:
         self.jade_third_blast_monster = 0
         self.jade_total_damage_monster = 0
 
-        # Расчетные шаги для подробного вывода
-        self.calculation_steps = []
+        # Промежуточные значения узлов, нужные для трассы
+        self.jade_bonuses: Dict[str, float] = {}
+        self._jade_key: Tuple = ()
+        self.jade_attack_bonus = 0.0
+        self.jade_ice_blast_bonus = 0.0
+        self.hero_level_bonus = 0.0
+        self.base_attack_bonus = 0.0
+        self.combat_attack_bonus = 0.0
+        self.tessa_multiplier = 1.0
+        self.consciousness_match_multiplier = 1.0
+        self.base_final_attack = 0.0
+        self.boss_physical_damage = 0.0
+        self.monster_physical_damage = 0.0
+
+        # Трасса последнего расчета для подробного вывода
+        self.calculation_steps: Optional[CalculationTrace] = None
+
+    @classmethod
+    def from_build(cls, build) -> "DamageCalculatorModel":
+        """
+        Создать модель для расчета заданной сборки без интерфейса.
+
+        Args:
+            build: Сборка персонажа (models.build.Build)
+
+        Returns:
+            Модель, использующая нефриты сборки
+        """
+        model = cls(build.jades)
+        build.apply_to(model)
+        return model
 
     def set_consciousness(self, value: float) -> None:
         """
@@ -100,6 +224,15 @@ class DamageCalculatorModel:
         """
         self.hero_level = value
 
+    def set_ruleset(self, ruleset) -> None:
+        """
+        Заменить набор правил расчета (все узлы, кроме бонусов нефритов, пересчитаются).
+
+        Args:
+            ruleset: Набор правил (models.ruleset.Ruleset)
+        """
+        self.ruleset = ruleset
+
     def set_base_params(self,
                         untouchable_talent: bool,
                         power: bool,
@@ -151,6 +284,11 @@ class DamageCalculatorModel:
         # Параметр jade_active игнорируется, нефрит всегда активен
         self.jade_active = True
 
+    def invalidate(self) -> None:
+        """Помечает все узлы устаревшими, чтобы следующий расчет выполнился полностью."""
+        self._dirty.update(NODES)
+        self.calculation_steps = None
+
     # Функция для расчета бонуса атаки по уровню героя
     def calculate_hero_level_bonus(self) -> float:
         """
@@ -159,44 +297,51 @@ class DamageCalculatorModel:
         Returns:
             Бонус атаки от уровня героя (от 0 до 0.12)
         """
-        bonus = 0.0
-        for level, value in sorted(HERO_LEVEL_ATTACK_BONUS.items()):
-            if self.hero_level >= level:
-                bonus += value
-        return bonus
+        return self.ruleset.hero_level_bonus(self.hero_level)
 
-    def calculate(self) -> Dict[str, Any]:
+    def calculate(self, trace: bool = True) -> Dict[str, Any]:
         """
         Выполнить расчет урона и всех параметров.
 
+        Пересчитываются только узлы, устаревшие после изменения входных данных.
+
+        Args:
+            trace: Записывать ли трассу расчета. Без трассы расчет заметно
+                быстрее, что важно для массовых вычислений.
+
         Returns:
-            Словарь с результатами расчетов
+            Словарь с результатами расчетов. Ключ "calculation_steps" содержит
+            CalculationTrace (текст собирается при первом обращении) или None
         """
-        self.calculation_steps = []
+        self._sync_jade_revision()
 
-        # Добавляем входные данные в шаги расчета
-        self._add_input_data()
+        dirty = self._dirty
+        if dirty:
+            if "jade_bonuses" in dirty:
+                self._update_jade_bonuses()
+            if "hero_level_bonus" in dirty:
+                self.hero_level_bonus = self.calculate_hero_level_bonus()
+            self.talent_mask = self.ruleset.talent_mask(self.__dict__)
 
-        # Получаем бонусы от нефритов
-        jade_bonuses = calculate_jade_bonuses(self.jade_configs)
-        jade_attack_bonus = jade_bonuses.get("Атака", 0.0)
-        jade_ice_blast_bonus = jade_bonuses.get("Лед. взрыв", 0.0)
-        jade_boss_attack_bonus = jade_bonuses.get("Атака по боссу", 0.0)
-        jade_monster_attack_bonus = jade_bonuses.get("Атака по монстрам", 0.0)
+            # Расчет базовых параметров
+            self._calculate_base_parameters(dirty)
 
-        # Расчет базовых параметров
-        self._calculate_base_parameters(jade_attack_bonus, jade_ice_blast_bonus)
+            # Расчет боевых параметров
+            self._calculate_combat_parameters(dirty)
 
-        # Расчет боевых параметров
-        self._calculate_combat_parameters(
-            jade_attack_bonus,
-            jade_ice_blast_bonus,
-            jade_boss_attack_bonus,
-            jade_monster_attack_bonus
-        )
+            # Расчет урона с нефритом (3 взрыва) - для боссов и монстров
+            self._calculate_jade_damage(dirty)
 
-        # Расчет урона с нефритом (3 взрыва) - для боссов и монстров
-        self._calculate_jade_damage()
+            dirty.clear()
+            self.calculation_steps = None
+
+        # Трасса строится по значениям узлов и переиспользуется, пока они не изменились
+        if trace:
+            if self.calculation_steps is None:
+                self.calculation_steps = self._build_trace()
+            steps = self.calculation_steps
+        else:
+            steps = None
 
         # Возвращаем результаты расчетов
         return {
@@ -226,384 +371,389 @@ class DamageCalculatorModel:
             "jade_third_blast_monster": self.jade_third_blast_monster,
             "jade_total_damage_monster": self.jade_total_damage_monster,
 
-            "calculation_steps": "\n".join(self.calculation_steps)
+            "calculation_steps": steps
         }
 
-    def _add_input_data(self) -> None:
-        """Добавляет информацию о входных данных в шаги расчета."""
-        self.calculation_steps.append("ВХОДНЫЕ ДАННЫЕ:")
-        self.calculation_steps.append(f"Сознание: {self.consciousness}")
-        self.calculation_steps.append(f"Уровень героя: {self.hero_level}")
-        self.calculation_steps.append(f"База атаки: {BASE_ATTACK}")
-        self.calculation_steps.append(f"Коэффициент взрыва: {EXPLOSION_COEF}")
-        self.calculation_steps.append(f"Коэффициент цветочного взрыва: {FLOWER_EXPLOSION_COEF}")
-        # Нефрит всегда активен, но сохраняем информацию в расчетах
-        self.calculation_steps.append(f"Нефрит (3 взрыва): Активен")
-        # Добавляем информацию о совпадении уровня сознания
-        self.calculation_steps.append(
-            f"Совпадение уровня сознания: {'Активно' if self.consciousness_match else 'Неактивно'}")
-
-        # Получаем бонусы от нефритов для отображения
-        jade_bonuses = calculate_jade_bonuses(self.jade_configs)
-        jade_attack_bonus = jade_bonuses.get("Атака", 0.0)
-        jade_ice_blast_bonus = jade_bonuses.get("Лед. взрыв", 0.0)
-        jade_boss_attack_bonus = jade_bonuses.get("Атака по боссу", 0.0)
-        jade_monster_attack_bonus = jade_bonuses.get("Атака по монстрам", 0.0)
-
-        self.calculation_steps.append(
-            f"Бонус атаки от нефритов: {jade_attack_bonus:.2f} ({jade_attack_bonus * 100:.0f}%)"
-        )
-        self.calculation_steps.append(
-            f"Бонус лед. взрыва от нефритов: {jade_ice_blast_bonus:.2f} ({jade_ice_blast_bonus * 100:.0f}%)"
-        )
-        self.calculation_steps.append(
-            f"Бонус атаки по боссам от нефритов: {jade_boss_attack_bonus:.2f} ({jade_boss_attack_bonus * 100:.0f}%)"
-        )
-        self.calculation_steps.append(
-            f"Бонус атаки по монстрам от нефритов: {jade_monster_attack_bonus:.2f} ({jade_monster_attack_bonus * 100:.0f}%)"
-        )
-        self.calculation_steps.append("")
-
-    def _calculate_base_parameters(self, jade_attack_bonus: float, jade_ice_blast_bonus: float) -> None:
+    def fingerprint(self) -> Tuple:
         """
-        Рассчитывает базовые параметры персонажа (без боевых бонусов).
+        Канонический ключ входных данных для кеширования результатов.
 
-        Args:
-            jade_attack_bonus: Бонус атаки от нефритов
-            jade_ice_blast_bonus: Бонус процента ледяного взрыва от нефритов
-        """
-        self.calculation_steps.append("РАСЧЕТ БАЗОВЫХ ПАРАМЕТРОВ:")
-        self.calculation_steps.append("Формула атаки: (база атаки + (сознание/10)) * (1 + бонусы)")
-        self.calculation_steps.append("")
+        Нефриты входят в ключ суммарными бонусами по типам статов после
+        слияний: от них и только от них зависит расчет, поэтому сборки с
+        одинаковым набором статов (в том числе в другом порядке нефритов или
+        ячеек) получают один ключ, а закешированный результат всегда
+        совпадает с прямым расчетом.
 
-        # Расчет базового бонуса атаки
-        base_attack_bonus = 1.0
-        self.calculation_steps.append("Базовый бонус атаки: 1.0")
+        Набор правил входит в ключ своим ключом (версия и отпечаток значений),
+        поэтому после замены правил старые результаты не используются.
 
-        # Добавляем бонус от уровня героя
-        hero_level_bonus = self.calculate_hero_level_bonus()
-        if hero_level_bonus > 0:
-            base_attack_bonus += hero_level_bonus
-            self.calculation_steps.append(f"+ Бонус атаки от уровня героя ({self.hero_level}): {hero_level_bonus}")
+        Returns:
+            Кортеж (ключ набора правил, сознание, уровень героя, флаги TALENT_FLAGS, бонусы нефритов)
+        """
+        self._sync_jade_revision()
+        if "jade_bonuses" in self._dirty:
+            # Узлы ниже по графу остаются устаревшими и пересчитаются при calculate()
+            self._update_jade_bonuses()
+            self._dirty.discard("jade_bonuses")
+
+        # Значения входов _Input хранятся в __dict__ экземпляра
+        values = self.__dict__
+        return (values["ruleset"].key, values["consciousness"], values["hero_level"],
+                tuple(map(values.__getitem__, TALENT_FLAGS)), self._jade_key)
+
+    def specialize(self, verify: bool = True) -> Evaluator:
+        """
+        Получить вычислитель, специализированный под текущие таланты, уровень героя и правила.
 
-        if self.untouchable_talent:
-            base_attack_bonus += TALENT_VALUES["untouchable_talent"]
-            self.calculation_steps.append(f"+ Талант неприкосновенности: {TALENT_VALUES['untouchable_talent']}")
+        Вычислитель принимает только сознание и суммы бонусов нефритов и
+        подходит для перебора этих величин при неизменных переключателях.
 
-        if self.power:
-            base_attack_bonus += TALENT_VALUES["power"]
-            self.calculation_steps.append(f"+ Мощь: {TALENT_VALUES['power']}")
-
-        # Добавляем бонус атаки от нефритов
-        if jade_attack_bonus > 0:
-            base_attack_bonus += jade_attack_bonus
-            self.calculation_steps.append(f"+ Статы атаки на нефритах: {jade_attack_bonus:.2f}")
-
-        self.calculation_steps.append(f"Итоговый базовый бонус атаки: {base_attack_bonus:.2f}")
-        self.calculation_steps.append("")
-
-        # Расчет базовой атаки
-        self.base_attack = (BASE_ATTACK + (self.consciousness / 10)) * base_attack_bonus
-        self.calculation_steps.append("Расчет базовой атаки:")
-        self.calculation_steps.append(
-            f"({BASE_ATTACK} + ({self.consciousness}/10)) * {base_attack_bonus:.2f} = {self.base_attack:.2f}"
-        )
-        self.calculation_steps.append("")
-
-        # Расчет базового % ледяного взрыва
-        self.base_ice_blast_percent = 1.0
-        self.calculation_steps.append("Расчет базового % ледяного взрыва:")
-        self.calculation_steps.append("Базовый % ледяного взрыва: 1.0 (100%)")
+        Args:
+            verify: Сверить результат вычислителя на текущих входных данных с calculate()
 
-        if self.ice_root:
-            self.base_ice_blast_percent += TALENT_VALUES["ice_root"]
-            self.calculation_steps.append(f"+ Ледяной корень: {TALENT_VALUES['ice_root']}")
+        Returns:
+            Функция evaluate(consciousness, jade_attack=0.0, jade_ice_blast=0.0,
+            jade_boss_attack=0.0, jade_monster_attack=0.0) (см. models.specialize)
 
-        # Добавляем бонус ледяного взрыва от нефритов
-        if jade_ice_blast_bonus > 0:
-            self.base_ice_blast_percent += jade_ice_blast_bonus
-            self.calculation_steps.append(f"+ Статы %взрыва на нефритах: {jade_ice_blast_bonus:.2f}")
+        Raises:
+            RuntimeError: Если при проверке результаты разошлись
+        """
+        evaluator = compile_evaluator(self.ruleset, self.hero_level, self.__dict__)
+        if verify:
+            results = self.calculate(trace=False)
+            bonuses = self.jade_bonuses
+            specialized = evaluator(self.consciousness, bonuses.get("Атака", 0.0), bonuses.get("Лед. взрыв", 0.0),
+                                    bonuses.get("Атака по боссу", 0.0), bonuses.get("Атака по монстрам", 0.0))
+            mismatched = [key for key, value in specialized.items()
+                          if results[key] != value or type(results[key]) is not type(value)]
+            if mismatched:
+                raise RuntimeError(f"Специализированный вычислитель расходится с calculate(): {', '.join(mismatched)}")
+        return evaluator
+
+    def _sync_jade_revision(self) -> None:
+        """Статы нефритов меняются без ведома модели, поэтому сверяем номер изменения."""
+        revision = jade_revision()
+        if revision != self._jade_revision:
+            self._jade_revision = revision
+            self._dirty |= DOWNSTREAM["jade_configs"]
+
+    def _update_jade_bonuses(self) -> None:
+        """Пересчитывает бонусы от нефритов (узел jade_bonuses)."""
+        self.jade_bonuses = calculate_jade_bonuses(self.jade_configs)
+        self._jade_key = tuple(sorted(self.jade_bonuses.items()))
+        self.jade_attack_bonus = self.jade_bonuses.get("Атака", 0.0)
+        self.jade_ice_blast_bonus = self.jade_bonuses.get("Лед. взрыв", 0.0)
+        self.boss_attack_bonus = self.jade_bonuses.get("Атака по боссу", 0.0)
+        self.monster_attack_bonus = self.jade_bonuses.get("Атака по монстрам", 0.0)
+
+    def _calculate_base_parameters(self, dirty: set) -> None:
+        """
+        Рассчитывает базовые параметры персонажа (без боевых бонусов).
 
-        if self.ice_flash:
-            self.base_ice_blast_percent += TALENT_VALUES["ice_flash"]
-            self.calculation_steps.append(f"+ Ледяная вспышка: {TALENT_VALUES['ice_flash']}")
+        Args:
+            dirty: Устаревшие узлы графа
+        """
+        ruleset = self.ruleset
+        mask = self.talent_mask
+
+        if "base_attack" in dirty:
+            # Расчет базового бонуса атаки: уровень героя и таланты (Неприкосновенность, Мощь)
+            base_attack_bonus = 1.0 + self.hero_level_bonus
+            for value in ruleset.base_attack_terms[mask]:
+                base_attack_bonus += value
+
+            # Добавляем бонус атаки от нефритов
+            if self.jade_attack_bonus > 0:
+                base_attack_bonus += self.jade_attack_bonus
+
+            # Расчет базовой атаки
+            self.base_attack_bonus = base_attack_bonus
+            self.base_attack = (ruleset.base_attack + (self.consciousness / 10)) * base_attack_bonus
+
+        if "base_ice_blast" in dirty:
+            # Расчет базового % ледяного взрыва: Ледяной корень, нефриты, затем Ледяная вспышка
+            base_ice_blast_percent = 1.0
+            for value in ruleset.ice_blast_terms[mask]:
+                base_ice_blast_percent += value
+
+            # Добавляем бонус ледяного взрыва от нефритов
+            if self.jade_ice_blast_bonus > 0:
+                base_ice_blast_percent += self.jade_ice_blast_bonus
+
+            for value in ruleset.post_jade_ice_blast_terms[mask]:
+                base_ice_blast_percent += value
+            self.base_ice_blast_percent = base_ice_blast_percent
+
+    def _calculate_combat_parameters(self, dirty: set) -> None:
+        """
+        Рассчитывает боевые параметры персонажа и ветки для боссов и монстров.
 
-        self.calculation_steps.append(
-            f"Итоговый базовый % ледяного взрыва: {self.base_ice_blast_percent:.2f} "
-            f"({self.base_ice_blast_percent * 100:.0f}%)"
-        )
-        self.calculation_steps.append("")
+        Args:
+            dirty: Устаревшие узлы графа
+        """
+        ruleset = self.ruleset
+        mask = self.talent_mask
+
+        if "combat_attack" in dirty:
+            # Расчет боевого бонуса атаки: базовый бонус и боевые таланты
+            # (Аура Аромата, Морозная печать, Мощь тундры, Морозный лотос)
+            combat_attack_bonus = self.base_attack_bonus
+            for value in ruleset.combat_attack_terms[mask]:
+                combat_attack_bonus += value
+            self.combat_attack_bonus = combat_attack_bonus
+
+            # Учитываем F тессы
+            self.tessa_multiplier = ruleset.tessa_multipliers[mask]
+
+            # Расчет базовой боевой атаки
+            self.base_final_attack = (
+                (ruleset.base_attack + (self.consciousness / 10)) * combat_attack_bonus * self.tessa_multiplier)
+
+            # Применяем бонус от совпадения уровня сознания к АТАКЕ
+            self.consciousness_match_multiplier = ruleset.match_multipliers[mask]
+            self.final_attack = self.base_final_attack * self.consciousness_match_multiplier
+
+            # Расчет физического урона (базовая формула, без специализации)
+            self.physical_damage = self.final_attack
+
+        if "final_ice_blast" in dirty:
+            # Расчет итогового % ледяного взрыва: базовый % и Морозное цветение
+            final_ice_blast_percent = self.base_ice_blast_percent
+            for value in ruleset.combat_ice_blast_terms[mask]:
+                final_ice_blast_percent += value
+            self.final_ice_blast_percent = final_ice_blast_percent
 
-    def _calculate_combat_parameters(self,
-                                     jade_attack_bonus: float,
-                                     jade_ice_blast_bonus: float,
-                                     jade_boss_attack_bonus: float,
-                                     jade_monster_attack_bonus: float) -> None:
+        # =============== Расчет для боссов ================
+        if "boss" in dirty:
+            # Формула % ледяного взрыва: (1 * (1 + %атаки_по_боссу)) + другие_бонусы
+            self.boss_physical_damage = self.final_attack * (1 + self.boss_attack_bonus)
+            self.boss_ice_blast_percent = (1 * (1 + self.boss_attack_bonus)) + (self.final_ice_blast_percent - 1)
+            self.boss_damage = self.final_attack * self.boss_ice_blast_percent * ruleset.explosion_coef
+            self.boss_flower_damage = self.final_attack * self.boss_ice_blast_percent * ruleset.flower_explosion_coef
+
+        # =============== Расчет для обычных монстров ================
+        if "monster" in dirty:
+            # Формула % ледяного взрыва: (1 * (1 + %атаки_по_монстрам)) + другие_бонусы
+            self.monster_physical_damage = self.final_attack * (1 + self.monster_attack_bonus)
+            self.monster_ice_blast_percent = (
+                (1 * (1 + self.monster_attack_bonus)) + (self.final_ice_blast_percent - 1))
+            self.monster_damage = self.final_attack * self.monster_ice_blast_percent * ruleset.explosion_coef
+            self.monster_flower_damage = (
+                self.final_attack * self.monster_ice_blast_percent * ruleset.flower_explosion_coef)
+
+    def _calculate_jade_damage(self, dirty: set) -> None:
         """
-        Рассчитывает боевые параметры персонажа.
+        Рассчитывает урон с нефритом (3 взрыва) для боссов и монстров.
 
         Args:
-            jade_attack_bonus: Бонус атаки от нефритов
-            jade_ice_blast_bonus: Бонус процента ледяного взрыва от нефритов
-            jade_boss_attack_bonus: Бонус атаки по боссам от нефритов
-            jade_monster_attack_bonus: Бонус атаки по монстрам от нефритов
-        """
-        self.calculation_steps.append("РАСЧЕТ БОЕВЫХ ПАРАМЕТРОВ:")
-        self.calculation_steps.append(
-            "Формула атаки: (база атаки + (сознание/10)) * (1 + бонусы) * (1 + F тессы)"
-        )
-        self.calculation_steps.append("")
-
-        # Расчет боевого бонуса атаки
-        combat_attack_bonus = 1.0
-        self.calculation_steps.append("Боевой бонус атаки: 1.0")
-
-        # Добавляем бонус от уровня героя
-        hero_level_bonus = self.calculate_hero_level_bonus()
-        if hero_level_bonus > 0:
-            combat_attack_bonus += hero_level_bonus
-            self.calculation_steps.append(f"+ Бонус атаки от уровня героя ({self.hero_level}): {hero_level_bonus}")
-
-        if self.untouchable_talent:
-            combat_attack_bonus += TALENT_VALUES["untouchable_talent"]
-            self.calculation_steps.append(f"+ Талант неприкосновенности: {TALENT_VALUES['untouchable_talent']}")
+            dirty: Устаревшие узлы графа
+        """
+        ruleset = self.ruleset
 
-        if self.power:
-            combat_attack_bonus += TALENT_VALUES["power"]
-            self.calculation_steps.append(f"+ Мощь: {TALENT_VALUES['power']}")
+        # ============ Расчет урона по боссам ============
+        if "jade_boss" in dirty:
+            blast = self.final_attack * self.boss_ice_blast_percent * ruleset.explosion_coef
+            self.jade_first_blast_boss = round(blast * ruleset.jade_first_blast_multiplier)
+            self.jade_second_blast_boss = round(blast * ruleset.jade_other_blast_multiplier)
+            self.jade_third_blast_boss = self.jade_second_blast_boss  # Третий взрыв равен второму
+            self.jade_total_damage_boss = (
+                self.jade_first_blast_boss + self.jade_second_blast_boss + self.jade_third_blast_boss)
 
-        # Добавляем бонус атаки от нефритов
-        if jade_attack_bonus > 0:
-            combat_attack_bonus += jade_attack_bonus
-            self.calculation_steps.append(f"+ Статы атаки на нефритах: {jade_attack_bonus:.2f}")
+        # ============ Расчет урона по монстрам ============
+        if "jade_monster" in dirty:
+            blast = self.final_attack * self.monster_ice_blast_percent * ruleset.explosion_coef
+            self.jade_first_blast_monster = round(blast * ruleset.jade_first_blast_multiplier)
+            self.jade_second_blast_monster = round(blast * ruleset.jade_other_blast_multiplier)
+            self.jade_third_blast_monster = self.jade_second_blast_monster  # Третий взрыв равен второму
+            self.jade_total_damage_monster = (
+                self.jade_first_blast_monster + self.jade_second_blast_monster + self.jade_third_blast_monster)
+
+    def _build_trace(self) -> CalculationTrace:
+        """
+        Строит трассу расчета по текущим значениям узлов.
 
-        if self.aroma_aura:
-            combat_attack_bonus += TALENT_VALUES["aroma_aura"]
-            self.calculation_steps.append(f"+ Аура Аромата: {TALENT_VALUES['aroma_aura']}")
+        Returns:
+            Трасса расчета
+        """
+        steps = CalculationTrace()
+        self._add_input_data(steps)
+        self._trace_base_parameters(steps)
+        self._trace_combat_parameters(steps)
+        self._trace_jade_damage(steps)
+        return steps
+
+    def _add_input_data(self, steps: CalculationTrace) -> None:
+        """
+        Добавляет информацию о входных данных в шаги расчета.
 
-        if self.frost_seal:
-            combat_attack_bonus += TALENT_VALUES["frost_seal"]
-            self.calculation_steps.append(f"+ Морозная печать: {TALENT_VALUES['frost_seal']}")
+        Args:
+            steps: Трасса расчета
+        """
+        steps.extend((
+            ("input_header", ()),
+            ("input_consciousness", (self.consciousness,)),
+            ("input_hero_level", (self.hero_level,)),
+            ("input_base_attack", (self.ruleset.base_attack,)),
+            ("input_explosion_coef", (self.ruleset.explosion_coef,)),
+            ("input_flower_coef", (self.ruleset.flower_explosion_coef,)),
+            # Нефрит всегда активен, но сохраняем информацию в расчетах
+            ("input_jade_active", ()),
+            # Добавляем информацию о совпадении уровня сознания
+            ("input_match_on" if self.consciousness_match else "input_match_off", ()),
+            ("input_jade_attack", (self.jade_attack_bonus,)),
+            ("input_jade_ice_blast", (self.jade_ice_blast_bonus,)),
+            ("input_jade_boss_attack", (self.boss_attack_bonus,)),
+            ("input_jade_monster_attack", (self.monster_attack_bonus,)),
+            ("blank", ()),
+        ))
+
+    def _add_attack_bonus_terms(self, steps: CalculationTrace) -> None:
+        """
+        Добавляет в шаги расчета слагаемые бонуса атаки, общие для базовых и боевых параметров.
 
-        if self.tundra_power:
-            combat_attack_bonus += TALENT_VALUES["tundra_power"]
-            self.calculation_steps.append(f"+ Мощь тундры: {TALENT_VALUES['tundra_power']}")
+        Args:
+            steps: Трасса расчета
+        """
+        if self.hero_level_bonus > 0:
+            steps.add("add_hero_level", self.hero_level, self.hero_level_bonus)
+        if self.untouchable_talent:
+            steps.add("add_untouchable_talent", self.ruleset.talent("untouchable_talent"))
+        if self.power:
+            steps.add("add_power", self.ruleset.talent("power"))
+        if self.jade_attack_bonus > 0:
+            steps.add("add_jade_attack", self.jade_attack_bonus)
 
-        if self.frostbound_lotus:
-            combat_attack_bonus += TALENT_VALUES["frostbound_lotus"]
-            self.calculation_steps.append(f"+ Морозный лотос: {TALENT_VALUES['frostbound_lotus']}")
+    def _add_ice_blast_terms(self, steps: CalculationTrace) -> None:
+        """
+        Добавляет в шаги расчета слагаемые % ледяного взрыва, общие для базовых и боевых параметров.
 
-        self.calculation_steps.append(f"Итоговый боевой бонус атаки: {combat_attack_bonus:.2f}")
-        self.calculation_steps.append("")
+        Args:
+            steps: Трасса расчета
+        """
+        steps.add("ice_blast_start")
+        if self.ice_root:
+            steps.add("add_ice_root", self.ruleset.talent("ice_root"))
+        if self.jade_ice_blast_bonus > 0:
+            steps.add("add_jade_ice_blast", self.jade_ice_blast_bonus)
+        if self.ice_flash:
+            steps.add("add_ice_flash", self.ruleset.talent("ice_flash"))
 
-        # Учитываем F тессы
-        tessa_multiplier = TALENT_VALUES["tessa_f"] if self.tessa_f else 1.0
-        tessa_text = "активирован" if self.tessa_f else "не активирован"
-        self.calculation_steps.append(f"Множитель F тессы: {tessa_multiplier:.2f} ({tessa_text})")
+    def _trace_base_parameters(self, steps: CalculationTrace) -> None:
+        """
+        Добавляет в шаги расчета базовые параметры.
 
-        # Расчет базовой боевой атаки
-        base_final_attack = (BASE_ATTACK + (self.consciousness / 10)) * combat_attack_bonus * tessa_multiplier
+        Args:
+            steps: Трасса расчета
+        """
+        steps.add("base_header")
+        steps.add("base_formula")
+        steps.add("blank")
+        steps.add("base_bonus_start")
+        self._add_attack_bonus_terms(steps)
+        steps.add("base_bonus_total", self.base_attack_bonus)
+        steps.add("blank")
+        steps.add("base_attack_header")
+        steps.add("base_attack", self.ruleset.base_attack, self.consciousness, self.base_attack_bonus, self.base_attack)
+        steps.add("blank")
+        steps.add("base_ice_blast_header")
+        self._add_ice_blast_terms(steps)
+        steps.add("base_ice_blast_total", self.base_ice_blast_percent)
+        steps.add("blank")
+
+    def _trace_combat_parameters(self, steps: CalculationTrace) -> None:
+        """
+        Добавляет в шаги расчета боевые параметры и ветки для боссов и монстров.
 
-        # Применяем бонус от совпадения уровня сознания к атаке
-        consciousness_match_multiplier = TALENT_VALUES["consciousness_match"] if self.consciousness_match else 1.0
+        Args:
+            steps: Трасса расчета
+        """
+        steps.add("combat_header")
+        steps.add("combat_formula")
+        steps.add("blank")
+        steps.add("combat_bonus_start")
+        self._add_attack_bonus_terms(steps)
+        if self.aroma_aura:
+            steps.add("add_aroma_aura", self.ruleset.talent("aroma_aura"))
+        if self.frost_seal:
+            steps.add("add_frost_seal", self.ruleset.talent("frost_seal"))
+        if self.tundra_power:
+            steps.add("add_tundra_power", self.ruleset.talent("tundra_power"))
+        if self.frostbound_lotus:
+            steps.add("add_frostbound_lotus", self.ruleset.talent("frostbound_lotus"))
+        steps.add("combat_bonus_total", self.combat_attack_bonus)
+        steps.add("blank")
 
-        # Применяем бонус к АТАКЕ
+        steps.add("tessa_on" if self.tessa_f else "tessa_off", self.tessa_multiplier)
         if self.consciousness_match:
-            self.calculation_steps.append(
-                f"Бонус атаки от совпадения уровня сознания: +{(TALENT_VALUES['consciousness_match'] - 1.0) * 100:.0f}%")
-
-        self.final_attack = base_final_attack * consciousness_match_multiplier
+            steps.add("match_bonus", self.ruleset.talent("consciousness_match") - 1.0)
 
-        self.calculation_steps.append("Расчет боевой атаки:")
+        steps.add("final_attack_header")
         if self.consciousness_match:
-            self.calculation_steps.append(
-                f"({BASE_ATTACK} + ({self.consciousness}/10)) * {combat_attack_bonus:.2f} * "
-                f"{tessa_multiplier:.2f} = {base_final_attack:.2f} (базовая атака)"
-            )
-            self.calculation_steps.append(
-                f"{base_final_attack:.2f} * {consciousness_match_multiplier:.2f} = {self.final_attack:.2f} (с учетом совпадения уровня сознания)"
-            )
+            steps.add("final_attack_base", self.ruleset.base_attack, self.consciousness, self.combat_attack_bonus,
+                      self.tessa_multiplier, self.base_final_attack)
+            steps.add("final_attack_match", self.base_final_attack, self.consciousness_match_multiplier,
+                      self.final_attack)
         else:
-            self.calculation_steps.append(
-                f"({BASE_ATTACK} + ({self.consciousness}/10)) * {combat_attack_bonus:.2f} * "
-                f"{tessa_multiplier:.2f} = {self.final_attack:.2f}"
-            )
-        self.calculation_steps.append("")
-
-        # Расчет физического урона (базовая формула, без специализации)
-        self.physical_damage = self.final_attack
-        self.calculation_steps.append("Расчет физического урона:")
-        self.calculation_steps.append(f"Физический урон = Атака = {self.final_attack:.2f}")
-        self.calculation_steps.append("")
-
-        # Расчет итогового % ледяного взрыва
-        self.final_ice_blast_percent = 1.0
-        self.calculation_steps.append("Расчет боевого % ледяного взрыва:")
-        self.calculation_steps.append("Базовый % ледяного взрыва: 1.0 (100%)")
+            steps.add("final_attack", self.ruleset.base_attack, self.consciousness, self.combat_attack_bonus,
+                      self.tessa_multiplier, self.final_attack)
+        steps.add("blank")
 
-        if self.ice_root:
-            self.final_ice_blast_percent += TALENT_VALUES["ice_root"]
-            self.calculation_steps.append(f"+ Ледяной корень: {TALENT_VALUES['ice_root']}")
-
-        # Добавляем бонус ледяного взрыва от нефритов
-        if jade_ice_blast_bonus > 0:
-            self.final_ice_blast_percent += jade_ice_blast_bonus
-            self.calculation_steps.append(f"+ Статы %взрыва на нефритах: {jade_ice_blast_bonus:.2f}")
-
-        if self.ice_flash:
-            self.final_ice_blast_percent += TALENT_VALUES["ice_flash"]
-            self.calculation_steps.append(f"+ Ледяная вспышка: {TALENT_VALUES['ice_flash']}")
+        steps.add("physical_header")
+        steps.add("physical", self.final_attack)
+        steps.add("blank")
 
+        steps.add("final_ice_blast_header")
+        self._add_ice_blast_terms(steps)
         if self.frost_bloom:
-            self.final_ice_blast_percent += TALENT_VALUES["frost_bloom"]
-            self.calculation_steps.append(f"+ Морозное цветение: {TALENT_VALUES['frost_bloom']}")
-
-        self.calculation_steps.append(
-            f"Итоговый боевой % ледяного взрыва: {self.final_ice_blast_percent:.2f} "
-            f"({self.final_ice_blast_percent * 100:.0f}%)"
-        )
-        self.calculation_steps.append("")
-
-        # =============== Расчет для боссов ================
-        self.calculation_steps.append("РАСЧЕТ ПАРАМЕТРОВ ПО БОССАМ:")
-
-        # Бонус атаки по боссам
-        self.boss_attack_bonus = jade_boss_attack_bonus
-        self.calculation_steps.append(
-            f"Бонус атаки по боссам: {self.boss_attack_bonus:.2f} ({self.boss_attack_bonus * 100:.0f}%)")
-
-        # Расчет физ урона по боссам
-        boss_physical_damage = self.final_attack * (1 + self.boss_attack_bonus)
-        self.calculation_steps.append("Расчет физического урона по боссам:")
-        self.calculation_steps.append(
-            f"{self.final_attack:.2f} * (1 + {self.boss_attack_bonus:.2f}) = {boss_physical_damage:.2f}")
-
-        # Расчет % ледяного взрыва по боссам
-        # Формула: (1 * (1 + %атаки_по_боссу)) + другие_бонусы
-        self.boss_ice_blast_percent = (1 * (1 + self.boss_attack_bonus)) + (self.final_ice_blast_percent - 1)
-
-        self.calculation_steps.append("Расчет % ледяного взрыва по боссам:")
-        self.calculation_steps.append(
-            f"(1 * (1 + {self.boss_attack_bonus:.2f})) + ({self.final_ice_blast_percent:.2f} - 1) = {self.boss_ice_blast_percent:.2f}")
-
-        # Расчет урона ледяного взрыва по боссам
-        self.boss_damage = self.final_attack * self.boss_ice_blast_percent * EXPLOSION_COEF
-
-        self.calculation_steps.append("Расчет урона ледяного взрыва по боссам:")
-        self.calculation_steps.append(
-            f"{self.final_attack:.2f} * {self.boss_ice_blast_percent:.2f} * {EXPLOSION_COEF} = {self.boss_damage:.2f}")
-
-        # Расчет урона цветочного взрыва по боссам
-        self.boss_flower_damage = self.final_attack * self.boss_ice_blast_percent * FLOWER_EXPLOSION_COEF
-
-        self.calculation_steps.append("Расчет урона цветочного взрыва по боссам:")
-        self.calculation_steps.append(
-            f"{self.final_attack:.2f} * {self.boss_ice_blast_percent:.2f} * {FLOWER_EXPLOSION_COEF} = {self.boss_flower_damage:.2f}")
-        self.calculation_steps.append("")
-
-        # =============== Расчет для обычных монстров ================
-        self.calculation_steps.append("РАСЧЕТ ПАРАМЕТРОВ ПО ОБЫЧНЫМ МОНСТРАМ:")
-
-        # Бонус атаки по монстрам
-        self.monster_attack_bonus = jade_monster_attack_bonus
-        self.calculation_steps.append(
-            f"Бонус атаки по монстрам: {self.monster_attack_bonus:.2f} ({self.monster_attack_bonus * 100:.0f}%)")
-
-        # Расчет физ урона по монстрам
-        monster_physical_damage = self.final_attack * (1 + self.monster_attack_bonus)
-        self.calculation_steps.append("Расчет физического урона по монстрам:")
-        self.calculation_steps.append(
-            f"{self.final_attack:.2f} * (1 + {self.monster_attack_bonus:.2f}) = {monster_physical_damage:.2f}")
-
-        # Расчет % ледяного взрыва по монстрам
-        # Формула: (1 * (1 + %атаки_по_монстрам)) + другие_бонусы
-        self.monster_ice_blast_percent = (1 * (1 + self.monster_attack_bonus)) + (self.final_ice_blast_percent - 1)
-
-        self.calculation_steps.append("Расчет % ледяного взрыва по монстрам:")
-        self.calculation_steps.append(
-            f"(1 * (1 + {self.monster_attack_bonus:.2f})) + ({self.final_ice_blast_percent:.2f} - 1) = {self.monster_ice_blast_percent:.2f}")
-
-        # Расчет урона ледяного взрыва по монстрам
-        self.monster_damage = self.final_attack * self.monster_ice_blast_percent * EXPLOSION_COEF
-
-        self.calculation_steps.append("Расчет урона ледяного взрыва по монстрам:")
-        self.calculation_steps.append(
-            f"{self.final_attack:.2f} * {self.monster_ice_blast_percent:.2f} * {EXPLOSION_COEF} = {self.monster_damage:.2f}")
-
-        # Расчет урона цветочного взрыва по монстрам
-        self.monster_flower_damage = self.final_attack * self.monster_ice_blast_percent * FLOWER_EXPLOSION_COEF
-
-        self.calculation_steps.append("Расчет урона цветочного взрыва по монстрам:")
-        self.calculation_steps.append(
-            f"{self.final_attack:.2f} * {self.monster_ice_blast_percent:.2f} * {FLOWER_EXPLOSION_COEF} = {self.monster_flower_damage:.2f}")
-        self.calculation_steps.append("")
-
-    def _calculate_jade_damage(self) -> None:
-        """Рассчитывает урон с нефритом (3 взрыва) для боссов и монстров."""
-        self.calculation_steps.append("РАСЧЕТ УРОНА С НЕФРИТОМ (3 ВЗРЫВА):")
-
-        # Коэффициенты для взрывов с нефритом
-        first_blast_coef = EXPLOSION_COEF * JADE_FIRST_BLAST_MULTIPLIER
-        other_blast_coef = EXPLOSION_COEF * JADE_OTHER_BLAST_MULTIPLIER
-
-        self.calculation_steps.append("Формула для первого взрыва:")
-        self.calculation_steps.append(
-            f"Округлить(Атака * %ЛедВзрыва * {EXPLOSION_COEF} * {JADE_FIRST_BLAST_MULTIPLIER})")
-        self.calculation_steps.append("")
-
-        self.calculation_steps.append("Формула для второго/третьего взрыва:")
-        self.calculation_steps.append(
-            f"Округлить(Атака * %ЛедВзрыва * {EXPLOSION_COEF} * {JADE_OTHER_BLAST_MULTIPLIER})")
-        self.calculation_steps.append("")
-
-        # ============ Расчет урона по боссам ============
-        self.calculation_steps.append("Расчет урона с нефритом по боссам:")
-
-        # Расчет боевого урона с нефритом по боссам
-        self.jade_first_blast_boss = round(
-            self.final_attack * self.boss_ice_blast_percent * EXPLOSION_COEF * JADE_FIRST_BLAST_MULTIPLIER)
-        self.jade_second_blast_boss = round(
-            self.final_attack * self.boss_ice_blast_percent * EXPLOSION_COEF * JADE_OTHER_BLAST_MULTIPLIER)
-        self.jade_third_blast_boss = self.jade_second_blast_boss  # Третий взрыв равен второму
-        self.jade_total_damage_boss = self.jade_first_blast_boss + self.jade_second_blast_boss + self.jade_third_blast_boss
-
-        self.calculation_steps.append(
-            f"Первый взрыв: округлить({self.final_attack:.2f} * {self.boss_ice_blast_percent:.2f} * "
-            f"{EXPLOSION_COEF} * {JADE_FIRST_BLAST_MULTIPLIER}) = {self.jade_first_blast_boss}"
-        )
-        self.calculation_steps.append(
-            f"Второй взрыв: округлить({self.final_attack:.2f} * {self.boss_ice_blast_percent:.2f} * "
-            f"{EXPLOSION_COEF} * {JADE_OTHER_BLAST_MULTIPLIER}) = {self.jade_second_blast_boss}"
-        )
-        self.calculation_steps.append(
-            f"Третий взрыв: округлить({self.final_attack:.2f} * {self.boss_ice_blast_percent:.2f} * "
-            f"{EXPLOSION_COEF} * {JADE_OTHER_BLAST_MULTIPLIER}) = {self.jade_third_blast_boss}"
-        )
-        self.calculation_steps.append(f"Суммарный урон по боссам: {self.jade_total_damage_boss}")
-        self.calculation_steps.append("")
+            steps.add("add_frost_bloom", self.ruleset.talent("frost_bloom"))
+        steps.add("final_ice_blast_total", self.final_ice_blast_percent)
+        steps.add("blank")
+
+        for target, attack_bonus, physical_damage, ice_blast_percent, damage, flower_damage in (
+                ("boss", self.boss_attack_bonus, self.boss_physical_damage, self.boss_ice_blast_percent,
+                 self.boss_damage, self.boss_flower_damage),
+                ("monster", self.monster_attack_bonus, self.monster_physical_damage, self.monster_ice_blast_percent,
+                 self.monster_damage, self.monster_flower_damage)):
+            steps.add(f"{target}_header")
+            steps.add(f"{target}_attack_bonus", attack_bonus)
+            steps.add(f"{target}_physical_header")
+            steps.add("target_physical", self.final_attack, attack_bonus, physical_damage)
+            steps.add(f"{target}_ice_blast_header")
+            steps.add("target_ice_blast", attack_bonus, self.final_ice_blast_percent, ice_blast_percent)
+            steps.add(f"{target}_damage_header")
+            steps.add("target_damage", self.final_attack, ice_blast_percent, self.ruleset.explosion_coef, damage)
+            steps.add(f"{target}_flower_header")
+            steps.add("target_damage", self.final_attack, ice_blast_percent, self.ruleset.flower_explosion_coef,
+                      flower_damage)
+            steps.add("blank")
+
+    def _trace_jade_damage(self, steps: CalculationTrace) -> None:
+        """
+        Добавляет в шаги расчета урон с нефритом (3 взрыва).
 
-        # ============ Расчет урона по монстрам ============
-        self.calculation_steps.append("Расчет урона с нефритом по монстрам:")
-
-        # Расчет боевого урона с нефритом по монстрам
-        self.jade_first_blast_monster = round(
-            self.final_attack * self.monster_ice_blast_percent * EXPLOSION_COEF * JADE_FIRST_BLAST_MULTIPLIER)
-        self.jade_second_blast_monster = round(
-            self.final_attack * self.monster_ice_blast_percent * EXPLOSION_COEF * JADE_OTHER_BLAST_MULTIPLIER)
-        self.jade_third_blast_monster = self.jade_second_blast_monster  # Третий взрыв равен второму
-        self.jade_total_damage_monster = self.jade_first_blast_monster + self.jade_second_blast_monster + self.jade_third_blast_monster
-
-        self.calculation_steps.append(
-            f"Первый взрыв: округлить({self.final_attack:.2f} * {self.monster_ice_blast_percent:.2f} * "
-            f"{EXPLOSION_COEF} * {JADE_FIRST_BLAST_MULTIPLIER}) = {self.jade_first_blast_monster}"
-        )
-        self.calculation_steps.append(
-            f"Второй взрыв: округлить({self.final_attack:.2f} * {self.monster_ice_blast_percent:.2f} * "
-            f"{EXPLOSION_COEF} * {JADE_OTHER_BLAST_MULTIPLIER}) = {self.jade_second_blast_monster}"
-        )
-        self.calculation_steps.append(
-            f"Третий взрыв: округлить({self.final_attack:.2f} * {self.monster_ice_blast_percent:.2f} * "
-            f"{EXPLOSION_COEF} * {JADE_OTHER_BLAST_MULTIPLIER}) = {self.jade_third_blast_monster}"
-        )
-        self.calculation_steps.append(f"Суммарный урон по монстрам: {self.jade_total_damage_monster}")
-        self.calculation_steps.append("")
\ No newline at end of file
+        Args:
+            steps: Трасса расчета
+        """
+        ruleset = self.ruleset
+        steps.add("jade_header")
+        steps.add("jade_first_formula_header")
+        steps.add("jade_formula", ruleset.explosion_coef, ruleset.jade_first_blast_multiplier)
+        steps.add("blank")
+        steps.add("jade_other_formula_header")
+        steps.add("jade_formula", ruleset.explosion_coef, ruleset.jade_other_blast_multiplier)
+        steps.add("blank")
+
+        for target, ice_blast_percent, first_blast, second_blast, third_blast, total in (
+                ("boss", self.boss_ice_blast_percent, self.jade_first_blast_boss,
+                 self.jade_second_blast_boss, self.jade_third_blast_boss, self.jade_total_damage_boss),
+                ("monster", self.monster_ice_blast_percent, self.jade_first_blast_monster,
+                 self.jade_second_blast_monster, self.jade_third_blast_monster, self.jade_total_damage_monster)):
+            steps.add(f"jade_{target}_header")
+            steps.add("jade_first_blast", self.final_attack, ice_blast_percent,
+                      ruleset.explosion_coef, ruleset.jade_first_blast_multiplier, first_blast)
+            steps.add("jade_second_blast", self.final_attack, ice_blast_percent,
+                      ruleset.explosion_coef, ruleset.jade_other_blast_multiplier, second_blast)
+            steps.add("jade_third_blast", self.final_attack, ice_blast_percent,
+                      ruleset.explosion_coef, ruleset.jade_other_blast_multiplier, third_blast)
+            steps.add(f"jade_{target}_total", total)
+            steps.add("blank")
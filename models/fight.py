@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Событийное моделирование боя с боссом.
+
+Модель расчета урона выдает урон одного удара. Здесь удары раскладываются
+во времени: ледяные и цветочные взрывы повторяются со своим периодом,
+нефрит раз в период отката дает три взрыва подряд, а баффы (F тессы,
+Морозная печать, Аура Аромата) действуют окнами заданной длительности и
+перезаряжаются. События упорядочиваются очередью с приоритетом (heapq).
+
+Расписание ударов не зависит от сборки, поэтому оно строится один раз, а
+урон всех боев считается пакетно: для каждого сочетания баффов урон ударов
+берется из calculate_batch, после чего урон боев по времени - это
+накопленная сумма по расписанию. Так 100 тысяч боев считаются за доли
+секунды.
+
+Длительности и периоды по умолчанию условные и задаются в FightSpec.
+
+Модуль требует NumPy и не импортируется пакетом models автоматически.
+"""
+
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.batch import calculate_states, columns_from_model
+from models.build import TALENT_FLAGS
+from models.ruleset import Ruleset
+
+
+# Шаг времени расписания (с): моменты событий хранятся целым числом шагов,
+# чтобы периоды не накапливали ошибку округления
+TICK = 0.001
+
+# Баффы, которые действуют окнами: параметр модели -> (длительность, перезарядка) в секундах
+DEFAULT_BUFF_WINDOWS = {
+    "tessa_f": (10.0, 30.0),
+    "frost_seal": (8.0, 20.0),
+    "aroma_aura": (12.0, 25.0),
+}
+
+# Виды ударов и результаты модели, которые они наносят
+HIT_OUTPUTS = ("boss_damage", "boss_flower_damage",
+               "jade_first_blast_boss", "jade_second_blast_boss", "jade_third_blast_boss")
+BLAST, FLOWER, JADE_FIRST, JADE_SECOND, JADE_THIRD = range(len(HIT_OUTPUTS))
+
+
+class FightSpec:
+    """Параметры боя: длительность, периоды ударов и окна баффов."""
+
+    __slots__ = ("duration", "blast_interval", "flower_interval", "jade_cooldown", "jade_gap", "buffs")
+
+    def __init__(self,
+                 duration: float = 60.0,
+                 blast_interval: float = 1.0,
+                 flower_interval: float = 3.0,
+                 jade_cooldown: float = 8.0,
+                 jade_gap: float = 0.5,
+                 buffs: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Инициализация параметров боя.
+
+        Args:
+            duration: Длительность боя (с)
+            blast_interval: Период ледяного взрыва (с)
+            flower_interval: Период цветочного взрыва (с)
+            jade_cooldown: Откат нефрита (с); нефрит срабатывает в начале боя
+            jade_gap: Пауза между тремя взрывами нефрита (с)
+            buffs: Окна баффов: параметр модели -> (длительность, перезарядка)
+                   (по умолчанию DEFAULT_BUFF_WINDOWS). Баффы, не попавшие в
+                   словарь, берутся из модели и действуют весь бой.
+
+        Raises:
+            ValueError: Если параметр неизвестен, период не положителен или
+                        бафф длится дольше перезарядки
+        """
+        buffs = dict(DEFAULT_BUFF_WINDOWS if buffs is None else buffs)
+        unknown = set(buffs) - set(TALENT_FLAGS)
+        if unknown:
+            raise ValueError(f"Неизвестные параметры: {', '.join(sorted(unknown))}")
+        if min(duration, blast_interval, flower_interval, jade_cooldown) <= 0 or jade_gap < 0:
+            raise ValueError("Длительность боя и периоды ударов должны быть положительными")
+        for name, (length, cooldown) in buffs.items():
+            if not 0 < length <= cooldown:
+                raise ValueError(f"Окно баффа {name} должно быть положительным и не длиннее перезарядки")
+        if 2 * jade_gap >= jade_cooldown:
+            raise ValueError("Три взрыва нефрита должны укладываться в откат")
+
+        self.duration = duration
+        self.blast_interval = blast_interval
+        self.flower_interval = flower_interval
+        self.jade_cooldown = jade_cooldown
+        self.jade_gap = jade_gap
+        # Баффы храним в порядке TALENT_FLAGS: номер баффа - бит в состоянии баффов
+        self.buffs = {name: buffs[name] for name in TALENT_FLAGS if name in buffs}
+
+    def streams(self) -> List[Tuple[int, int, int]]:
+        """
+        Периодические потоки событий.
+
+        Виды событий упорядочены так, что в один и тот же момент сначала
+        заканчиваются баффы, затем начинаются, и только потом наносятся удары.
+
+        Returns:
+            Тройки (вид события, первый момент, период) в шагах TICK. Вид
+            события: окончания баффов, начала баффов, затем удары HIT_OUTPUTS
+        """
+        buff_count = len(self.buffs)
+        streams = []
+        for bit, (length, cooldown) in enumerate(self.buffs.values()):
+            streams.append((bit, _ticks(length), _ticks(cooldown)))
+            streams.append((buff_count + bit, 0, _ticks(cooldown)))
+
+        hits = 2 * buff_count
+        jade_period = _ticks(self.jade_cooldown)
+        streams += [
+            (hits + BLAST, _ticks(self.blast_interval), _ticks(self.blast_interval)),
+            (hits + FLOWER, _ticks(self.flower_interval), _ticks(self.flower_interval)),
+            (hits + JADE_FIRST, 0, jade_period),
+            (hits + JADE_SECOND, _ticks(self.jade_gap), jade_period),
+            (hits + JADE_THIRD, _ticks(2 * self.jade_gap), jade_period),
+        ]
+        return streams
+
+
+def _ticks(seconds: float) -> int:
+    """Переводит секунды в целое число шагов TICK."""
+    return int(round(seconds / TICK))
+
+
+class FightSchedule:
+    """Расписание ударов боя: моменты, виды ударов и состояния баффов."""
+
+    __slots__ = ("spec", "times", "hits", "states")
+
+    def __init__(self, spec: FightSpec):
+        """
+        Строит расписание очередью событий.
+
+        Ключ события в очереди - целое число (момент << бит_вида | вид),
+        поэтому во внутреннем цикле не создаются кортежи и объекты событий,
+        а следующий момент потока кладется в очередь через heapreplace.
+
+        Args:
+            spec: Параметры боя
+        """
+        self.spec = spec
+        streams = spec.streams()
+        kind_bits = len(streams).bit_length()
+        periods = [0] * len(streams)
+        queue = []
+        for kind, first, period in streams:
+            periods[kind] = period
+            queue.append(first << kind_bits | kind)
+        heapq.heapify(queue)
+
+        buff_count = len(spec.buffs)
+        hits_from = 2 * buff_count
+        end = _ticks(spec.duration)
+        kind_mask = (1 << kind_bits) - 1
+
+        # Верхняя оценка числа ударов: списки выделяются один раз
+        capacity = sum(end // period + 1 for kind, _, period in streams if kind >= hits_from)
+        times = [0] * capacity
+        hits = [0] * capacity
+        states = [0] * capacity
+        count = 0
+        state = 0
+
+        key = queue[0]
+        while key >> kind_bits <= end:
+            kind = key & kind_mask
+            moment = key >> kind_bits
+            if kind >= hits_from:
+                times[count] = moment
+                hits[count] = kind - hits_from
+                states[count] = state
+                count += 1
+            elif kind >= buff_count:
+                state |= 1 << (kind - buff_count)
+            else:
+                state &= ~(1 << kind)
+            heapq.heapreplace(queue, (moment + periods[kind]) << kind_bits | kind)
+            key = queue[0]
+
+        self.times = np.array(times[:count], dtype=np.float64) * TICK
+        self.hits = np.array(hits[:count], dtype=np.intp)
+        self.states = np.array(states[:count], dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+
+def damage_table(columns: Dict[str, np.ndarray], buffs, ruleset: Optional[Ruleset] = None) -> np.ndarray:
+    """
+    Урон ударов для каждого боя и каждого состояния баффов.
+
+    Args:
+        columns: Входные столбцы calculate_batch для боев (одномерные массивы или скаляры)
+        buffs: Баффы, действующие окнами, в порядке битов состояния
+        ruleset: Набор правил
+
+    Returns:
+        Массив формы (бои, состояния баффов, виды ударов HIT_OUTPUTS)
+    """
+    results = calculate_states(columns, list(buffs), ruleset)
+    return np.stack([results[key] for key in HIT_OUTPUTS], axis=-1).astype(np.float64)
+
+
+def _simulate(table: np.ndarray, schedule: FightSchedule, boss_hp, curve_step: Optional[float],
+              chunk_size: int) -> Dict[str, np.ndarray]:
+    """Считает бои по таблице урона ударов и расписанию (см. simulate_fights)."""
+    spec = schedule.spec
+    count = table.shape[0]
+    boss_hp = np.broadcast_to(np.asarray(boss_hp, dtype=np.float64), (count,))
+
+    result = {
+        "time_to_kill": np.full(count, np.nan),
+        "total_damage": np.zeros(count),
+    }
+    if curve_step is not None:
+        curve_times = np.arange(1, int(np.floor(spec.duration / curve_step + 1e-9)) + 1) * curve_step
+        # Число ударов, нанесенных к концу каждого отрезка
+        curve_hits = np.searchsorted(schedule.times, curve_times, side="right")
+        result["curve_times"] = curve_times
+        result["dps_curve"] = np.zeros((count, len(curve_times)))
+
+    if len(schedule):
+        for start in range(0, count, chunk_size):
+            stop = min(start + chunk_size, count)
+            # Накопленный урон к каждому удару расписания во всех боях куска
+            damage = np.cumsum(table[start:stop][:, schedule.states, schedule.hits], axis=1)
+
+            killed = damage >= boss_hp[start:stop, None]
+            first = killed.argmax(axis=1)
+            result["time_to_kill"][start:stop] = np.where(killed.any(axis=1), schedule.times[first], np.nan)
+            result["total_damage"][start:stop] = damage[:, -1]
+
+            if curve_step is not None:
+                reached = np.concatenate([np.zeros((stop - start, 1)), damage], axis=1)[:, curve_hits]
+                result["dps_curve"][start:stop] = np.diff(reached, axis=1, prepend=0.0) / curve_step
+
+    result["dps"] = result["total_damage"] / spec.duration
+    return result
+
+
+def simulate_fights(columns: Dict[str, np.ndarray],
+                    boss_hp,
+                    spec: Optional[FightSpec] = None,
+                    ruleset: Optional[Ruleset] = None,
+                    curve_step: Optional[float] = None,
+                    chunk_size: int = 8192) -> Dict[str, np.ndarray]:
+    """
+    Смоделировать множество боев с одним расписанием.
+
+    Args:
+        columns: Входные столбцы calculate_batch (например, columns_from_builds
+                 или SweepSpec.columns); баффы из spec.buffs в них игнорируются
+        boss_hp: Здоровье босса (скаляр или массив по боям)
+        spec: Параметры боя (по умолчанию FightSpec())
+        ruleset: Набор правил
+        curve_step: Шаг кривой DPS (с); None - кривая не строится
+        chunk_size: Сколько боев считать за раз
+
+    Returns:
+        Словарь столбцов: "time_to_kill" (с, NaN - босс не убит за бой),
+        "total_damage" и "dps" за весь бой, а при curve_step - "curve_times"
+        (концы отрезков) и "dps_curve" (средний DPS на каждом отрезке)
+    """
+    spec = spec or FightSpec()
+    table = damage_table(columns, spec.buffs, ruleset)
+    return _simulate(table, FightSchedule(spec), boss_hp, curve_step, chunk_size)
+
+
+def simulate_fight(model, boss_hp: float, spec: Optional[FightSpec] = None,
+                   curve_step: Optional[float] = 1.0) -> Dict[str, np.ndarray]:
+    """
+    Смоделировать бой текущей сборки модели.
+
+    Args:
+        model: Модель расчета урона
+        boss_hp: Здоровье босса
+        spec: Параметры боя (по умолчанию FightSpec())
+        curve_step: Шаг кривой DPS (с) или None
+
+    Returns:
+        Те же значения, что и у simulate_fights, для одного боя, а также
+        "hit_times" и "cumulative_damage" - моменты ударов и накопленный
+        урон к каждому из них
+    """
+    spec = spec or FightSpec()
+    schedule = FightSchedule(spec)
+    table = damage_table(columns_from_model(model), spec.buffs, model.ruleset)
+
+    result = _simulate(table, schedule, boss_hp, curve_step, 1)
+    fight = {key: value if key == "curve_times" else value[0] for key, value in result.items()}
+    fight["hit_times"] = schedule.times
+    fight["cumulative_damage"] = np.cumsum(table[0, schedule.states, schedule.hits])
+    return fight
@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Выбор шести нефритов из инвентаря игрока.
+
+Каждый нефрит инвентаря сводится к вектору вклада в бонусы (как в
+JadeConfig.get_effective_stats). Бонусы лед. взрыва и атаки по боссам
+(монстрам) входят в формулу урона только суммой, поэтому перебор ведется
+в пространстве признаков (атака, лед. взрыв + по боссам, лед. взрыв + по
+монстрам). Нефриты, которые не лучше хотя бы 5 + k других по всем
+влияющим на цель признакам, не могут попасть в k лучших наборов и
+отбрасываются. Оставшиеся перебираются методом ветвей и
+границ с накоплением сумм бонусов по ходу перебора и ограниченной кучей
+лучших k наборов, поэтому память не зависит от числа сочетаний.
+"""
+
+import heapq
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from models.build import Build
+from models.damage_calculator import DamageCalculatorModel
+from models.jade import JadeConfig
+from models.optimizer import BONUS_TYPES, JadeObjective, parse_objective
+
+
+# Количество нефритов в наборе
+LOADOUT_SIZE = 6
+
+
+class InventoryJade:
+    """Нефрит из инвентаря: название, статы и вектор вклада в бонусы."""
+
+    __slots__ = ("name", "stats", "vector")
+
+    def __init__(self, stats: Sequence[Tuple[str, Any]], name: Optional[str] = None):
+        """
+        Инициализация нефрита инвентаря.
+
+        Args:
+            stats: Пары (тип стата, значение в процентах), не более четырех
+            name: Название нефрита для отчетов
+        """
+        self.name = name
+        self.stats = tuple((stat_type, str(value)) for stat_type, value in stats)
+
+        effective = JadeConfig.from_stats(0, self.stats).get_effective_stats()
+        self.vector = tuple(effective.get(stat_type, 0.0) for stat_type in BONUS_TYPES)
+        if any(value < 0 for value in self.vector):
+            raise ValueError(f"Отрицательные статы в инвентаре не поддерживаются: {list(self.stats)}")
+
+    def features(self) -> Tuple[float, float, float]:
+        """
+        Признаки нефрита, от которых зависит урон.
+
+        Returns:
+            (атака, лед. взрыв + атака по боссам, лед. взрыв + атака по монстрам)
+        """
+        attack, ice_blast, boss, monster = self.vector
+        return attack, ice_blast + boss, ice_blast + monster
+
+    def __repr__(self) -> str:
+        return f"InventoryJade({self.name!r}, {list(self.stats)!r})"
+
+
+class InventoryCombo:
+    """Набор из шести нефритов инвентаря с результатом расчета."""
+
+    __slots__ = ("score", "indices", "jades", "results")
+
+    def __init__(self, score: float, indices: Tuple[int, ...], jades: List[InventoryJade], results: Dict):
+        """
+        Инициализация набора.
+
+        Args:
+            score: Значение целевой функции
+            indices: Позиции нефритов в инвентаре
+            jades: Нефриты набора
+            results: Результаты DamageCalculatorModel.calculate() для набора
+        """
+        self.score = score
+        self.indices = indices
+        self.jades = jades
+        self.results = results
+
+    def to_configs(self) -> List[JadeConfig]:
+        """
+        Создать конфигурации нефритов для набора.
+
+        Returns:
+            Шесть конфигураций нефритов
+        """
+        return [JadeConfig.from_stats(i, jade.stats) for i, jade in enumerate(self.jades)]
+
+
+def load_inventory(path: str) -> Iterator[InventoryJade]:
+    """
+    Читает инвентарь из файла JSONL построчно.
+
+    Каждая строка - либо список статов [["Атака", "10"], ...], либо объект
+    {"name": "...", "stats": [...]}. Пустые строки пропускаются.
+
+    Args:
+        path: Путь к файлу
+
+    Yields:
+        Нефриты инвентаря
+    """
+    with open(path, encoding="utf-8") as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, dict):
+                yield InventoryJade(record["stats"], record.get("name"))
+            else:
+                yield InventoryJade(record, f"#{line_number}")
+
+
+def _relevant_components(boss_weight: float, monster_weight: float) -> Tuple[int, ...]:
+    """Признаки, влияющие на цель: атака всегда, суммы для боссов и монстров - по весам."""
+    components = [0]
+    if boss_weight:
+        components.append(1)
+    if monster_weight:
+        components.append(2)
+    return tuple(components)
+
+
+def prune_dominated(vectors: List[Tuple[float, ...]], components: Sequence[int], keep: int) -> List[int]:
+    """
+    Отбрасывает нефриты, которые не лучше как минимум keep других.
+
+    Если у нефрита столько доминирующих соседей, в любом наборе его можно
+    заменить на один из них, не ухудшив результат, и так для каждого из k
+    лучших наборов.
+
+    Args:
+        vectors: Векторы признаков нефритов
+        components: Учитываемые компоненты векторов
+        keep: Порог числа доминирующих нефритов (5 + k)
+
+    Returns:
+        Индексы оставшихся нефритов
+    """
+    projected = [tuple(vector[c] for c in components) for vector in vectors]
+
+    # Доминировать могут только нефриты с не меньшей суммой, поэтому проверяем их в порядке убывания суммы
+    order = sorted(range(len(vectors)), key=lambda i: sum(projected[i]), reverse=True)
+    kept = []
+    for position, i in enumerate(order):
+        vector = projected[i]
+        dominators = 0
+        for j in order[:position]:
+            if all(o >= v for o, v in zip(projected[j], vector)):
+                dominators += 1
+                if dominators >= keep:
+                    break
+        if dominators < keep:
+            kept.append(i)
+    return kept
+
+
+def _suffix_top_sums(vectors: List[Tuple[float, ...]], depth: int) -> List[List[Tuple[float, ...]]]:
+    """
+    Для каждой позиции i и r = 0..depth считает покомпонентные суммы r наибольших значений среди векторов i..n-1.
+
+    Args:
+        vectors: Векторы вклада
+        depth: Наибольшее r
+
+    Returns:
+        Таблица sums[i][r]
+    """
+    size = len(vectors[0]) if vectors else 3
+    tops = [[] for _ in range(size)]
+    table = [None] * (len(vectors) + 1)
+    table[len(vectors)] = [(0.0,) * size] * (depth + 1)
+
+    for i in range(len(vectors) - 1, -1, -1):
+        for c in range(size):
+            column = tops[c]
+            column.append(vectors[i][c])
+            column.sort(reverse=True)
+            del column[depth:]
+        row = []
+        for r in range(depth + 1):
+            row.append(tuple(sum(column[:r]) for column in tops))
+        table[i] = row
+    return table
+
+
+def best_combinations(model,
+                      inventory: Iterable[InventoryJade],
+                      objective: Union[str, Dict[str, float]] = "boss",
+                      top_k: int = 10) -> List[InventoryCombo]:
+    """
+    Находит k лучших наборов из шести нефритов инвентаря.
+
+    Параметры персонажа (сознание, уровень, таланты) берутся из модели,
+    сама модель не изменяется.
+
+    Args:
+        model: Модель расчета урона
+        inventory: Нефриты инвентаря
+        objective: "boss", "monster" или веса {"boss": ..., "monster": ...}
+        top_k: Сколько лучших наборов вернуть
+
+    Returns:
+        Наборы в порядке убывания целевой функции
+
+    Raises:
+        ValueError: Если top_k меньше 1 или в инвентаре меньше шести нефритов
+    """
+    if top_k < 1:
+        raise ValueError("Число наборов top_k должно быть не меньше 1")
+
+    jades = list(inventory)
+    if len(jades) < LOADOUT_SIZE:
+        raise ValueError(f"В инвентаре должно быть не меньше {LOADOUT_SIZE} нефритов")
+
+    boss_weight, monster_weight = parse_objective(objective)
+    objective_of = JadeObjective(model, boss_weight, monster_weight)
+
+    def score_of(attack, boss_sum, monster_sum):
+        # Лед. взрыв уже учтен в суммах для боссов и монстров
+        return objective_of(attack, 0.0, boss_sum, monster_sum)
+
+    features = [jade.features() for jade in jades]
+    kept = prune_dominated(features, _relevant_components(boss_weight, monster_weight), LOADOUT_SIZE - 1 + top_k)
+    kept.sort(key=lambda i: score_of(*features[i]), reverse=True)
+    vectors = [features[i] for i in kept]
+    suffix = _suffix_top_sums(vectors, LOADOUT_SIZE)
+    count = len(vectors)
+
+    # Куча из top_k лучших наборов: (значение, индексы); на вершине - худший из них
+    heap: List[Tuple[float, Tuple[int, ...]]] = []
+    chosen: List[int] = []
+
+    def threshold() -> float:
+        return heap[0][0] if len(heap) >= top_k else float("-inf")
+
+    def dfs(start, remaining, a, b, m):
+        if remaining == 0:
+            score = score_of(a, b, m)
+            if len(heap) < top_k:
+                heapq.heappush(heap, (score, tuple(chosen)))
+            elif score > heap[0][0]:
+                heapq.heapreplace(heap, (score, tuple(chosen)))
+            return
+
+        for index in range(start, count - remaining + 1):
+            sa, sb, sm = suffix[index][remaining]
+            # Суммы лучших оставшихся не растут с индексом, поэтому дальше оценка только хуже
+            if score_of(a + sa, b + sb, m + sm) <= threshold():
+                break
+            va, vb, vm = vectors[index]
+            chosen.append(index)
+            dfs(index + 1, remaining - 1, a + va, b + vb, m + vm)
+            chosen.pop()
+
+    dfs(0, LOADOUT_SIZE, 0.0, 0.0, 0.0)
+
+    # Точный результат для найденных наборов считаем обычной моделью
+    build = Build.from_model(model)
+    combos = []
+    for _, positions in heap:
+        indices = tuple(sorted(kept[p] for p in positions))
+        combo_jades = [jades[i] for i in indices]
+        build.jades = [JadeConfig.from_stats(n, jade.stats) for n, jade in enumerate(combo_jades)]
+        results = DamageCalculatorModel.from_build(build).calculate(trace=False)
+        score = (boss_weight * results["jade_total_damage_boss"] +
+                 monster_weight * results["jade_total_damage_monster"])
+        combos.append(InventoryCombo(score, indices, combo_jades, results))
+
+    combos.sort(key=lambda combo: combo.score, reverse=True)
+    return combos
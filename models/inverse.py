@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Обратная задача: сколько стата нужно, чтобы урон достиг цели.
+
+По цели вида "урон нефрита x3 по боссу >= 45 000" находится наименьшее
+значение сознания или суммы бонусов нефритов одного типа, при котором
+результат ее достигает. Модель при этом не пересчитывается: урон по цели
+линеен по каждой переменной в отдельности, поэтому нужный урон ледяного
+взрыва обращается в значение переменной так же, как в models.breakpoints,
+а затем уточняется несколькими пакетными расчетами до наименьшего числа с
+плавающей точкой. Округление взрывов нефрита учитывается точно.
+
+Таблица целей добавляет последнюю ось к столбцам сборок, так что тысячи
+целей решаются одним вызовом.
+
+Модуль требует NumPy и не импортируется пакетом models автоматически.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from models.batch import columns_from_model
+from models.breakpoints import BREAKPOINT_VARIABLES, _Inversion, _jade_damage_needed
+from models.ruleset import Ruleset
+
+
+# Результаты, для которых решается обратная задача
+SOLVABLE_OUTPUTS = tuple(
+    key
+    for target in ("boss", "monster")
+    for key in (f"{target}_damage", f"{target}_flower_damage",
+                f"jade_first_blast_{target}", f"jade_second_blast_{target}",
+                f"jade_third_blast_{target}", f"jade_total_damage_{target}")
+)
+
+
+def _output_target(output: str) -> str:
+    """Цель, по которой считается результат."""
+    if output not in SOLVABLE_OUTPUTS:
+        raise ValueError(f"Обратная задача не решается для результата {output!r}")
+    return "boss" if "boss" in output else "monster"
+
+
+def _damage_needed(output: str, goals: np.ndarray, ruleset: Ruleset) -> np.ndarray:
+    """Наименьший урон ледяного взрыва по цели, при котором результат output не меньше goals."""
+    if output.endswith("_flower_damage"):
+        return goals * ruleset.explosion_coef / ruleset.flower_explosion_coef
+    if output.startswith("jade_total_damage"):
+        # Три взрыва нефрита: один первый и два прочих
+        return _jade_damage_needed(goals, np.full(goals.shape, 3.0), ruleset)
+    if output.startswith("jade_first_blast"):
+        # round(урон * m) достигает ceil(цели), когда урон * m проходит ceil(цели) - 0.5
+        return (np.ceil(goals) - 0.5) / ruleset.jade_first_blast_multiplier
+    if output.startswith("jade_"):
+        return (np.ceil(goals) - 0.5) / ruleset.jade_other_blast_multiplier
+    return goals
+
+
+def solve_required(columns: Dict[str, np.ndarray],
+                   output: str,
+                   goals,
+                   variable: str = "consciousness",
+                   ruleset: Optional[Ruleset] = None) -> Dict[str, np.ndarray]:
+    """
+    Наименьшее значение переменной, при котором результат достигает цели.
+
+    Args:
+        columns: Входные столбцы calculate_batch (columns_from_builds, columns_from_model, ...)
+        output: Результат из SOLVABLE_OUTPUTS
+        goals: Цель: скаляр или таблица значений (добавляет последнюю ось)
+        variable: Переменная из BREAKPOINT_VARIABLES; бонусы нефритов - в долях (0.01 = 1%)
+        ruleset: Набор правил
+
+    Returns:
+        "current" - текущее значение результата, "required" - наименьшее
+        значение переменной, при котором результат не меньше цели (текущее,
+        если цель уже достигнута; inf, если переменная на результат не
+        влияет), "extra" - сколько нужно добавить к текущему значению
+
+    Raises:
+        ValueError: Если результат или переменная неизвестны
+    """
+    target = _output_target(output)
+    goals = np.asarray(goals, dtype=np.float64)
+    inversion = _Inversion(columns, variable, target, ruleset, extra_axis=goals.ndim > 0)
+
+    current = inversion.results[output]
+    reached = current >= goals
+    with np.errstate(divide="ignore", invalid="ignore"):
+        estimate = inversion.invert(_damage_needed(output, goals, inversion.ruleset))
+    # Достигнутые цели и цели, недостижимые ростом переменной, не уточняются
+    estimate = np.where(reached, np.inf, estimate)
+    estimate = np.where(np.isnan(estimate), np.inf, estimate)
+
+    required = inversion.refine(lambda r: r[output] >= goals, estimate)
+    required = np.where(reached, np.broadcast_to(inversion.x0, required.shape), required)
+    return {
+        "current": current,
+        "required": required,
+        "extra": required - inversion.x0,
+    }
+
+
+def required_upgrades(model, output: str, goals) -> Dict[str, np.ndarray]:
+    """
+    Сколько каждой переменной нужно добавить текущей сборке модели, чтобы достичь цели.
+
+    Остальные входы (бонусы других типов, таланты, набор правил) не меняются.
+
+    Args:
+        model: Модель расчета урона
+        output: Результат из SOLVABLE_OUTPUTS
+        goals: Цель: скаляр или массив целей
+
+    Returns:
+        Словарь {переменная из BREAKPOINT_VARIABLES: нужная прибавка} в форме
+        goals; прибавки бонусов нефритов - в долях (0.01 = 1%), inf -
+        переменная на результат не влияет
+    """
+    columns = columns_from_model(model)
+    return {variable: solve_required(columns, output, goals, variable, model.ruleset)["extra"][0]
+            for variable in BREAKPOINT_VARIABLES}
@@ -3,15 +3,40 @@
 
 """
 Модуль для работы с нефритами и их статами в приложении "Калькулятор урона".
+
+Модуль не зависит от tkinter: статы и нефриты хранятся в компактных записях
+со __slots__, а вкладки интерфейса синхронизируют с ними свои Tk-переменные.
 """
 
-import tkinter as tk
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+
+# Счетчик изменений статов нефритов. Модель сравнивает его с запомненным
+# значением и пересчитывает бонусы нефритов, только если статы менялись.
+_revision = 0
+
+
+def jade_revision() -> int:
+    """
+    Получить номер последнего изменения статов нефритов.
+
+    Returns:
+        Число, которое увеличивается при любом изменении любого стата
+    """
+    return _revision
+
+
+def _touch() -> None:
+    """Отмечает изменение статов нефритов."""
+    global _revision
+    _revision += 1
 
 
 class JadeStat:
     """Класс для представления одного стата на нефрите."""
 
+    __slots__ = ("_enabled", "_type", "_value", "_number")
+
     def __init__(self, enabled: bool = True, stat_type: str = "Пусто", value: str = "0"):
         """
         Инициализация стата нефрита.
@@ -21,9 +46,54 @@ class JadeStat:
             stat_type: Тип стата (Атака, Лед. взрыв, Слияние, Пусто, Атака по боссу, Атака по монстрам)
             value: Значение стата в процентах
         """
-        self.enabled = tk.BooleanVar(value=enabled)
-        self.type = tk.StringVar(value=stat_type)
-        self.value = tk.StringVar(value=value)
+        self.enabled = enabled
+        self.type = stat_type
+        self.value = value
+
+    @property
+    def enabled(self) -> bool:
+        """Активен ли стат."""
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, enabled: bool) -> None:
+        self._enabled = enabled
+        _touch()
+
+    @property
+    def type(self) -> str:
+        """Тип стата."""
+        return self._type
+
+    @type.setter
+    def type(self, stat_type: str) -> None:
+        self._type = stat_type
+        _touch()
+
+    @property
+    def value(self) -> str:
+        """Значение стата в процентах в том виде, в котором его ввел пользователь."""
+        return self._value
+
+    @value.setter
+    def value(self, value) -> None:
+        self._value = str(value)
+        try:
+            self._number = float(self._value)
+        except ValueError:
+            self._number = 0.0
+        _touch()
+
+    def set(self, stat_type: str, value) -> None:
+        """
+        Установить тип и значение стата.
+
+        Args:
+            stat_type: Тип стата
+            value: Значение стата в процентах
+        """
+        self.type = stat_type
+        self.value = value
 
     def get_value_as_float(self) -> float:
         """
@@ -32,10 +102,7 @@ class JadeStat:
         Returns:
             Значение стата как число с плавающей точкой
         """
-        try:
-            return float(self.value.get())
-        except ValueError:
-            return 0.0
+        return self._number
 
     def is_empty(self) -> bool:
         """
@@ -44,7 +111,7 @@ class JadeStat:
         Returns:
             True, если стат пустой или не активен
         """
-        return not self.enabled.get() or self.type.get() == "Пусто"
+        return not self._enabled or self._type == "Пусто"
 
     def is_fusion(self) -> bool:
         """
@@ -53,7 +120,7 @@ class JadeStat:
         Returns:
             True, если стат является слиянием
         """
-        return self.type.get() == "Слияние"
+        return self._type == "Слияние"
 
     def get_fusion_multiplier(self) -> float:
         """
@@ -65,15 +132,17 @@ class JadeStat:
         if not self.is_fusion():
             return 0.0
 
-        try:
-            return float(self.value.get()) / 100.0
-        except ValueError:
-            return 0.0
+        return self._number / 100.0
+
+    def __repr__(self) -> str:
+        return f"JadeStat({self.type!r}, {self.value!r})"
 
 
 class JadeConfig:
     """Класс для представления конфигурации нефрита со статами."""
 
+    __slots__ = ("index", "stats")
+
     def __init__(self, index: int):
         """
         Инициализация конфигурации нефрита.
@@ -89,12 +158,54 @@ class JadeConfig:
         for _ in range(4):
             self.stats.append(JadeStat())
 
-    def get_effective_stats(self) -> Dict[str, float]:
+    @classmethod
+    def from_stats(cls, index: int, stats: Iterable[Tuple[str, Any]]) -> "JadeConfig":
         """
-        Получить эффективные значения статов с учетом слияний.
+        Создать конфигурацию нефрита из списка статов.
+
+        Args:
+            index: Индекс нефрита (от 0 до 5)
+            stats: Пары (тип стата, значение в процентах), не более четырех
 
         Returns:
-            Словарь с типами статов и их значениями с учетом слияний
+            Конфигурация нефрита
+        """
+        jade = cls(index)
+        jade.set_stats(stats)
+        return jade
+
+    def set_stats(self, stats: Iterable[Tuple[str, Any]]) -> None:
+        """
+        Заполнить ячейки нефрита; незаданные ячейки становятся пустыми.
+
+        Args:
+            stats: Пары (тип стата, значение в процентах), не более четырех
+        """
+        stats = list(stats)
+        if len(stats) > len(self.stats):
+            raise ValueError(f"На нефрите не может быть больше {len(self.stats)} статов")
+
+        for i, stat in enumerate(self.stats):
+            if i < len(stats):
+                stat.set(stats[i][0], stats[i][1])
+            else:
+                stat.set("Пусто", "0")
+
+    def get_stats(self) -> List[Tuple[str, str]]:
+        """
+        Получить статы нефрита в виде списка пар.
+
+        Returns:
+            Список пар (тип стата, значение в процентах) для всех ячеек
+        """
+        return [(stat.type, stat.value) for stat in self.stats]
+
+    def get_base_stats(self) -> Tuple[Dict[str, float], float]:
+        """
+        Получить обычные статы нефрита без учета слияний и суммарное слияние.
+
+        Returns:
+            Пара (словарь с типами статов и их значениями в долях, сумма множителей слияния)
         """
         # Нефриты теперь всегда активны, поэтому убираем проверку enabled
 
@@ -106,7 +217,7 @@ class JadeConfig:
             if stat.is_empty():
                 continue
 
-            stat_type = stat.type.get()
+            stat_type = stat.type
             stat_value = stat.get_value_as_float() / 100.0  # Переводим проценты в десятичную дробь
 
             if stat.is_fusion():
@@ -117,6 +228,17 @@ class JadeConfig:
                 else:
                     base_stats[stat_type] = stat_value
 
+        return base_stats, fusion_total
+
+    def get_effective_stats(self) -> Dict[str, float]:
+        """
+        Получить эффективные значения статов с учетом слияний.
+
+        Returns:
+            Словарь с типами статов и их значениями с учетом слияний
+        """
+        base_stats, fusion_total = self.get_base_stats()
+
         # Применяем множитель слияния ко всем статам
         fusion_multiplier = 1.0 + fusion_total
         result = {}
@@ -161,4 +283,4 @@ def calculate_jade_bonuses(jade_configs: List[JadeConfig]) -> Dict[str, float]:
     # Добавляем другие бонусы в общий результат
     total_bonuses.update(other_bonuses)
 
-    return total_bonuses
\ No newline at end of file
+    return total_bonuses
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Прирост урона от следующего улучшения (предельный выигрыш по статам).
+
+Для каждого типа стата нефритов (+1%), для сознания (+10) и для слияния
+каждого нефрита (следующий уровень из FUSION_VALUES или новое слияние в
+свободной ячейке) отчет показывает, насколько изменятся атака и урон. Модель при этом не пересчитывается: цепочка формул
+_calculate_combat_parameters линейна по каждому бонусу в отдельности
+
+    итоговая атака = (база + сознание / 10) * (бонус атаки + боевые) * F тессы * совпадение
+    урон = итоговая атака * ((1 + бонус по цели) + % лед. взрыва - 1) * коэффициент
+
+поэтому частные производные выписываются в явном виде по уже посчитанным
+узлам модели. Точное изменение с учетом округления взрывов нефрита берется
+из специализированного вычислителя (models.specialize), который совпадает
+с моделью бит в бит.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from config import FUSION_VALUES
+from models.damage_calculator import DamageCalculatorModel
+from models.jade import JadeConfig
+
+
+# Типы статов нефритов в порядке аргументов специализированного вычислителя
+MARGINAL_STATS = ("Атака", "Лед. взрыв", "Атака по боссу", "Атака по монстрам")
+
+# Результаты, для которых считается прирост
+MARGINAL_OUTPUTS = (
+    "final_attack",
+    "boss_damage", "boss_flower_damage", "jade_total_damage_boss",
+    "monster_damage", "monster_flower_damage", "jade_total_damage_monster",
+)
+
+# Шаги улучшений: +1% стата, +10 сознания
+STAT_STEP = 0.01
+CONSCIOUSNESS_STEP = 10
+
+# Уровни слияния в долях (30% -> 40% -> 50%)
+FUSION_LEVELS = tuple(float(value) / 100.0 for value in FUSION_VALUES)
+
+# Направление улучшения: (сознание, Атака, Лед. взрыв, Атака по боссу, Атака по монстрам)
+Direction = Tuple[float, float, float, float, float]
+
+
+class MarginalGain:
+    """Прирост результатов от одного улучшения."""
+
+    __slots__ = ("name", "direction", "rates", "changes")
+
+    def __init__(self, name: str, direction: Direction, rates: Dict[str, float], changes: Dict[str, float]):
+        """
+        Инициализация прироста.
+
+        Args:
+            name: Описание улучшения ("Атака +1%", "Сознание +10", ...)
+            direction: Изменение входов (сознание и суммы бонусов нефритов)
+            rates: Линейная оценка по производным (без округления взрывов нефрита)
+            changes: Точное изменение результатов после улучшения
+        """
+        self.name = name
+        self.direction = direction
+        self.rates = rates
+        self.changes = changes
+
+    def __repr__(self) -> str:
+        return f"MarginalGain({self.name!r}, {self.changes!r})"
+
+
+def gradients(model: DamageCalculatorModel) -> Dict[str, Direction]:
+    """
+    Частные производные результатов по сознанию и суммам бонусов нефритов.
+
+    Производные берутся по узлам модели, поэтому модель должна быть
+    рассчитана (calculate) на текущих входных данных.
+
+    Args:
+        model: Рассчитанная модель
+
+    Returns:
+        Словарь {результат: (d/d сознание, d/d Атака, d/d Лед. взрыв,
+        d/d Атака по боссу, d/d Атака по монстрам)}; бонусы - в долях
+    """
+    ruleset = model.ruleset
+    multiplier = model.tessa_multiplier * model.consciousness_match_multiplier
+    attack_base = ruleset.base_attack + (model.consciousness / 10)
+    final_attack = model.final_attack
+
+    # Итоговая атака линейна по сознанию (через базу) и по бонусу атаки
+    attack = (model.combat_attack_bonus * multiplier / 10, attack_base * multiplier, 0.0, 0.0, 0.0)
+    result = {"final_attack": attack}
+
+    blasts = ruleset.jade_first_blast_multiplier + 2 * ruleset.jade_other_blast_multiplier
+    for target, ice_blast_percent, own in (("boss", model.boss_ice_blast_percent, 3),
+                                           ("monster", model.monster_ice_blast_percent, 4)):
+        # % ледяного взрыва по цели растет на единицу от лед. взрыва и от бонуса по этой цели
+        ice_blast = [0.0, 0.0, 1.0, 0.0, 0.0]
+        ice_blast[own] = 1.0
+        damage = tuple(attack[i] * ice_blast_percent + final_attack * ice_blast[i] for i in range(5))
+
+        result[f"{target}_damage"] = tuple(value * ruleset.explosion_coef for value in damage)
+        result[f"{target}_flower_damage"] = tuple(value * ruleset.flower_explosion_coef for value in damage)
+        result[f"jade_total_damage_{target}"] = tuple(value * ruleset.explosion_coef * blasts for value in damage)
+    return result
+
+
+def _improvements(model: DamageCalculatorModel) -> List[Tuple[str, Direction]]:
+    """Перечисляет улучшения: статы нефритов, сознание и слияние каждого нефрита."""
+    improvements = []
+    for i, stat_type in enumerate(MARGINAL_STATS):
+        direction = [0.0] * 5
+        direction[i + 1] = STAT_STEP
+        improvements.append((f"{stat_type} +{STAT_STEP * 100:g}%", tuple(direction)))
+    improvements.append((f"Сознание +{CONSCIOUSNESS_STEP:g}", (CONSCIOUSNESS_STEP, 0.0, 0.0, 0.0, 0.0)))
+
+    # Слияние умножает все обычные статы нефрита
+    for jade in model.jade_configs:
+        fusion = _fusion_step(jade)
+        if fusion is None:
+            continue
+        name, step = fusion
+        base_stats, _ = jade.get_base_stats()
+        direction = (0.0,) + tuple(base_stats.get(stat_type, 0.0) * step for stat_type in MARGINAL_STATS)
+        if any(direction):
+            improvements.append((f"Нефрит {jade.index + 1}: {name}", direction))
+    return improvements
+
+
+def _fusion_step(jade: JadeConfig) -> Optional[Tuple[str, float]]:
+    """
+    Следующий шаг слияния нефрита.
+
+    Args:
+        jade: Конфигурация нефрита
+
+    Returns:
+        Пара (описание, прибавка множителя слияния): повышение ячейки слияния
+        до следующего уровня FUSION_LEVELS или новое слияние первого уровня в
+        свободной ячейке; None, если слияние уже максимальное или ячеек нет
+    """
+    fusions = [stat.get_fusion_multiplier() for stat in jade.stats if not stat.is_empty() and stat.is_fusion()]
+    if fusions:
+        current = min(fusions)
+        higher = [level for level in FUSION_LEVELS if level > current]
+        if not higher:
+            return None
+        return f"слияние {current * 100:g}% -> {higher[0] * 100:g}%", higher[0] - current
+
+    if any(stat.is_empty() for stat in jade.stats):
+        return f"новое слияние {FUSION_LEVELS[0] * 100:g}%", FUSION_LEVELS[0]
+    return None
+
+
+def marginal_gains(model: DamageCalculatorModel) -> List[MarginalGain]:
+    """
+    Построить отчет о приросте результатов от следующего улучшения.
+
+    Args:
+        model: Модель расчета урона (рассчитывается, если входные данные изменились)
+
+    Returns:
+        Приросты в порядке: статы нефритов, сознание, слияние нефритов
+    """
+    results = model.calculate(trace=False)
+    slopes = gradients(model)
+
+    evaluate = model.specialize(verify=False)
+    bonuses = model.jade_bonuses
+    point = (model.consciousness,) + tuple(bonuses.get(stat_type, 0.0) for stat_type in MARGINAL_STATS)
+
+    gains = []
+    for name, direction in _improvements(model):
+        rates = {key: sum(slope * step for slope, step in zip(slopes[key], direction)) for key in MARGINAL_OUTPUTS}
+        improved = evaluate(*(value + step for value, step in zip(point, direction)))
+        changes = {key: improved[key] - results[key] for key in MARGINAL_OUTPUTS}
+        gains.append(MarginalGain(name, direction, rates, changes))
+    return gains
+
+
+def best_upgrade(gains: List[MarginalGain], output: str = "jade_total_damage_boss") -> Optional[MarginalGain]:
+    """
+    Выбрать улучшение с наибольшим приростом результата.
+
+    Args:
+        gains: Приросты (marginal_gains)
+        output: Ключ результата из MARGINAL_OUTPUTS
+
+    Returns:
+        Лучшее улучшение или None, если ни одно не увеличивает результат
+    """
+    best = max(gains, key=lambda gain: gain.changes[output], default=None)
+    if best is None or best.changes[output] <= 0:
+        return None
+    return best
@@ -0,0 +1,389 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Подбор статов нефритов, максимизирующих урон нефрита (3 взрыва).
+
+Урон зависит от нефритов только через четыре суммы бонусов (атака, % лед.
+взрыва, атака по боссам, атака по монстрам) и не убывает по каждой из них.
+Поэтому каждый нефрит описывается вектором вклада, доминируемые варианты
+отбрасываются, а перебор шести нефритов идет методом ветвей и границ:
+оценка ветви - урон при сумме уже выбранных вкладов и покомпонентного
+максимума оставшихся. Верхние ветви перебора распределяются по процессам.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations_with_replacement
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from config import FUSION_VALUES
+from models.build import Build
+from models.damage_calculator import DamageCalculatorModel
+from models.jade import JadeConfig, calculate_jade_bonuses
+
+
+# Типы статов, влияющие на урон, в порядке компонент вектора вклада
+BONUS_TYPES = ("Атака", "Лед. взрыв", "Атака по боссу", "Атака по монстрам")
+
+# Значение стата по умолчанию, если пользователь не задал ограничение
+DEFAULT_MAX_STAT_VALUE = 10.0
+
+Vector = Tuple[float, float, float, float]
+Cells = Tuple[Tuple[str, str], ...]
+
+
+class LoadoutConstraints:
+    """Ограничения на подбор статов нефритов."""
+
+    __slots__ = ("max_values", "fusion_values", "max_fusion_cells", "max_same_type", "locked")
+
+    def __init__(self,
+                 max_values: Optional[Dict[str, float]] = None,
+                 fusion_values: Sequence[str] = FUSION_VALUES,
+                 max_fusion_cells: int = 4,
+                 max_same_type: int = 4,
+                 locked: Sequence[int] = ()):
+        """
+        Инициализация ограничений.
+
+        Args:
+            max_values: Максимальное значение стата в ячейке (в процентах) по типам;
+                типы, которых нет в словаре, не используются
+            fusion_values: Доступные значения слияния
+            max_fusion_cells: Максимум ячеек слияния на одном нефрите
+            max_same_type: Максимум ячеек одного типа стата на одном нефрите
+            locked: Индексы нефритов, которые нужно оставить без изменений
+        """
+        if max_values is None:
+            max_values = {stat_type: DEFAULT_MAX_STAT_VALUE for stat_type in BONUS_TYPES}
+
+        unknown = set(max_values) - set(BONUS_TYPES)
+        if unknown:
+            raise ValueError(f"Неизвестные типы статов: {', '.join(sorted(unknown))}")
+
+        self.max_values = dict(max_values)
+        self.fusion_values = tuple(str(value) for value in fusion_values)
+        self.max_fusion_cells = max_fusion_cells
+        self.max_same_type = max_same_type
+        self.locked = frozenset(locked)
+
+    @classmethod
+    def from_jades(cls, jade_configs: List[JadeConfig], **kwargs) -> "LoadoutConstraints":
+        """
+        Построить ограничения по текущим нефритам: максимум каждого типа стата
+        берется из уже введенных значений.
+
+        Args:
+            jade_configs: Текущие конфигурации нефритов
+            **kwargs: Остальные параметры конструктора
+
+        Returns:
+            Ограничения подбора
+        """
+        max_values = {stat_type: DEFAULT_MAX_STAT_VALUE for stat_type in BONUS_TYPES}
+        seen = {}
+        for jade in jade_configs:
+            for stat in jade.stats:
+                if stat.type in max_values and not stat.is_empty():
+                    seen[stat.type] = max(seen.get(stat.type, 0.0), stat.get_value_as_float())
+        max_values.update(seen)
+        return cls(max_values, **kwargs)
+
+
+class LoadoutResult:
+    """Результат подбора нефритов."""
+
+    __slots__ = ("jades", "score", "results", "explored")
+
+    def __init__(self, jades: List[Cells], score: float, results: Dict, explored: int):
+        """
+        Инициализация результата.
+
+        Args:
+            jades: Статы для каждого из шести нефритов: пары (тип стата, значение)
+            score: Значение целевой функции
+            results: Результаты DamageCalculatorModel.calculate() для найденных нефритов
+            explored: Количество просмотренных узлов перебора
+        """
+        self.jades = jades
+        self.score = score
+        self.results = results
+        self.explored = explored
+
+    def to_configs(self) -> List[JadeConfig]:
+        """
+        Создать конфигурации нефритов по результату.
+
+        Returns:
+            Шесть конфигураций нефритов
+        """
+        return [JadeConfig.from_stats(i, cells) for i, cells in enumerate(self.jades)]
+
+    def apply_to(self, jade_configs: List[JadeConfig]) -> None:
+        """
+        Перенести найденные статы в существующие конфигурации (например, панели нефритов).
+
+        Args:
+            jade_configs: Конфигурации нефритов, которые нужно изменить
+        """
+        for jade, cells in zip(jade_configs, self.jades):
+            if jade.get_stats() != list(cells):
+                jade.set_stats(cells)
+
+
+class JadeObjective:
+    """Урон нефрита как функция сумм бонусов от нефритов при неизменных остальных параметрах."""
+
+    __slots__ = ("ruleset", "attack_base", "attack_bonus", "combat_attack_terms", "tessa_multiplier",
+                 "match_multiplier", "ice_blast", "ice_blast_terms", "boss_weight", "monster_weight")
+
+    def __init__(self, model, boss_weight: float, monster_weight: float):
+        """
+        Снимает с модели все параметры, не зависящие от нефритов.
+
+        Слагаемые берутся из тех же таблиц набора правил и складываются в том
+        же порядке, что и в модели, поэтому оценка совпадает с ее расчетом.
+
+        Args:
+            model: Модель расчета урона
+            boss_weight: Вес урона по боссам
+            monster_weight: Вес урона по монстрам
+        """
+        ruleset = model.ruleset
+        mask = ruleset.talent_mask(model.__dict__)
+
+        self.ruleset = ruleset
+        self.attack_base = ruleset.base_attack + (model.consciousness / 10)
+        attack_bonus = 1.0 + model.calculate_hero_level_bonus()
+        for value in ruleset.base_attack_terms[mask]:
+            attack_bonus += value
+        ice_blast = 1.0
+        for value in ruleset.ice_blast_terms[mask]:
+            ice_blast += value
+
+        # Префиксы до бонуса нефритов - константы, слагаемые после него прибавляются при оценке
+        self.attack_bonus = attack_bonus
+        self.combat_attack_terms = ruleset.combat_attack_terms[mask]
+        self.tessa_multiplier = ruleset.tessa_multipliers[mask]
+        self.match_multiplier = ruleset.match_multipliers[mask]
+        self.ice_blast = ice_blast
+        self.ice_blast_terms = ruleset.post_jade_ice_blast_terms[mask] + ruleset.combat_ice_blast_terms[mask]
+        self.boss_weight = boss_weight
+        self.monster_weight = monster_weight
+
+    def __call__(self, attack: float, ice_blast: float, boss: float, monster: float) -> float:
+        ruleset = self.ruleset
+        combat_attack_bonus = self.attack_bonus + (attack if attack > 0 else 0.0)
+        for value in self.combat_attack_terms:
+            combat_attack_bonus += value
+        final_attack = self.attack_base * combat_attack_bonus * self.tessa_multiplier * self.match_multiplier
+
+        final_ice_blast = self.ice_blast + (ice_blast if ice_blast > 0 else 0.0)
+        for value in self.ice_blast_terms:
+            final_ice_blast += value
+        other_bonuses = final_ice_blast - 1
+
+        score = 0.0
+        for weight, bonus in ((self.boss_weight, boss), (self.monster_weight, monster)):
+            if weight:
+                blast = final_attack * ((1 + bonus) + other_bonuses) * ruleset.explosion_coef
+                score += weight * (round(blast * ruleset.jade_first_blast_multiplier) +
+                                   2 * round(blast * ruleset.jade_other_blast_multiplier))
+        return score
+
+
+def parse_objective(objective: Union[str, Dict[str, float]]) -> Tuple[float, float]:
+    """
+    Преобразует описание цели в веса урона по боссам и монстрам.
+
+    Args:
+        objective: "boss", "monster" или словарь {"boss": вес, "monster": вес}
+
+    Returns:
+        Пара весов (боссы, монстры)
+    """
+    if objective == "boss":
+        return 1.0, 0.0
+    if objective == "monster":
+        return 0.0, 1.0
+    if isinstance(objective, dict):
+        unknown = set(objective) - {"boss", "monster"}
+        if unknown or any(weight < 0 for weight in objective.values()):
+            raise ValueError("Веса цели должны быть неотрицательными и задаваться для 'boss' и 'monster'")
+        return float(objective.get("boss", 0.0)), float(objective.get("monster", 0.0))
+    raise ValueError(f"Неизвестная цель оптимизации: {objective!r}")
+
+
+def _format_value(value: float) -> str:
+    """Форматирует значение стата так, как его ввел бы пользователь."""
+    return f"{value:g}"
+
+
+def jade_patterns(constraints: LoadoutConstraints) -> List[Tuple[Vector, Cells]]:
+    """
+    Перечисляет допустимые наборы статов одного нефрита без доминируемых.
+
+    Args:
+        constraints: Ограничения подбора
+
+    Returns:
+        Пары (вектор вклада, ячейки нефрита); ни один вектор не хуже другого по всем компонентам
+    """
+    options = [("Пусто", "0")]
+    options += [(stat_type, _format_value(constraints.max_values[stat_type]))
+                for stat_type in BONUS_TYPES if stat_type in constraints.max_values]
+    options += [("Слияние", value) for value in constraints.fusion_values]
+
+    vectors = {}
+    for cells in combinations_with_replacement(options, 4):
+        fusion_cells = sum(1 for stat_type, _ in cells if stat_type == "Слияние")
+        if fusion_cells > constraints.max_fusion_cells:
+            continue
+        if any(sum(1 for other, _ in cells if other == stat_type) > constraints.max_same_type
+               for stat_type in BONUS_TYPES):
+            continue
+
+        effective = JadeConfig.from_stats(0, cells).get_effective_stats()
+        vector = tuple(effective.get(stat_type, 0.0) for stat_type in BONUS_TYPES)
+
+        # Из одинаковых вкладов оставляем набор с меньшим числом непустых ячеек
+        if vector not in vectors or sum(1 for t, _ in cells if t != "Пусто") < \
+                sum(1 for t, _ in vectors[vector] if t != "Пусто"):
+            vectors[vector] = cells
+
+    items = list(vectors.items())
+    return [(vector, cells) for vector, cells in items
+            if not any(other != vector and all(o >= v for o, v in zip(other, vector)) for other, _ in items)]
+
+
+def _suffix_maxima(vectors: List[Vector]) -> List[Vector]:
+    """Покомпонентные максимумы векторов начиная с каждого индекса."""
+    result = [(0.0, 0.0, 0.0, 0.0)] * (len(vectors) + 1)
+    for i in range(len(vectors) - 1, -1, -1):
+        result[i] = tuple(max(a, b) for a, b in zip(vectors[i], result[i + 1]))
+    return result
+
+
+def _search_branch(task) -> Tuple[float, Optional[Tuple[int, ...]], int]:
+    """
+    Перебирает ветвь: первый свободный нефрит уже выбран, остальные - с индексами не меньше.
+
+    Args:
+        task: (индекс первого набора, векторы, целевая функция, вклад закрепленных нефритов,
+               число свободных нефритов, нижняя граница)
+
+    Returns:
+        (лучшее значение, индексы наборов или None, число узлов)
+    """
+    first, vectors, objective, base, slots, lower_bound = task
+    suffix = _suffix_maxima(vectors)
+    count = len(vectors)
+    best_score = lower_bound
+    best_choice = None
+    explored = 0
+    chosen = [first]
+
+    def dfs(start, remaining, a, i, b, m):
+        nonlocal best_score, best_choice, explored
+        explored += 1
+        if remaining == 0:
+            score = objective(a, i, b, m)
+            if score > best_score:
+                best_score = score
+                best_choice = tuple(chosen)
+            return
+
+        for index in range(start, count):
+            sa, si, sb, sm = suffix[index]
+            # Максимумы не растут с индексом, поэтому дальше оценка только хуже
+            if objective(a + remaining * sa, i + remaining * si, b + remaining * sb, m + remaining * sm) <= best_score:
+                break
+            va, vi, vb, vm = vectors[index]
+            chosen.append(index)
+            dfs(index, remaining - 1, a + va, i + vi, b + vb, m + vm)
+            chosen.pop()
+
+    va, vi, vb, vm = vectors[first]
+    dfs(first, slots - 1, base[0] + va, base[1] + vi, base[2] + vb, base[3] + vm)
+    return best_score, best_choice, explored
+
+
+def optimize_loadout(model,
+                     constraints: Optional[LoadoutConstraints] = None,
+                     objective: Union[str, Dict[str, float]] = "boss",
+                     workers: Optional[int] = None,
+                     progress: Optional[Callable[[int, int], None]] = None) -> LoadoutResult:
+    """
+    Подбирает статы шести нефритов, максимизирующие урон нефрита.
+
+    Параметры персонажа (сознание, уровень, таланты) берутся из модели,
+    сама модель не изменяется.
+
+    Args:
+        model: Модель расчета урона
+        constraints: Ограничения подбора
+        objective: "boss", "monster" или веса {"boss": ..., "monster": ...}
+        workers: Число процессов (None - по числу ядер, 1 - без процессов)
+        progress: Необязательная функция progress(готово, всего), вызывается
+                  после каждой ветви перебора; исключение из нее прерывает подбор
+
+    Returns:
+        Лучший найденный набор нефритов
+    """
+    if constraints is None:
+        constraints = LoadoutConstraints()
+
+    boss_weight, monster_weight = parse_objective(objective)
+    score_of = JadeObjective(model, boss_weight, monster_weight)
+
+    patterns = jade_patterns(constraints)
+    patterns.sort(key=lambda item: score_of(*item[0]), reverse=True)
+    vectors = [vector for vector, _ in patterns]
+
+    locked = [jade for jade in model.jade_configs if jade.index in constraints.locked]
+    locked_bonuses = calculate_jade_bonuses(locked)
+    base = tuple(locked_bonuses.get(stat_type, 0.0) for stat_type in BONUS_TYPES)
+    slots = len(model.jade_configs) - len(locked)
+
+    # Начальная граница: все свободные нефриты с лучшим одиночным набором
+    best_score = score_of(*(b + slots * v for b, v in zip(base, vectors[0])))
+    best_choice = (0,) * slots
+    explored = 0
+
+    if slots > 0:
+        tasks = [(first, vectors, score_of, base, slots, best_score) for first in range(len(vectors))]
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(tasks) > 1 else None
+        outcomes = executor.map(_search_branch, tasks) if executor else map(_search_branch, tasks)
+        try:
+            for done, (score, choice, nodes) in enumerate(outcomes, 1):
+                explored += nodes
+                if choice is not None and score > best_score:
+                    best_score, best_choice = score, choice
+                if progress is not None:
+                    progress(done, len(tasks))
+        finally:
+            if executor is not None:
+                # При прерывании не ждем ветви, которые еще не начали считаться
+                executor.shutdown(cancel_futures=True)
+
+    # Собираем итоговые нефриты: закрепленные остаются, свободные заполняются по порядку
+    free = iter(best_choice)
+    jades = []
+    for jade in model.jade_configs:
+        if jade.index in constraints.locked:
+            jades.append(tuple(jade.get_stats()))
+        else:
+            jades.append(patterns[next(free)][1])
+
+    # Точный результат считаем обычной моделью
+    build = Build.from_model(model)
+    build.jades = [JadeConfig.from_stats(i, cells) for i, cells in enumerate(jades)]
+    results = DamageCalculatorModel.from_build(build).calculate(trace=False)
+    score = (boss_weight * results["jade_total_damage_boss"] +
+             monster_weight * results["jade_total_damage_monster"])
+
+    return LoadoutResult(jades, score, results, explored)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Упорядоченный расчет задач в пуле процессов с ограниченной очередью.
+
+Используется пакетными утилитами (перебор параметров, расчет файлов
+сборок): задачи берутся из итератора по мере освобождения места, а
+результаты возвращаются в исходном порядке, поэтому в памяти одновременно
+находится лишь несколько задач, сколько бы их ни было всего.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Сколько задач на процесс может находиться в работе одновременно
+TASKS_PER_WORKER = 2
+
+
+def ordered_map(function: Callable[[T], R], tasks: Iterable[T], workers: Optional[int] = None) -> Iterator[R]:
+    """
+    Применяет функцию к задачам и возвращает результаты по порядку.
+
+    Args:
+        function: Функция уровня модуля (ее должен уметь сериализовать pickle)
+        tasks: Задачи; итератор читается по мере выполнения
+        workers: Число процессов (None - по числу ядер, 1 - в текущем процессе)
+
+    Yields:
+        Результаты в порядке задач
+    """
+    if workers == 1:
+        for task in tasks:
+            yield function(task)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    window = TASKS_PER_WORKER * workers
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(function, task))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        # Если перебор результатов прерван, задачи из очереди не выполняются
+        executor.shutdown(cancel_futures=True)
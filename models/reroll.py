@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Моделирование перебросов статов нефритов методом Монте-Карло.
+
+Выбранные ячейки нефритов (слоты) перебрасываются заново: тип стата
+выбирается по весам, значение обычного стата - равномерно из диапазона
+с округлением до заданного числа знаков (как его ввел бы пользователь), а
+значение слияния - из FUSION_VALUES. Испытания генерируются сразу
+массивами, бонусы нефритов складываются в том же порядке, что и в
+calculate_jade_bonuses, а урон считается пакетно (models.batch), поэтому
+испытание, повторившее текущую сборку, дает ровно текущий результат.
+
+Зерно генератора задает результат полностью: одинаковые зерно, число
+испытаний и распределение дают одинаковый отчет.
+
+Модуль требует NumPy и не импортируется пакетом models автоматически.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import FUSION_VALUES, JADE_STAT_TYPES
+from models.batch import JADE_COLUMNS, calculate_batch
+from models.build import TALENT_FLAGS
+
+
+# Типы статов, которые складываются в бонусы (в порядке столбцов JADE_COLUMNS)
+BONUS_TYPES = tuple(JADE_COLUMNS.values())
+
+# Диапазон значения обычного стата по умолчанию (в процентах)
+DEFAULT_VALUE_RANGE = (1.0, 20.0)
+
+# Процентили отчета
+REPORT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Число испытаний, генерируемых за один раз (ограничивает временные массивы)
+DEFAULT_CHUNK_SIZE = 1 << 18
+
+# Ячейка нефрита: (номер нефрита, номер ячейки)
+Slot = Tuple[int, int]
+
+
+class RollDistribution:
+    """Распределение результата переброса одной ячейки."""
+
+    __slots__ = ("types", "type_probabilities", "value_low", "value_high", "decimals", "fusion_probabilities")
+
+    def __init__(self,
+                 type_weights: Optional[Dict[str, float]] = None,
+                 value_ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+                 decimals: int = 1,
+                 fusion_weights: Optional[Dict[str, float]] = None):
+        """
+        Инициализация распределения.
+
+        Args:
+            type_weights: Веса типов статов из JADE_STAT_TYPES (по умолчанию все
+                          типы, кроме "Пусто", равновероятны)
+            value_ranges: Диапазоны значений обычных статов в процентах
+                          (по умолчанию DEFAULT_VALUE_RANGE для каждого типа)
+            decimals: Число знаков после запятой у значения стата
+            fusion_weights: Веса значений слияния из FUSION_VALUES (по умолчанию равные)
+
+        Raises:
+            ValueError: Если тип или значение неизвестны, вес отрицателен или все веса нулевые
+        """
+        if type_weights is None:
+            type_weights = {stat_type: 1.0 for stat_type in JADE_STAT_TYPES if stat_type != "Пусто"}
+        if fusion_weights is None:
+            fusion_weights = {value: 1.0 for value in FUSION_VALUES}
+        value_ranges = value_ranges or {}
+
+        unknown = (set(type_weights) | set(value_ranges)) - set(JADE_STAT_TYPES)
+        if unknown:
+            raise ValueError(f"Неизвестные типы статов: {', '.join(sorted(unknown))}")
+        unknown = set(fusion_weights) - set(FUSION_VALUES)
+        if unknown:
+            raise ValueError(f"Неизвестные значения слияния: {', '.join(sorted(unknown))}")
+
+        self.types = tuple(type_weights)
+        self.type_probabilities = _probabilities(type_weights.values(), "типов статов")
+        self.fusion_probabilities = _probabilities(
+            [fusion_weights.get(value, 0.0) for value in FUSION_VALUES], "значений слияния")
+
+        ranges = [value_ranges.get(stat_type, DEFAULT_VALUE_RANGE) for stat_type in self.types]
+        if any(low > high for low, high in ranges):
+            raise ValueError("Нижняя граница диапазона значения больше верхней")
+        self.value_low = np.array([low for low, _ in ranges], dtype=np.float64)
+        self.value_high = np.array([high for _, high in ranges], dtype=np.float64)
+        self.decimals = decimals
+
+
+def _probabilities(weights, what: str) -> np.ndarray:
+    """Нормирует веса в вероятности."""
+    weights = np.array(list(weights), dtype=np.float64)
+    if (weights < 0).any() or weights.sum() <= 0:
+        raise ValueError(f"Веса {what} должны быть неотрицательными и не все нулевыми")
+    return weights / weights.sum()
+
+
+class RerollReport:
+    """Распределение результата после переброса."""
+
+    __slots__ = ("output", "trials", "current", "mean", "std", "percentiles", "probability_better",
+                 "probability_worse")
+
+    def __init__(self, output: str, current: float, values: np.ndarray):
+        """
+        Сводит результаты испытаний в отчет.
+
+        Args:
+            output: Ключ результата
+            current: Значение результата у текущей сборки
+            values: Значения результата во всех испытаниях
+        """
+        self.output = output
+        self.trials = len(values)
+        self.current = current
+        self.mean = float(values.mean())
+        self.std = float(values.std())
+        self.percentiles = dict(zip(REPORT_PERCENTILES, np.percentile(values, REPORT_PERCENTILES).tolist()))
+        self.probability_better = float(np.count_nonzero(values > current)) / self.trials
+        self.probability_worse = float(np.count_nonzero(values < current)) / self.trials
+
+    @property
+    def expected_gain(self) -> float:
+        """Ожидаемое изменение результата после переброса."""
+        return self.mean - self.current
+
+    def __repr__(self) -> str:
+        return (f"RerollReport({self.output}: текущее {self.current}, среднее {self.mean:.2f}, "
+                f"лучше в {self.probability_better:.1%} испытаний)")
+
+
+def _check_slots(jade_configs, slots: Sequence[Slot]) -> Dict[int, set]:
+    """Проверяет ячейки и группирует их по нефритам."""
+    if not slots:
+        raise ValueError("Не выбрано ни одной ячейки для переброса")
+    rerolled = {}
+    for jade_index, cell in slots:
+        if not 0 <= jade_index < len(jade_configs) or not 0 <= cell < len(jade_configs[jade_index].stats):
+            raise ValueError(f"Нет ячейки {cell} у нефрита {jade_index}")
+        rerolled.setdefault(jade_index, set()).add(cell)
+    return rerolled
+
+
+def sample_bonuses(jade_configs, slots: Sequence[Slot], distribution: RollDistribution,
+                   rng: np.random.Generator, trials: int) -> np.ndarray:
+    """
+    Сгенерировать бонусы нефритов для испытаний.
+
+    Args:
+        jade_configs: Текущие конфигурации нефритов
+        slots: Перебрасываемые ячейки
+        distribution: Распределение переброса
+        rng: Генератор случайных чисел
+        trials: Число испытаний
+
+    Returns:
+        Массив формы (trials, 4) с бонусами в порядке столбцов JADE_COLUMNS
+    """
+    rerolled = _check_slots(jade_configs, slots)
+    type_codes = {stat_type: i for i, stat_type in enumerate(distribution.types)}
+    fusion_values = np.array([float(value) for value in FUSION_VALUES]) / 100.0
+    scale = 10.0 ** distribution.decimals
+
+    fusion_code = type_codes.get("Слияние")
+
+    totals = np.zeros((trials, len(BONUS_TYPES)))
+    for position, jade in enumerate(jade_configs):
+        cells = rerolled.get(position)
+        if cells is None:
+            # Нефрит без перебросов дает постоянный вклад
+            effective = jade.get_effective_stats()
+            for column, stat_type in enumerate(BONUS_TYPES):
+                if stat_type in effective:
+                    totals[:, column] += effective[stat_type]
+            continue
+
+        # Ячейки складываются по порядку, как в JadeConfig.get_base_stats()
+        base = np.zeros((trials, len(BONUS_TYPES)))
+        fusion_total = np.zeros(trials)
+        for cell, stat in enumerate(jade.stats):
+            if cell in cells:
+                codes = rng.choice(len(distribution.types), size=trials, p=distribution.type_probabilities)
+                values = rng.uniform(distribution.value_low[codes], distribution.value_high[codes])
+                values = np.round(values * scale) / scale / 100.0
+                if fusion_code is not None:
+                    fusions = fusion_values[rng.choice(len(fusion_values), size=trials,
+                                                       p=distribution.fusion_probabilities)]
+                    fusion_total += np.where(codes == fusion_code, fusions, 0.0)
+                for column, stat_type in enumerate(BONUS_TYPES):
+                    if stat_type in type_codes:
+                        base[:, column] += np.where(codes == type_codes[stat_type], values, 0.0)
+            elif not stat.is_empty():
+                if stat.is_fusion():
+                    fusion_total += stat.get_fusion_multiplier()
+                elif stat.type in BONUS_TYPES:
+                    base[:, BONUS_TYPES.index(stat.type)] += stat.get_value_as_float() / 100.0
+
+        totals += base * (1.0 + fusion_total)[:, None]
+    return totals
+
+
+def simulate_reroll(model,
+                    slots: Sequence[Slot],
+                    distribution: Optional[RollDistribution] = None,
+                    trials: int = 1_000_000,
+                    seed: int = 0,
+                    output: str = "jade_total_damage_boss",
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> RerollReport:
+    """
+    Смоделировать переброс ячеек нефритов.
+
+    Остальные параметры (сознание, уровень героя, таланты, набор правил)
+    берутся из модели и не меняются.
+
+    Args:
+        model: Модель расчета урона с текущей сборкой
+        slots: Перебрасываемые ячейки: пары (номер нефрита, номер ячейки)
+        distribution: Распределение переброса (по умолчанию RollDistribution())
+        trials: Число испытаний
+        seed: Зерно генератора случайных чисел
+        output: Ключ результата, распределение которого нужно получить
+        chunk_size: Сколько испытаний генерировать за раз
+
+    Returns:
+        Отчет о распределении результата
+    """
+    distribution = distribution or RollDistribution()
+    jade_configs = model.jade_configs
+    _check_slots(jade_configs, slots)
+
+    current = model.calculate(trace=False)[output]
+    flags = {name: getattr(model, name) for name in TALENT_FLAGS}
+
+    rng = np.random.default_rng(seed)
+    values = np.empty(trials, dtype=np.int64 if isinstance(current, int) else np.float64)
+    for start in range(0, trials, chunk_size):
+        size = min(chunk_size, trials - start)
+        bonuses = sample_bonuses(jade_configs, slots, distribution, rng, size)
+        columns = calculate_batch(model.consciousness, model.hero_level, *bonuses.T,
+                                  ruleset=model.ruleset, **flags)
+        values[start:start + size] = columns[output]
+    return RerollReport(output, current, values)
@@ -0,0 +1,420 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Скомпилированный набор правил расчета урона.
+
+Константы из config.py (базовая атака, коэффициенты взрывов, бонусы уровня
+героя, значения талантов) один раз при запуске превращаются в таблицы:
+
+- префиксные суммы бонуса уровня героя по порогам уровней;
+- значения талантов в массиве с фиксированными индексами (порядок TALENT_FLAGS);
+- слагаемые каждой группы талантов для всех 2^n сочетаний включенных
+  талантов, индексируемые битовой маской сочетания: кортеж значений
+  включенных талантов в порядке группы.
+
+Скалярная модель, пакетный расчет, специализированные вычислители и
+оптимизатор читают константы только отсюда и прибавляют слагаемые по
+одному в исходном порядке формул, поэтому их результаты совпадают бит в
+бит между собой и с расчетом по отдельным талантам:
+
+    бонус атаки = 1.0 + бонус уровня + base_attack_terms[маска]... + нефриты
+    боевой бонус атаки = бонус атаки + combat_attack_terms[маска]...
+    % ледяного взрыва = 1.0 + ice_blast_terms[маска]... + нефриты + post_jade_ice_blast_terms[маска]...
+    боевой % ледяного взрыва = % ледяного взрыва + combat_ice_blast_terms[маска]...
+
+Здесь "+ terms[маска]..." означает последовательное прибавление каждого
+слагаемого кортежа: суммы групп заранее не складываются, потому что
+сложение чисел с плавающей точкой не ассоциативно.
+
+Кроме встроенного набора из config.py, наборы правил загружаются из
+JSON-файлов с версией (см. rulesets/default.json): после патча игры
+достаточно поправить файл, и приложение подхватит его без перезапуска
+(RulesetFile). Ключ набора (Ruleset.key) включает версию и отпечаток
+значений и входит в ключ кеша результатов, поэтому результаты, посчитанные
+по старым правилам, никогда не выдаются для новых.
+"""
+
+import hashlib
+import json
+import math
+import os
+from bisect import bisect_right
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from config import (
+    BASE_ATTACK, EXPLOSION_COEF, FLOWER_EXPLOSION_COEF,
+    JADE_FIRST_BLAST_MULTIPLIER, JADE_OTHER_BLAST_MULTIPLIER,
+    HERO_LEVEL_ATTACK_BONUS, TALENT_VALUES
+)
+from models.build import TALENT_FLAGS
+
+
+# Группы талантов: слагаемые бонусов в порядке сложения. Ледяная вспышка
+# прибавляется к % ледяного взрыва после бонуса нефритов, остальные - до него
+BASE_ATTACK_TALENTS = ("untouchable_talent", "power")
+COMBAT_ATTACK_TALENTS = ("aroma_aura", "frost_seal", "tundra_power", "frostbound_lotus")
+ICE_BLAST_TALENTS = ("ice_root",)
+POST_JADE_ICE_BLAST_TALENTS = ("ice_flash",)
+COMBAT_ICE_BLAST_TALENTS = ("frost_bloom",)
+
+# Слагаемые включенных талантов группы в порядке сложения
+Terms = Tuple[float, ...]
+
+# Таланты-множители боевой атаки
+MULTIPLIER_TALENTS = ("tessa_f", "consciousness_match")
+
+# Версия формата файлов набора правил
+RULESET_FORMAT = 1
+
+# Положительные коэффициенты набора правил в файле
+COEFFICIENT_KEYS = ("base_attack", "explosion_coef", "flower_explosion_coef",
+                    "jade_first_blast_multiplier", "jade_other_blast_multiplier")
+
+# Все поля файла набора правил
+RULESET_KEYS = ("format", "name", "version") + COEFFICIENT_KEYS + ("hero_level_attack_bonus", "talent_values")
+
+
+class Ruleset:
+    """Набор правил расчета с таблицами, построенными один раз при создании."""
+
+    __slots__ = (
+        "name", "version", "key",
+        "base_attack", "explosion_coef", "flower_explosion_coef",
+        "jade_first_blast_multiplier", "jade_other_blast_multiplier",
+        "level_thresholds", "level_bonuses", "level_bonus_prefix",
+        "talent_index", "talent_values", "_talent_bits",
+        "base_attack_terms", "combat_attack_terms", "ice_blast_terms", "post_jade_ice_blast_terms",
+        "combat_ice_blast_terms",
+        "tessa_multipliers", "match_multipliers",
+    )
+
+    def __init__(self,
+                 base_attack: float,
+                 explosion_coef: float,
+                 flower_explosion_coef: float,
+                 jade_first_blast_multiplier: float,
+                 jade_other_blast_multiplier: float,
+                 hero_level_bonus: Mapping[int, float],
+                 talent_values: Mapping[str, float],
+                 name: str = "Встроенные правила",
+                 version: str = "builtin"):
+        """
+        Компилирует набор правил.
+
+        Args:
+            base_attack: Базовая атака
+            explosion_coef: Коэффициент ледяного взрыва
+            flower_explosion_coef: Коэффициент цветочного взрыва
+            jade_first_blast_multiplier: Множитель первого взрыва нефрита
+            jade_other_blast_multiplier: Множитель второго и третьего взрывов нефрита
+            hero_level_bonus: Бонус атаки, добавляемый при достижении уровня героя
+            talent_values: Значения талантов для всех имен из TALENT_FLAGS
+            name: Название набора
+            version: Версия набора (например, версия патча игры)
+
+        Raises:
+            ValueError: Если значение какого-либо таланта не задано
+        """
+        missing = [name for name in TALENT_FLAGS if name not in talent_values]
+        if missing:
+            raise ValueError(f"Не заданы значения талантов: {', '.join(missing)}")
+
+        self.name = name
+        self.version = version
+        self.base_attack = base_attack
+        self.explosion_coef = explosion_coef
+        self.flower_explosion_coef = flower_explosion_coef
+        self.jade_first_blast_multiplier = jade_first_blast_multiplier
+        self.jade_other_blast_multiplier = jade_other_blast_multiplier
+
+        # Префиксные суммы: level_bonus_prefix[i] - бонус при пройденных i порогах.
+        # Суммы накапливаются в порядке возрастания порогов, как при сложении по одному
+        levels = sorted(hero_level_bonus.items())
+        self.level_thresholds: Tuple[int, ...] = tuple(level for level, _ in levels)
+        self.level_bonuses: Tuple[float, ...] = tuple(value for _, value in levels)
+        prefix = [0.0]
+        for _, value in levels:
+            prefix.append(prefix[-1] + value)
+        self.level_bonus_prefix: Tuple[float, ...] = tuple(prefix)
+
+        # Значения талантов по индексам TALENT_FLAGS
+        self.talent_index: Dict[str, int] = {name: index for index, name in enumerate(TALENT_FLAGS)}
+        self.talent_values: Tuple[float, ...] = tuple(float(talent_values[name]) for name in TALENT_FLAGS)
+        self._talent_bits = tuple((name, 1 << index) for index, name in enumerate(TALENT_FLAGS))
+
+        # Таблицы по битовой маске включенных талантов
+        self.base_attack_terms = self._group_terms(BASE_ATTACK_TALENTS)
+        self.combat_attack_terms = self._group_terms(COMBAT_ATTACK_TALENTS)
+        self.ice_blast_terms = self._group_terms(ICE_BLAST_TALENTS)
+        self.post_jade_ice_blast_terms = self._group_terms(POST_JADE_ICE_BLAST_TALENTS)
+        self.combat_ice_blast_terms = self._group_terms(COMBAT_ICE_BLAST_TALENTS)
+        self.tessa_multipliers = self._multipliers("tessa_f")
+        self.match_multipliers = self._multipliers("consciousness_match")
+
+        # Ключ для кешей: версия и отпечаток значений (версию могут забыть поменять)
+        digest = hashlib.sha1(json.dumps(self.to_dict(), sort_keys=True).encode("utf-8")).hexdigest()
+        self.key: Tuple[str, str] = (version, digest[:16])
+
+    @classmethod
+    def from_config(cls) -> "Ruleset":
+        """Компилирует набор правил из констант config.py."""
+        return cls(BASE_ATTACK, EXPLOSION_COEF, FLOWER_EXPLOSION_COEF,
+                   JADE_FIRST_BLAST_MULTIPLIER, JADE_OTHER_BLAST_MULTIPLIER,
+                   HERO_LEVEL_ATTACK_BONUS, TALENT_VALUES)
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "Ruleset":
+        """
+        Проверяет и компилирует набор правил из данных файла.
+
+        Args:
+            data: Разобранный JSON файла набора правил
+
+        Returns:
+            Набор правил
+
+        Raises:
+            ValueError: Если данные не прошли проверку (перечисляются все ошибки)
+        """
+        errors = validate_ruleset(data)
+        if errors:
+            raise ValueError("; ".join(errors))
+
+        return cls(*(data[key] for key in COEFFICIENT_KEYS),
+                   {int(level): value for level, value in data["hero_level_attack_bonus"].items()},
+                   data["talent_values"],
+                   name=data["name"], version=data["version"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Получить данные набора правил в формате файла.
+
+        Returns:
+            Словарь, который можно сохранить в JSON и загрузить from_dict()
+        """
+        return {
+            "format": RULESET_FORMAT,
+            "name": self.name,
+            "version": self.version,
+            "base_attack": self.base_attack,
+            "explosion_coef": self.explosion_coef,
+            "flower_explosion_coef": self.flower_explosion_coef,
+            "jade_first_blast_multiplier": self.jade_first_blast_multiplier,
+            "jade_other_blast_multiplier": self.jade_other_blast_multiplier,
+            "hero_level_attack_bonus": {str(level): value
+                                        for level, value in zip(self.level_thresholds, self.level_bonuses)},
+            "talent_values": dict(zip(TALENT_FLAGS, self.talent_values)),
+        }
+
+    @property
+    def mask_count(self) -> int:
+        """Число сочетаний талантов (размер таблиц по маске)."""
+        return 1 << len(TALENT_FLAGS)
+
+    def _group_terms(self, names: Tuple[str, ...]) -> Tuple[Terms, ...]:
+        """Значения включенных талантов группы для каждой маски, в порядке группы."""
+        terms = [(1 << self.talent_index[name], self.talent(name)) for name in names]
+        return tuple(tuple(value for bit, value in terms if mask & bit) for mask in range(self.mask_count))
+
+    def _multipliers(self, name: str) -> Tuple[float, ...]:
+        """Множитель таланта для каждой маски (1.0, если талант выключен)."""
+        bit = 1 << self.talent_index[name]
+        value = self.talent(name)
+        return tuple(value if mask & bit else 1.0 for mask in range(self.mask_count))
+
+    def talent(self, name: str) -> float:
+        """
+        Получить значение таланта по имени.
+
+        Args:
+            name: Имя таланта из TALENT_FLAGS
+
+        Returns:
+            Значение таланта
+        """
+        return self.talent_values[self.talent_index[name]]
+
+    def talent_mask(self, flags: Mapping[str, bool]) -> int:
+        """
+        Строит битовую маску включенных талантов.
+
+        Args:
+            flags: Значения флагов по именам TALENT_FLAGS (например, __dict__ модели)
+
+        Returns:
+            Маска: бит i установлен, если включен талант TALENT_FLAGS[i]
+        """
+        mask = 0
+        for name, bit in self._talent_bits:
+            if flags[name]:
+                mask |= bit
+        return mask
+
+    def level_index(self, hero_level) -> int:
+        """
+        Получить число порогов уровня героя, не превышающих уровень.
+
+        Args:
+            hero_level: Уровень героя
+
+        Returns:
+            Индекс в level_bonus_prefix
+        """
+        return bisect_right(self.level_thresholds, hero_level)
+
+    def hero_level_bonus(self, hero_level) -> float:
+        """
+        Получить бонус атаки от уровня героя.
+
+        Args:
+            hero_level: Уровень героя
+
+        Returns:
+            Сумма бонусов всех порогов, не превышающих уровень
+        """
+        return self.level_bonus_prefix[bisect_right(self.level_thresholds, hero_level)]
+
+
+def _is_number(value: Any) -> bool:
+    """Проверяет, что значение - конечное число (но не bool)."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def validate_ruleset(data: Any) -> List[str]:
+    """
+    Проверяет данные файла набора правил.
+
+    Args:
+        data: Разобранный JSON файла
+
+    Returns:
+        Список описаний ошибок (пустой, если данные корректны)
+    """
+    if not isinstance(data, dict):
+        return ["набор правил должен быть объектом JSON"]
+
+    errors = []
+    missing = [key for key in RULESET_KEYS if key not in data]
+    if missing:
+        errors.append(f"нет полей: {', '.join(missing)}")
+    unknown = sorted(set(data) - set(RULESET_KEYS))
+    if unknown:
+        errors.append(f"неизвестные поля: {', '.join(unknown)}")
+
+    if "format" in data and data["format"] != RULESET_FORMAT:
+        errors.append(f"неподдерживаемый формат {data['format']!r} (ожидается {RULESET_FORMAT})")
+    for key in ("name", "version"):
+        if key in data and (not isinstance(data[key], str) or not data[key].strip()):
+            errors.append(f"{key} должно быть непустой строкой")
+
+    for key in COEFFICIENT_KEYS:
+        if key in data and not (_is_number(data[key]) and data[key] > 0):
+            errors.append(f"{key} должно быть положительным числом")
+
+    levels = data.get("hero_level_attack_bonus")
+    if levels is not None:
+        if not isinstance(levels, dict):
+            errors.append("hero_level_attack_bonus должно быть объектом {уровень: бонус}")
+        else:
+            for level, value in levels.items():
+                if not (level.isdigit() and int(level) >= 1):
+                    errors.append(f"hero_level_attack_bonus: уровень {level!r} должен быть целым числом от 1")
+                if not (_is_number(value) and value >= 0):
+                    errors.append(f"hero_level_attack_bonus[{level}] должно быть неотрицательным числом")
+
+    talents = data.get("talent_values")
+    if talents is not None:
+        if not isinstance(talents, dict):
+            errors.append("talent_values должно быть объектом {талант: значение}")
+        else:
+            missing = [name for name in TALENT_FLAGS if name not in talents]
+            if missing:
+                errors.append(f"talent_values: нет талантов {', '.join(missing)}")
+            unknown = sorted(set(talents) - set(TALENT_FLAGS))
+            if unknown:
+                errors.append(f"talent_values: неизвестные таланты {', '.join(unknown)}")
+            for name, value in talents.items():
+                # Множители должны быть положительными, слагаемые - неотрицательными
+                if not (_is_number(value) and (value > 0 if name in MULTIPLIER_TALENTS else value >= 0)):
+                    errors.append(f"talent_values[{name}] должно быть "
+                                  f"{'положительным' if name in MULTIPLIER_TALENTS else 'неотрицательным'} числом")
+    return errors
+
+
+def load_ruleset(path: str) -> Ruleset:
+    """
+    Загружает набор правил из JSON-файла.
+
+    Args:
+        path: Путь к файлу
+
+    Returns:
+        Скомпилированный набор правил
+
+    Raises:
+        OSError: Если файл не удалось прочитать
+        ValueError: Если файл не является корректным набором правил
+    """
+    with open(path, encoding="utf-8") as file:
+        try:
+            data = json.load(file)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: некорректный JSON: {e}") from e
+    try:
+        return Ruleset.from_dict(data)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from e
+
+
+class RulesetFile:
+    """Файл набора правил, который перечитывается при изменении."""
+
+    def __init__(self, path: str):
+        """
+        Загружает набор правил из файла.
+
+        Args:
+            path: Путь к файлу
+
+        Raises:
+            OSError: Если файл не удалось прочитать
+            ValueError: Если файл не является корректным набором правил
+        """
+        self.path = path
+        self._stamp = self._read_stamp()
+        self.ruleset = load_ruleset(path)
+
+    def _read_stamp(self) -> Tuple[int, int]:
+        """Время изменения и размер файла."""
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload_if_changed(self) -> Optional[Ruleset]:
+        """
+        Перечитывает файл, если он изменился с последней загрузки.
+
+        Если новый файл некорректен, текущий набор правил сохраняется, а
+        ошибка передается вызывающему коду; повторно тот же файл не
+        перечитывается.
+
+        Returns:
+            Новый набор правил или None, если файл не изменился
+
+        Raises:
+            OSError: Если файл не удалось прочитать
+            ValueError: Если измененный файл не является корректным набором правил
+        """
+        stamp = self._read_stamp()
+        if stamp == self._stamp:
+            return None
+        self._stamp = stamp
+        self.ruleset = load_ruleset(self.path)
+        return self.ruleset
+
+
+# Каталог с файлами наборов правил
+RULESETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rulesets")
+
+# Набор правил по умолчанию, скомпилированный при импорте
+DEFAULT_RULESET = Ruleset.from_config()
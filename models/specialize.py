@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Специализированные вычислители урона для фиксированного набора переключателей.
+
+Обычно таланты, боевые параметры и уровень героя в течение сессии не
+меняются, а меняются только сознание и статы нефритов. Для такого набора
+переключателей генерируется и компилируется функция, в которой все ветвления
+по талантам уже разрешены, а константы свернуты: остаются несколько
+сложений и умножений на точку.
+
+Свертка не меняет порядок операций с плавающей точкой: заранее вычисляются
+только те же префиксы выражений, что и в модели, и выбрасываются лишь
+тождественные операции (x + 0.0, x * 1.0, 1 * x). Поэтому результат
+совпадает с DamageCalculatorModel.calculate() бит в бит.
+"""
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, Mapping
+
+from models.ruleset import Ruleset
+
+
+# Ключи результатов в порядке DamageCalculatorModel.calculate() (без трассы)
+RESULT_KEYS = (
+    "base_attack", "base_ice_blast_percent", "final_attack", "final_ice_blast_percent",
+    "physical_damage",
+    "boss_attack_bonus", "boss_ice_blast_percent", "boss_damage", "boss_flower_damage",
+    "jade_first_blast_boss", "jade_second_blast_boss", "jade_third_blast_boss", "jade_total_damage_boss",
+    "monster_attack_bonus", "monster_ice_blast_percent", "monster_damage", "monster_flower_damage",
+    "jade_first_blast_monster", "jade_second_blast_monster", "jade_third_blast_monster",
+    "jade_total_damage_monster",
+)
+
+Evaluator = Callable[..., Dict[str, Any]]
+
+
+def _plus(expression: str, value: float) -> str:
+    """Прибавление константы; x + 0.0 == x, поэтому нулевое слагаемое опускается."""
+    return expression if value == 0.0 else f"({expression} + {value!r})"
+
+
+def _plus_terms(expression: str, terms) -> str:
+    """Прибавление слагаемых группы талантов по одному, в порядке модели."""
+    for value in terms:
+        expression = _plus(expression, value)
+    return expression
+
+
+def _fold_terms(value: float, terms) -> float:
+    """Сворачивает прибавление слагаемых к константе в том же порядке."""
+    for term in terms:
+        value += term
+    return value
+
+
+def _times(expression: str, value: float) -> str:
+    """Умножение на константу; x * 1.0 == x, поэтому единичный множитель опускается."""
+    return expression if value == 1.0 else f"{expression} * {value!r}"
+
+
+def generate_source(ruleset: Ruleset, level_index: int, mask: int) -> str:
+    """
+    Генерирует исходный код вычислителя для набора переключателей.
+
+    Args:
+        ruleset: Набор правил
+        level_index: Число пройденных порогов уровня героя (Ruleset.level_index)
+        mask: Маска включенных талантов (Ruleset.talent_mask)
+
+    Returns:
+        Исходный код функции evaluate(consciousness, jade_attack, jade_ice_blast,
+        jade_boss_attack, jade_monster_attack)
+    """
+    # Те же префиксы сумм, что и в модели: 1.0 + бонус уровня + таланты, затем нефриты
+    attack_bonus = _fold_terms(1.0 + ruleset.level_bonus_prefix[level_index], ruleset.base_attack_terms[mask])
+    ice_blast = _fold_terms(1.0, ruleset.ice_blast_terms[mask])
+
+    combat_attack_bonus = _plus_terms("base_attack_bonus", ruleset.combat_attack_terms[mask])
+    final_attack = _times(_times(f"attack_base * {combat_attack_bonus}", ruleset.tessa_multipliers[mask]),
+                          ruleset.match_multipliers[mask])
+
+    lines = [
+        "def evaluate(consciousness, jade_attack=0.0, jade_ice_blast=0.0,",
+        "             jade_boss_attack=0.0, jade_monster_attack=0.0):",
+        f"    base_attack_bonus = {attack_bonus!r}",
+        "    if jade_attack > 0:",
+        "        base_attack_bonus += jade_attack",
+        f"    attack_base = {ruleset.base_attack!r} + (consciousness / 10)",
+        f"    base_ice_blast_percent = {ice_blast!r}",
+        "    if jade_ice_blast > 0:",
+        "        base_ice_blast_percent += jade_ice_blast",
+    ]
+    # Слагаемые после бонуса нефритов (Ледяная вспышка) прибавляются к переменной
+    lines += [f"    base_ice_blast_percent += {value!r}" for value in ruleset.post_jade_ice_blast_terms[mask]]
+    lines += [
+        f"    final_attack = {final_attack}",
+        f"    final_ice_blast_percent = "
+        f"{_plus_terms('base_ice_blast_percent', ruleset.combat_ice_blast_terms[mask])}",
+        "    ice_blast_bonus = final_ice_blast_percent - 1",
+    ]
+    for target in ("boss", "monster"):
+        lines += [
+            f"    {target}_ice_blast_percent = (1 + jade_{target}_attack) + ice_blast_bonus",
+            f"    {target}_damage = final_attack * {target}_ice_blast_percent * {ruleset.explosion_coef!r}",
+            f"    {target}_flower_damage = final_attack * {target}_ice_blast_percent * "
+            f"{ruleset.flower_explosion_coef!r}",
+            f"    {target}_first_blast = round({target}_damage * {ruleset.jade_first_blast_multiplier!r})",
+            f"    {target}_other_blast = round({target}_damage * {ruleset.jade_other_blast_multiplier!r})",
+        ]
+
+    lines += [
+        "    return {",
+        '        "base_attack": attack_base * base_attack_bonus,',
+        '        "base_ice_blast_percent": base_ice_blast_percent,',
+        '        "final_attack": final_attack,',
+        '        "final_ice_blast_percent": final_ice_blast_percent,',
+        '        "physical_damage": final_attack,',
+    ]
+    for target in ("boss", "monster"):
+        lines += [
+            f'        "{target}_attack_bonus": jade_{target}_attack,',
+            f'        "{target}_ice_blast_percent": {target}_ice_blast_percent,',
+            f'        "{target}_damage": {target}_damage,',
+            f'        "{target}_flower_damage": {target}_flower_damage,',
+            f'        "jade_first_blast_{target}": {target}_first_blast,',
+            f'        "jade_second_blast_{target}": {target}_other_blast,',
+            f'        "jade_third_blast_{target}": {target}_other_blast,',
+            f'        "jade_total_damage_{target}": '
+            f'{target}_first_blast + {target}_other_blast + {target}_other_blast,',
+        ]
+    lines.append("    }")
+    return "\n".join(lines) + "\n"
+
+
+@lru_cache(maxsize=64)
+def _compile(ruleset: Ruleset, level_index: int, mask: int) -> Evaluator:
+    """Компилирует вычислитель; ключ кеша - набор правил, порог уровня и маска талантов."""
+    source = generate_source(ruleset, level_index, mask)
+    namespace: Dict[str, Any] = {"round": round}
+    exec(compile(source, f"<evaluator {ruleset.version} level={level_index} mask={mask:#x}>", "exec"), namespace)
+    evaluator = namespace["evaluate"]
+    evaluator.source = source
+    return evaluator
+
+
+def compile_evaluator(ruleset: Ruleset, hero_level: int, flags: Mapping[str, bool]) -> Evaluator:
+    """
+    Получить скомпилированный вычислитель для набора переключателей.
+
+    Вычислители кешируются: уровни героя между соседними порогами используют
+    одну функцию.
+
+    Args:
+        ruleset: Набор правил
+        hero_level: Уровень героя
+        flags: Значения флагов TALENT_FLAGS
+
+    Returns:
+        Функция evaluate(consciousness, jade_attack=0.0, jade_ice_blast=0.0,
+        jade_boss_attack=0.0, jade_monster_attack=0.0), возвращающая словарь
+        с ключами RESULT_KEYS. Исходный код доступен в атрибуте source.
+    """
+    return _compile(ruleset, ruleset.level_index(hero_level), ruleset.talent_mask(flags))
@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Перебор параметров сборки (sweep) с расчетом в пуле процессов.
+
+Пространство перебора - декартово произведение осей: сознание, уровень
+героя, изменяемые таланты и пресеты нефритов. Точка задается одним номером,
+который раскладывается по осям как число в смешанной системе счисления,
+поэтому куски перебора передаются процессам в виде диапазонов номеров и не
+требуют заранее построенных таблиц. Каждый кусок считается пакетно
+(models.batch.calculate_batch) и сразу записывается на диск, так что в
+памяти одновременно находится лишь несколько кусков.
+
+Модуль требует NumPy и не импортируется пакетом models автоматически.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import DEFAULT_CONSCIOUSNESS
+from models.batch import JADE_COLUMNS, OUTPUT_KEYS, calculate_batch
+from models.build import TALENT_FLAGS
+from models.jade import JadeConfig, calculate_jade_bonuses
+from models.pool import ordered_map
+from models.ruleset import DEFAULT_RULESET
+
+
+# Размер куска по умолчанию: столько точек считается и записывается за раз
+DEFAULT_CHUNK_SIZE = 200_000
+
+# Входные столбцы, которые пишутся перед результатами
+INPUT_COLUMNS = ("consciousness", "hero_level", "preset") + TALENT_FLAGS
+
+# Столбец с числом различных значений меньше этой доли длины форматируется
+# через таблицу различных значений
+UNIQUE_FORMAT_RATIO = 0.25
+
+
+def hero_level_breakpoints() -> List[int]:
+    """
+    Получить уровни героя, на которых меняется бонус атаки.
+
+    Между соседними порогами уровня из набора правил результат не зависит от
+    уровня, поэтому для перебора достаточно одного уровня на каждый отрезок.
+
+    Returns:
+        Уровень 1 и все пороговые уровни по возрастанию
+    """
+    return sorted({1, *DEFAULT_RULESET.level_thresholds})
+
+
+def parse_range(text: str) -> List[float]:
+    """
+    Разобрать описание значений оси.
+
+    Поддерживаются список через запятую ("1000,1120") и диапазон
+    "начало:конец:шаг", в который конец включается.
+
+    Args:
+        text: Описание значений
+
+    Returns:
+        Список значений
+    """
+    if ":" in text:
+        parts = [float(part) for part in text.split(":")]
+        if len(parts) != 3 or parts[2] <= 0:
+            raise ValueError(f"Диапазон должен иметь вид начало:конец:шаг с положительным шагом: {text}")
+        start, stop, step = parts
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        # Значения считаем от начала, чтобы шаг не накапливал ошибку
+        return [start + step * i for i in range(max(count, 0))]
+
+    return [float(part) for part in text.split(",") if part.strip()]
+
+
+def preset_bonuses(jades: Iterable[JadeConfig]) -> Tuple[float, float, float, float]:
+    """
+    Свести набор нефритов к бонусам, которые принимает пакетный расчет.
+
+    Args:
+        jades: Конфигурации нефритов
+
+    Returns:
+        Бонусы в порядке столбцов JADE_COLUMNS
+    """
+    bonuses = calculate_jade_bonuses(list(jades))
+    return tuple(bonuses.get(stat_type, 0.0) for stat_type in JADE_COLUMNS.values())
+
+
+class SweepSpec:
+    """Описание пространства перебора."""
+
+    __slots__ = ("consciousness", "hero_levels", "vary", "fixed", "preset_names", "preset_bonuses", "shape")
+
+    def __init__(self,
+                 consciousness: Sequence[float] = (DEFAULT_CONSCIOUSNESS,),
+                 hero_levels: Optional[Sequence[int]] = None,
+                 vary: Sequence[str] = (),
+                 fixed: Optional[Dict[str, bool]] = None,
+                 presets: Optional[Dict[str, Iterable[JadeConfig]]] = None):
+        """
+        Инициализация пространства перебора.
+
+        Args:
+            consciousness: Значения сознания
+            hero_levels: Уровни героя (по умолчанию hero_level_breakpoints())
+            vary: Таланты, которые перебираются в обоих состояниях
+            fixed: Значения остальных талантов (не указанные выключены)
+            presets: Пресеты нефритов: название -> конфигурации нефритов
+                     (по умолчанию один пресет "Без нефритов")
+        """
+        fixed = dict(fixed or {})
+        unknown = (set(vary) | set(fixed)) - set(TALENT_FLAGS)
+        if unknown:
+            raise ValueError(f"Неизвестные параметры: {', '.join(sorted(unknown))}")
+        both = set(vary) & set(fixed)
+        if both:
+            raise ValueError(f"Параметры не могут быть одновременно перебираемыми и фиксированными: "
+                             f"{', '.join(sorted(both))}")
+
+        if presets is None:
+            presets = {"Без нефритов": []}
+
+        self.consciousness = np.asarray(consciousness, dtype=np.float64)
+        self.hero_levels = np.asarray(hero_levels if hero_levels is not None else hero_level_breakpoints(),
+                                      dtype=np.int64)
+        # Перебираемые таланты храним в порядке TALENT_FLAGS, чтобы номера точек не зависели от порядка аргументов
+        self.vary = tuple(name for name in TALENT_FLAGS if name in vary)
+        self.fixed = {name: bool(fixed.get(name, False)) for name in TALENT_FLAGS if name not in self.vary}
+        self.preset_names = list(presets)
+        self.preset_bonuses = np.array([preset_bonuses(jades) for jades in presets.values()],
+                                       dtype=np.float64).reshape(-1, len(JADE_COLUMNS))
+
+        self.shape = (len(self.consciousness), len(self.hero_levels), len(self.preset_names)) + (2,) * len(self.vary)
+
+    def __len__(self) -> int:
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    def columns(self, start: int, stop: int) -> Dict[str, np.ndarray]:
+        """
+        Построить входные столбцы для точек с номерами start..stop-1.
+
+        Args:
+            start: Номер первой точки
+            stop: Номер точки после последней
+
+        Returns:
+            Словарь столбцов: аргументы calculate_batch и номер пресета "preset"
+        """
+        axes = np.unravel_index(np.arange(start, stop, dtype=np.int64), self.shape)
+        consciousness_index, level_index, preset_index = axes[:3]
+
+        columns = {
+            "consciousness": self.consciousness[consciousness_index],
+            "hero_level": self.hero_levels[level_index],
+            "preset": preset_index,
+        }
+        for i, column in enumerate(JADE_COLUMNS):
+            columns[column] = self.preset_bonuses[preset_index, i]
+        for name, value in self.fixed.items():
+            columns[name] = value
+        for name, axis in zip(self.vary, axes[3:]):
+            columns[name] = axis.astype(bool)
+        return columns
+
+
+def evaluate_chunk(spec: SweepSpec, start: int, stop: int,
+                   outputs: Sequence[str] = OUTPUT_KEYS) -> Dict[str, np.ndarray]:
+    """
+    Рассчитать кусок перебора.
+
+    Args:
+        spec: Пространство перебора
+        start: Номер первой точки
+        stop: Номер точки после последней
+        outputs: Ключи результатов, которые нужно вернуть
+
+    Returns:
+        Столбцы INPUT_COLUMNS и выбранных результатов
+    """
+    columns = spec.columns(start, stop)
+    preset = columns.pop("preset")
+    results = calculate_batch(**columns)
+
+    size = stop - start
+    chunk = {
+        "consciousness": columns["consciousness"],
+        "hero_level": columns["hero_level"],
+        "preset": preset,
+    }
+    for name in TALENT_FLAGS:
+        chunk[name] = np.broadcast_to(columns[name], size)
+    for key in outputs:
+        chunk[key] = results[key]
+    return chunk
+
+
+def format_chunk(spec: SweepSpec, chunk: Dict[str, np.ndarray]) -> str:
+    """
+    Записать кусок в виде строк CSV.
+
+    Числа записываются кратчайшим точным представлением (как str()),
+    таланты - как 0/1, пресеты - названиями (в кавычках по правилам CSV,
+    если название содержит запятую, кавычку или перевод строки).
+
+    Форматируются целые столбцы: у входов и многих результатов всего
+    несколько различных значений, и каждое из них переводится в строку
+    один раз, а столбец, совпадающий с уже записанным (например, третий
+    взрыв нефрита со вторым), берет готовые строки. Строки куска
+    собираются одним join.
+
+    Args:
+        spec: Пространство перебора
+        chunk: Столбцы, полученные от evaluate_chunk
+
+    Returns:
+        Строки CSV без заголовка, каждая с переводом строки
+    """
+    names = np.array([_csv_field(name) for name in spec.preset_names], dtype=object)
+    columns = []
+    # Уже отформатированные столбцы: (битовое представление, строки)
+    formatted = []
+    for key, values in chunk.items():
+        if key == "preset":
+            columns.append(names[values].tolist())
+            continue
+
+        bits = values.view(np.int64) if values.dtype == np.float64 else values
+        for other_bits, text in formatted:
+            if other_bits.dtype == bits.dtype and np.array_equal(other_bits, bits):
+                break
+        else:
+            text = _format_column(values)
+            formatted.append((bits, text))
+        columns.append(text)
+
+    if not columns or not len(columns[0]):
+        return ""
+    return "\n".join(map(",".join, zip(*columns))) + "\n"
+
+
+def _csv_field(text: str) -> str:
+    """Заключает поле в кавычки, если этого требуют правила CSV (как csv.QUOTE_MINIMAL)."""
+    if any(char in text for char in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def _format_column(values: np.ndarray) -> List[str]:
+    """
+    Переводит столбец чисел в строки, как str() каждого значения.
+
+    Различные значения ищутся по битовому представлению, поэтому -0.0 и
+    NaN сохраняют свою запись.
+    """
+    if values.dtype == bool:
+        return np.where(values, "1", "0").tolist()
+
+    keys = values.view(np.int64) if values.dtype == np.float64 else values
+    unique, inverse = np.unique(keys, return_inverse=True)
+    if len(unique) < len(values) * UNIQUE_FORMAT_RATIO:
+        if values.dtype == np.float64:
+            unique = unique.view(np.float64)
+        return np.array(list(map(repr, unique.tolist())), dtype=object)[inverse].tolist()
+    return list(map(repr, values.tolist()))
+
+
+def _sweep_task(task) -> Tuple[str, int]:
+    """Задача процесса пула: рассчитать кусок и сразу отформатировать его."""
+    spec, start, stop, outputs = task
+    return format_chunk(spec, evaluate_chunk(spec, start, stop, outputs)), stop - start
+
+
+def _chunk_bounds(total: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """Перебирает границы кусков [start, stop)."""
+    for start in range(0, total, chunk_size):
+        yield start, min(start + chunk_size, total)
+
+
+def iter_sweep(spec: SweepSpec,
+               chunk_size: int = DEFAULT_CHUNK_SIZE,
+               outputs: Sequence[str] = OUTPUT_KEYS) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Перебирает результаты по кускам в текущем процессе.
+
+    Args:
+        spec: Пространство перебора
+        chunk_size: Число точек в куске
+        outputs: Ключи результатов, которые нужно вернуть
+
+    Yields:
+        Столбцы очередного куска (см. evaluate_chunk)
+    """
+    for start, stop in _chunk_bounds(len(spec), chunk_size):
+        yield evaluate_chunk(spec, start, stop, outputs)
+
+
+def run_sweep(spec: SweepSpec,
+              path: str,
+              workers: Optional[int] = None,
+              chunk_size: int = DEFAULT_CHUNK_SIZE,
+              outputs: Sequence[str] = OUTPUT_KEYS,
+              progress=None) -> int:
+    """
+    Выполняет перебор и записывает результаты в CSV по мере готовности.
+
+    Куски считаются и форматируются в процессах пула, а записываются по
+    порядку номеров (models.pool.ordered_map), поэтому расход памяти не
+    зависит от размера перебора.
+
+    Args:
+        spec: Пространство перебора
+        path: Путь к CSV-файлу
+        workers: Число процессов (None - по числу ядер, 1 - без пула)
+        chunk_size: Число точек в куске
+        outputs: Ключи результатов, которые нужно записать
+        progress: Необязательная функция progress(готово, всего)
+
+    Returns:
+        Число записанных точек
+    """
+    unknown = set(outputs) - set(OUTPUT_KEYS)
+    if unknown:
+        raise ValueError(f"Неизвестные результаты: {', '.join(sorted(unknown))}")
+
+    total = len(spec)
+    outputs = tuple(outputs)
+    tasks = ((spec, start, stop, outputs) for start, stop in _chunk_bounds(total, chunk_size))
+
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        file.write(",".join(INPUT_COLUMNS + outputs) + "\n")
+        done = 0
+        for text, size in ordered_map(_sweep_task, tasks, workers):
+            file.write(text)
+            done += size
+            if progress is not None:
+                progress(done, total)
+
+    return done
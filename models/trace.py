@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Структурированная трасса расчета урона.
+
+Во время расчета модель сохраняет только идентификатор шаблона и числовые
+аргументы каждого шага. Текст собирается лишь тогда, когда его запрашивает
+вкладка "Детали расчетов" или экспорт.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# Шаблоны строк трассы: идентификатор -> строка формата
+TEMPLATES: Dict[str, str] = {
+    "blank": "",
+
+    # Входные данные
+    "input_header": "ВХОДНЫЕ ДАННЫЕ:",
+    "input_consciousness": "Сознание: {0}",
+    "input_hero_level": "Уровень героя: {0}",
+    "input_base_attack": "База атаки: {0}",
+    "input_explosion_coef": "Коэффициент взрыва: {0}",
+    "input_flower_coef": "Коэффициент цветочного взрыва: {0}",
+    "input_jade_active": "Нефрит (3 взрыва): Активен",
+    "input_match_on": "Совпадение уровня сознания: Активно",
+    "input_match_off": "Совпадение уровня сознания: Неактивно",
+    "input_jade_attack": "Бонус атаки от нефритов: {0:.2f} ({0:.0%})",
+    "input_jade_ice_blast": "Бонус лед. взрыва от нефритов: {0:.2f} ({0:.0%})",
+    "input_jade_boss_attack": "Бонус атаки по боссам от нефритов: {0:.2f} ({0:.0%})",
+    "input_jade_monster_attack": "Бонус атаки по монстрам от нефритов: {0:.2f} ({0:.0%})",
+
+    # Общие слагаемые бонусов
+    "add_hero_level": "+ Бонус атаки от уровня героя ({0}): {1}",
+    "add_untouchable_talent": "+ Талант неприкосновенности: {0}",
+    "add_power": "+ Мощь: {0}",
+    "add_jade_attack": "+ Статы атаки на нефритах: {0:.2f}",
+    "add_ice_root": "+ Ледяной корень: {0}",
+    "add_jade_ice_blast": "+ Статы %взрыва на нефритах: {0:.2f}",
+    "add_ice_flash": "+ Ледяная вспышка: {0}",
+    "add_aroma_aura": "+ Аура Аромата: {0}",
+    "add_frost_seal": "+ Морозная печать: {0}",
+    "add_tundra_power": "+ Мощь тундры: {0}",
+    "add_frostbound_lotus": "+ Морозный лотос: {0}",
+    "add_frost_bloom": "+ Морозное цветение: {0}",
+    "ice_blast_start": "Базовый % ледяного взрыва: 1.0 (100%)",
+
+    # Базовые параметры
+    "base_header": "РАСЧЕТ БАЗОВЫХ ПАРАМЕТРОВ:",
+    "base_formula": "Формула атаки: (база атаки + (сознание/10)) * (1 + бонусы)",
+    "base_bonus_start": "Базовый бонус атаки: 1.0",
+    "base_bonus_total": "Итоговый базовый бонус атаки: {0:.2f}",
+    "base_attack_header": "Расчет базовой атаки:",
+    "base_attack": "({0} + ({1}/10)) * {2:.2f} = {3:.2f}",
+    "base_ice_blast_header": "Расчет базового % ледяного взрыва:",
+    "base_ice_blast_total": "Итоговый базовый % ледяного взрыва: {0:.2f} ({0:.0%})",
+
+    # Боевые параметры
+    "combat_header": "РАСЧЕТ БОЕВЫХ ПАРАМЕТРОВ:",
+    "combat_formula": "Формула атаки: (база атаки + (сознание/10)) * (1 + бонусы) * (1 + F тессы)",
+    "combat_bonus_start": "Боевой бонус атаки: 1.0",
+    "combat_bonus_total": "Итоговый боевой бонус атаки: {0:.2f}",
+    "tessa_on": "Множитель F тессы: {0:.2f} (активирован)",
+    "tessa_off": "Множитель F тессы: {0:.2f} (не активирован)",
+    "match_bonus": "Бонус атаки от совпадения уровня сознания: +{0:.0%}",
+    "final_attack_header": "Расчет боевой атаки:",
+    "final_attack_base": "({0} + ({1}/10)) * {2:.2f} * {3:.2f} = {4:.2f} (базовая атака)",
+    "final_attack_match": "{0:.2f} * {1:.2f} = {2:.2f} (с учетом совпадения уровня сознания)",
+    "final_attack": "({0} + ({1}/10)) * {2:.2f} * {3:.2f} = {4:.2f}",
+    "physical_header": "Расчет физического урона:",
+    "physical": "Физический урон = Атака = {0:.2f}",
+    "final_ice_blast_header": "Расчет боевого % ледяного взрыва:",
+    "final_ice_blast_total": "Итоговый боевой % ледяного взрыва: {0:.2f} ({0:.0%})",
+
+    # Боссы
+    "boss_header": "РАСЧЕТ ПАРАМЕТРОВ ПО БОССАМ:",
+    "boss_attack_bonus": "Бонус атаки по боссам: {0:.2f} ({0:.0%})",
+    "boss_physical_header": "Расчет физического урона по боссам:",
+    "boss_ice_blast_header": "Расчет % ледяного взрыва по боссам:",
+    "boss_damage_header": "Расчет урона ледяного взрыва по боссам:",
+    "boss_flower_header": "Расчет урона цветочного взрыва по боссам:",
+
+    # Обычные монстры
+    "monster_header": "РАСЧЕТ ПАРАМЕТРОВ ПО ОБЫЧНЫМ МОНСТРАМ:",
+    "monster_attack_bonus": "Бонус атаки по монстрам: {0:.2f} ({0:.0%})",
+    "monster_physical_header": "Расчет физического урона по монстрам:",
+    "monster_ice_blast_header": "Расчет % ледяного взрыва по монстрам:",
+    "monster_damage_header": "Расчет урона ледяного взрыва по монстрам:",
+    "monster_flower_header": "Расчет урона цветочного взрыва по монстрам:",
+
+    # Формулы веток боссов и монстров
+    "target_physical": "{0:.2f} * (1 + {1:.2f}) = {2:.2f}",
+    "target_ice_blast": "(1 * (1 + {0:.2f})) + ({1:.2f} - 1) = {2:.2f}",
+    "target_damage": "{0:.2f} * {1:.2f} * {2} = {3:.2f}",
+
+    # Нефрит (3 взрыва)
+    "jade_header": "РАСЧЕТ УРОНА С НЕФРИТОМ (3 ВЗРЫВА):",
+    "jade_first_formula_header": "Формула для первого взрыва:",
+    "jade_other_formula_header": "Формула для второго/третьего взрыва:",
+    "jade_formula": "Округлить(Атака * %ЛедВзрыва * {0} * {1})",
+    "jade_boss_header": "Расчет урона с нефритом по боссам:",
+    "jade_monster_header": "Расчет урона с нефритом по монстрам:",
+    "jade_first_blast": "Первый взрыв: округлить({0:.2f} * {1:.2f} * {2} * {3}) = {4}",
+    "jade_second_blast": "Второй взрыв: округлить({0:.2f} * {1:.2f} * {2} * {3}) = {4}",
+    "jade_third_blast": "Третий взрыв: округлить({0:.2f} * {1:.2f} * {2} * {3}) = {4}",
+    "jade_boss_total": "Суммарный урон по боссам: {0}",
+    "jade_monster_total": "Суммарный урон по монстрам: {0}",
+}
+
+
+class CalculationTrace:
+    """Трасса расчета: список шагов (идентификатор шаблона, аргументы)."""
+
+    __slots__ = ("steps", "_text")
+
+    def __init__(self):
+        """Инициализация пустой трассы."""
+        self.steps: List[Tuple[str, Tuple[Any, ...]]] = []
+        self._text: Optional[str] = None
+
+    def add(self, template_id: str, *args: Any) -> None:
+        """
+        Добавить шаг трассы.
+
+        Args:
+            template_id: Идентификатор шаблона из TEMPLATES
+            *args: Аргументы шаблона
+        """
+        self.steps.append((template_id, args))
+        self._text = None
+
+    def extend(self, steps) -> None:
+        """
+        Добавить несколько шагов сразу.
+
+        Args:
+            steps: Пары (идентификатор шаблона, аргументы)
+        """
+        self.steps.extend(steps)
+        self._text = None
+
+    def lines(self) -> Iterator[str]:
+        """
+        Перебрать строки трассы.
+
+        Yields:
+            Отформатированные строки
+        """
+        templates = TEMPLATES
+        for template_id, args in self.steps:
+            yield templates[template_id].format(*args)
+
+    def render(self) -> str:
+        """
+        Собрать текст трассы. Результат кешируется.
+
+        Returns:
+            Текст с шагами расчета, разделенными переводом строки
+        """
+        if self._text is None:
+            self._text = "\n".join(self.lines())
+        return self._text
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Представить трассу в виде списка словарей для экспорта.
+
+        Returns:
+            Список записей {"id": ..., "args": [...]}
+        """
+        return [{"id": template_id, "args": list(args)} for template_id, args in self.steps]
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __str__(self) -> str:
+        return self.render()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Ожидаемый урон с учетом времени действия баффов.
+
+F тессы, Морозная печать, Аура Аромата и совпадение уровня сознания в бою
+действуют не постоянно, а часть времени. Для k таких баффов урон
+считается во всех 2 ** k состояниях сразу (models.batch.calculate_states
+повторяет ветки боссов и монстров из _calculate_combat_parameters), а
+затем усредняется с весами состояний: произведением долей времени
+действия для независимых баффов или заданными совместными вероятностями.
+
+Модуль требует NumPy и не импортируется пакетом models автоматически.
+"""
+
+from typing import Dict, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+
+from models.batch import OUTPUT_KEYS, calculate_states, columns_from_model
+from models.build import TALENT_FLAGS
+from models.ruleset import Ruleset
+
+
+# Переключатели, которые обычно являются баффами с неполным временем действия
+UPTIME_BUFFS = ("tessa_f", "frost_seal", "aroma_aura", "consciousness_match")
+
+# Допустимое отклонение суммы совместных вероятностей от единицы
+PROBABILITY_TOLERANCE = 1e-9
+
+
+class BuffStates:
+    """Распределение вероятностей по состояниям баффов."""
+
+    __slots__ = ("buffs", "probabilities")
+
+    def __init__(self, buffs: Sequence[str], probabilities: np.ndarray):
+        """
+        Инициализация распределения.
+
+        Args:
+            buffs: Баффы из TALENT_FLAGS; бафф i соответствует биту i номера состояния
+            probabilities: Вероятности 2 ** len(buffs) состояний
+
+        Raises:
+            ValueError: Если бафф неизвестен или повторяется, либо вероятности
+                        отрицательны или в сумме не дают единицу
+        """
+        buffs = tuple(buffs)
+        unknown = set(buffs) - set(TALENT_FLAGS)
+        if unknown:
+            raise ValueError(f"Неизвестные параметры: {', '.join(sorted(unknown))}")
+        if len(set(buffs)) != len(buffs):
+            raise ValueError("Баффы не должны повторяться")
+
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        if probabilities.shape != (1 << len(buffs),):
+            raise ValueError(f"Нужно {1 << len(buffs)} вероятностей состояний, получено {probabilities.size}")
+        if (probabilities < 0).any() or abs(probabilities.sum() - 1.0) > PROBABILITY_TOLERANCE:
+            raise ValueError("Вероятности состояний должны быть неотрицательными и в сумме давать 1")
+
+        self.buffs = buffs
+        self.probabilities = probabilities
+
+    @classmethod
+    def independent(cls, uptimes: Mapping[str, float]) -> "BuffStates":
+        """
+        Распределение для независимых баффов.
+
+        Args:
+            uptimes: Доля времени действия каждого баффа (от 0 до 1)
+
+        Returns:
+            Распределение, в котором вероятность состояния - произведение
+            долей включенных баффов и дополнений выключенных
+        """
+        if any(not 0.0 <= uptime <= 1.0 for uptime in uptimes.values()):
+            raise ValueError("Доля времени действия баффа должна быть от 0 до 1")
+
+        probabilities = np.ones(1)
+        # Бафф i добавляет старший бит: состояния без него, затем с ним
+        for uptime in uptimes.values():
+            probabilities = np.concatenate([probabilities * (1.0 - uptime), probabilities * uptime])
+        return cls(tuple(uptimes), probabilities)
+
+    @classmethod
+    def joint(cls, buffs: Sequence[str], probabilities: Mapping[Iterable[str], float]) -> "BuffStates":
+        """
+        Распределение по заданным совместным вероятностям.
+
+        Args:
+            buffs: Баффы, состояния которых перечисляются
+            probabilities: Вероятность каждого набора одновременно действующих
+                           баффов; не указанные наборы имеют вероятность 0
+
+        Returns:
+            Распределение состояний
+        """
+        buffs = tuple(buffs)
+        bits = {name: 1 << i for i, name in enumerate(buffs)}
+        states = np.zeros(1 << len(buffs))
+        for active, probability in probabilities.items():
+            active = (active,) if isinstance(active, str) else tuple(active)
+            unknown = set(active) - set(bits)
+            if unknown:
+                raise ValueError(f"Баффы не перечислены: {', '.join(sorted(unknown))}")
+            states[sum(bits[name] for name in set(active))] += probability
+        return cls(buffs, states)
+
+    def uptimes(self) -> Dict[str, float]:
+        """
+        Доли времени действия баффов (маргинальные вероятности).
+
+        Returns:
+            Словарь: бафф -> вероятность, что он действует
+        """
+        states = np.arange(len(self.probabilities))
+        return {name: float(self.probabilities[(states >> bit & 1).astype(bool)].sum())
+                for bit, name in enumerate(self.buffs)}
+
+
+def expected_results(columns: Dict[str, np.ndarray],
+                     states: BuffStates,
+                     ruleset: Optional[Ruleset] = None,
+                     outputs: Sequence[str] = OUTPUT_KEYS) -> Dict[str, np.ndarray]:
+    """
+    Ожидаемые результаты для множества сборок.
+
+    Args:
+        columns: Входные столбцы calculate_batch; значения баффов из states в них игнорируются
+        states: Распределение состояний баффов
+        ruleset: Набор правил
+        outputs: Ключи результатов
+
+    Returns:
+        Столбцы ожидаемых значений; целочисленные взрывы нефрита
+        усредняются в числа с плавающей точкой
+    """
+    results = calculate_states(columns, states.buffs, ruleset)
+    return {key: results[key].astype(np.float64) @ states.probabilities for key in outputs}
+
+
+def expected_damage(model, states: BuffStates, outputs: Sequence[str] = OUTPUT_KEYS) -> Dict[str, float]:
+    """
+    Ожидаемые результаты текущей сборки модели.
+
+    Args:
+        model: Модель расчета урона
+        states: Распределение состояний баффов
+        outputs: Ключи результатов
+
+    Returns:
+        Словарь ожидаемых значений
+    """
+    results = expected_results(columns_from_model(model), states, model.ruleset, outputs)
+    return {key: float(values[0]) for key, values in results.items()}
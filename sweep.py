@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Перебор параметров сборки без интерфейса.
+
+Пример:
+    python sweep.py --consciousness 800:1600:1 --vary tessa_f,frost_seal \\
+        --on power,ice_root --presets presets.json --output sweep.csv
+
+Файл пресетов - JSON-объект {"название": [[["Атака", "10"], ...], ...]}:
+для каждого пресета список нефритов, для каждого нефрита список статов.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Добавляем текущую директорию в путь импорта
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+from config import DEFAULT_CONSCIOUSNESS
+from models.batch import OUTPUT_KEYS
+from models.build import TALENT_FLAGS
+from models.jade import JadeConfig
+from models.sweep import DEFAULT_CHUNK_SIZE, SweepSpec, hero_level_breakpoints, parse_range, run_sweep
+
+
+def _split(text):
+    """Разбивает список через запятую."""
+    return [part.strip() for part in text.split(",") if part.strip()] if text else []
+
+
+def load_presets(path):
+    """
+    Читает пресеты нефритов из JSON-файла.
+
+    Args:
+        path: Путь к файлу
+
+    Returns:
+        Словарь название -> конфигурации нефритов
+    """
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    return {
+        name: [JadeConfig.from_stats(i, stats) for i, stats in enumerate(jades)]
+        for name, jades in data.items()
+    }
+
+
+def parse_args(argv=None):
+    """Разбор аргументов командной строки."""
+    parser = argparse.ArgumentParser(description="Перебор параметров сборки с записью результатов в CSV")
+    parser.add_argument("--consciousness", default=str(DEFAULT_CONSCIOUSNESS),
+                        help="значения сознания: список через запятую или начало:конец:шаг")
+    parser.add_argument("--hero-levels", default="breakpoints",
+                        help="уровни героя через запятую или breakpoints (пороги бонуса атаки)")
+    parser.add_argument("--vary", default="", help="таланты, перебираемые во включенном и выключенном состоянии")
+    parser.add_argument("--on", default="", help="таланты, включенные во всех точках")
+    parser.add_argument("--presets", help="JSON-файл с пресетами нефритов")
+    parser.add_argument("--outputs", default="", help="результаты для записи (по умолчанию все)")
+    parser.add_argument("--output", default="sweep.csv", help="путь к CSV-файлу результатов")
+    parser.add_argument("--workers", type=int, default=None, help="число процессов (1 - без пула)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="точек в одном куске")
+    args = parser.parse_args(argv)
+
+    for option in ("vary", "on"):
+        unknown = set(_split(getattr(args, option))) - set(TALENT_FLAGS)
+        if unknown:
+            parser.error(f"--{option}: неизвестные таланты {', '.join(sorted(unknown))}; "
+                         f"доступны {', '.join(TALENT_FLAGS)}")
+    unknown = set(_split(args.outputs)) - set(OUTPUT_KEYS)
+    if unknown:
+        parser.error(f"--outputs: неизвестные результаты {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None):
+    """Точка входа перебора."""
+    args = parse_args(argv)
+
+    if args.hero_levels == "breakpoints":
+        hero_levels = hero_level_breakpoints()
+    else:
+        hero_levels = [int(level) for level in parse_range(args.hero_levels)]
+
+    spec = SweepSpec(
+        consciousness=parse_range(args.consciousness),
+        hero_levels=hero_levels,
+        vary=_split(args.vary),
+        fixed={name: True for name in _split(args.on)},
+        presets=load_presets(args.presets) if args.presets else None,
+    )
+    outputs = _split(args.outputs) or OUTPUT_KEYS
+
+    total = len(spec)
+    print(f"Точек: {total:,} ({' x '.join(map(str, spec.shape))})", file=sys.stderr)
+
+    def progress(done, total):
+        print(f"\rГотово: {done:,} из {total:,}", end="", file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    written = run_sweep(spec, args.output, workers=args.workers, chunk_size=args.chunk_size,
+                        outputs=outputs, progress=progress)
+    elapsed = time.perf_counter() - start
+    print(f"\nЗаписано {written:,} точек в {args.output} за {elapsed:.1f} с", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@
 from ui.main_window import DamageCalculatorWindow
 from ui.main_tab import MainTab
 from ui.details_tab import DetailsTab
+from ui.gains_tab import GainsTab
 from ui.jade_panel import JadePanel
 
-__all__ = ['DamageCalculatorWindow', 'MainTab', 'DetailsTab', 'JadePanel']
\ No newline at end of file
+__all__ = ['DamageCalculatorWindow', 'MainTab', 'DetailsTab', 'GainsTab', 'JadePanel']
\ No newline at end of file
@@ -4,11 +4,64 @@
 """
 Вкладка с деталями расчетов в приложении "Калькулятор урона".
 """
+from typing import Dict, List, Optional, Sequence
+
+from config import DETAILS_RENDER_CHUNK_LINES
 from utils.focus_handlers import add_focus_handler
 import tkinter as tk
 from tkinter import ttk
 
 
+def classify_line(line: str) -> Optional[str]:
+    """
+    Определяет тег оформления строки текста расчета.
+
+    Args:
+        line: Строка текста
+
+    Returns:
+        Имя тега или None для обычной строки
+    """
+    if line.isupper() and ":" in line:  # Заголовки
+        return "heading"
+    if "Формула" in line or ":" in line and not line.startswith(' '):  # Подзаголовки
+        return "subheading"
+    if "=" in line and not line.startswith(' '):  # Формулы
+        return "formula"
+    if "Итоговый" in line or "Суммарный" in line:  # Результаты
+        return "result"
+    return None
+
+
+def tag_ranges(lines: Sequence[str], first_line: int = 1) -> Dict[str, List[str]]:
+    """
+    Группирует подряд идущие строки с одинаковым тегом в диапазоны индексов Text.
+
+    Каждый диапазон захватывает и перевод строки, как при построчной вставке
+    с тегом.
+
+    Args:
+        lines: Строки текста
+        first_line: Номер строки Text, с которой вставлена первая строка
+
+    Returns:
+        Словарь {тег: [начало, конец, начало, конец, ...]} для Text.tag_add
+    """
+    ranges: Dict[str, List[str]] = {}
+    current = None
+    start = first_line
+    for number, line in enumerate(lines, first_line):
+        tag = classify_line(line)
+        if tag != current:
+            if current is not None:
+                ranges.setdefault(current, []).extend((f"{start}.0", f"{number}.0"))
+            current = tag
+            start = number
+    if current is not None:
+        ranges.setdefault(current, []).extend((f"{start}.0", f"{first_line + len(lines)}.0"))
+    return ranges
+
+
 class DetailsTab(ttk.Frame):
     """Вкладка с деталями расчетов."""
 
@@ -22,7 +75,18 @@ class DetailsTab(ttk.Frame):
         """
         super().__init__(parent, padding=theme.PADDING)
         self.theme = theme
-        self._create_widgets()
+
+        # Трасса, ожидающая отображения (текст собирается только при показе вкладки)
+        self._pending_steps = None
+
+        # Идентификатор отложенного вывода следующей части длинного текста
+        self._render_after_id = None
+
+        # Виджеты вкладки создаются при ее первом показе, чтобы не замедлять запуск
+        self.calculations_text = None
+
+        # Откладываем создание виджетов и форматирование трассы до показа вкладки
+        self.bind("<Map>", self._on_map)
 
     def _create_widgets(self):
         """Создает виджеты для вкладки."""
@@ -125,35 +189,73 @@ class DetailsTab(ttk.Frame):
         # Снова запрещаем редактирование
         self.calculations_text.config(state=tk.DISABLED)
 
-    def update_calculation_text(self, text):
+    def update_calculation_text(self, steps):
         """
         Обновляет текст с деталями расчетов с форматированием.
 
+        Если вкладка сейчас скрыта, трасса сохраняется и превращается в текст
+        только при ее показе.
+
+        Args:
+            steps: Трасса расчета (CalculationTrace) или готовый текст
+        """
+        if self.calculations_text is None or not self.winfo_ismapped():
+            self._pending_steps = steps
+            return
+
+        self._pending_steps = None
+        self._show_calculation_text(str(steps))
+
+    def _on_map(self, event=None):
+        """Создает виджеты при первом показе вкладки и отображает отложенную трассу."""
+        if self.calculations_text is None:
+            self._create_widgets()
+        if self._pending_steps is not None:
+            self.update_calculation_text(self._pending_steps)
+
+    def _show_calculation_text(self, text: str):
+        """
+        Выводит текст расчета в текстовое поле с форматированием.
+
         Args:
             text: Текст с деталями расчетов
         """
-        # Разрешаем редактирование для вставки текста
-        self.calculations_text.config(state=tk.NORMAL)
+        # Прерываем вывод предыдущего текста, если он еще не закончен
+        if self._render_after_id is not None:
+            self.after_cancel(self._render_after_id)
+            self._render_after_id = None
 
         # Очищаем текст
+        self.calculations_text.config(state=tk.NORMAL)
         self.calculations_text.delete("1.0", tk.END)
+        self.calculations_text.config(state=tk.DISABLED)
+
+        # Первая часть выводится сразу, остальные - между событиями интерфейса
+        self._render_chunk(text.split('\n'), 0)
+
+        # Прокручиваем к началу
+        self.calculations_text.see("1.0")
+
+    def _render_chunk(self, lines: List[str], start: int):
+        """
+        Выводит часть строк одной вставкой и размечает ее тегами по диапазонам.
 
-        # Добавляем форматированный текст
-        lines = text.split('\n')
-        for line in lines:
-            if line.isupper() and ":" in line:  # Заголовки
-                self.calculations_text.insert(tk.END, line + "\n", "heading")
-            elif "Формула" in line or ":" in line and not line.startswith(' '):  # Подзаголовки
-                self.calculations_text.insert(tk.END, line + "\n", "subheading")
-            elif "=" in line and not line.startswith(' '):  # Формулы
-                self.calculations_text.insert(tk.END, line + "\n", "formula")
-            elif "Итоговый" in line or "Суммарный" in line:  # Результаты
-                self.calculations_text.insert(tk.END, line + "\n", "result")
-            else:
-                self.calculations_text.insert(tk.END, line + "\n")
+        Args:
+            lines: Все строки текста
+            start: Индекс первой строки части
+        """
+        self._render_after_id = None
+        chunk = lines[start:start + DETAILS_RENDER_CHUNK_LINES]
+
+        # Разрешаем редактирование для вставки текста
+        self.calculations_text.config(state=tk.NORMAL)
+        self.calculations_text.insert(tk.END, "\n".join(chunk) + "\n")
+        for tag, indices in tag_ranges(chunk, start + 1).items():
+            self.calculations_text.tag_add(tag, *indices)
 
         # Снова запрещаем редактирование
         self.calculations_text.config(state=tk.DISABLED)
 
-        # Прокручиваем к началу
-        self.calculations_text.see("1.0")
\ No newline at end of file
+        start += len(chunk)
+        if start < len(lines):
+            self._render_after_id = self.after(1, self._render_chunk, lines, start)
\ No newline at end of file
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Вкладка прироста урона от улучшений в приложении "Калькулятор урона".
+"""
+from typing import Callable, List, Optional
+
+from models.marginal import MarginalGain, best_upgrade
+from ui.main_tab import format_delta
+from utils.focus_handlers import add_focus_handler
+import tkinter as tk
+from tkinter import ttk
+
+
+# Столбцы таблицы: (ключ результата, заголовок)
+GAIN_COLUMNS = (
+    ("final_attack", "Атака"),
+    ("boss_damage", "Лед. взрыв (босс)"),
+    ("boss_flower_damage", "Цветок (босс)"),
+    ("jade_total_damage_boss", "Нефрит x3 (босс)"),
+    ("monster_damage", "Лед. взрыв (монстры)"),
+    ("monster_flower_damage", "Цветок (монстры)"),
+    ("jade_total_damage_monster", "Нефрит x3 (монстры)"),
+)
+
+
+class GainsTab(ttk.Frame):
+    """Вкладка с приростом результатов от следующего улучшения."""
+
+    def __init__(self, parent, theme):
+        """
+        Инициализация вкладки прироста.
+
+        Args:
+            parent: Родительский виджет
+            theme: Тема оформления
+        """
+        super().__init__(parent, padding=theme.PADDING)
+        self.theme = theme
+
+        # Источник отчета, ожидающий отображения: отчет считается только при показе вкладки
+        self._pending_gains: Optional[Callable[[], List[MarginalGain]]] = None
+
+        # Виджеты вкладки создаются при ее первом показе, чтобы не замедлять запуск
+        self.gains_table = None
+        self.best_var = tk.StringVar(value="Выполните расчет, чтобы увидеть прирост от улучшений.")
+
+        self.bind("<Map>", self._on_map)
+
+    def _create_widgets(self):
+        """Создает виджеты для вкладки."""
+        # Заголовок
+        title_label = ttk.Label(self, text="Прирост от следующего улучшения", style="Title.TLabel")
+        title_label.pack(fill=tk.X, pady=(0, self.theme.LARGE_PADDING))
+
+        # Фрейм таблицы
+        gains_frame = ttk.LabelFrame(self, text="Изменение результатов", padding=self.theme.PADDING)
+        gains_frame.pack(fill=tk.BOTH, expand=True, padx=self.theme.PADDING, pady=self.theme.PADDING)
+
+        # Добавляем обработчик клика для снятия фокуса
+        add_focus_handler(gains_frame)
+
+        self.gains_table = ttk.Treeview(gains_frame, columns=[key for key, _ in GAIN_COLUMNS],
+                                        selectmode="browse")
+        self.gains_table.heading("#0", text="Улучшение")
+        self.gains_table.column("#0", width=200, stretch=False)
+        for key, title in GAIN_COLUMNS:
+            self.gains_table.heading(key, text=title)
+            self.gains_table.column(key, width=130, anchor=tk.E)
+
+        # Лучшие улучшения выделяются цветом
+        self.gains_table.tag_configure("best", foreground=self.theme.SECONDARY_COLOR)
+
+        scrollbar = ttk.Scrollbar(gains_frame, command=self.gains_table.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.gains_table.configure(yscrollcommand=scrollbar.set)
+        self.gains_table.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # Подсказка о лучшем улучшении
+        ttk.Label(self, textvariable=self.best_var, style="Result.TLabel", wraplength=900).pack(
+            fill=tk.X, padx=self.theme.PADDING)
+
+    def update_gains(self, get_gains: Callable[[], List[MarginalGain]]):
+        """
+        Обновляет таблицу прироста.
+
+        Отчет запрашивается только у видимой вкладки: если она сейчас скрыта,
+        источник сохраняется и вызывается при ее показе.
+
+        Args:
+            get_gains: Функция, возвращающая приросты (например,
+                       CachedCalculator.marginal_gains)
+        """
+        if self.gains_table is None or not self.winfo_ismapped():
+            self._pending_gains = get_gains
+            return
+
+        self._pending_gains = None
+        self._show_gains(get_gains())
+
+    def _on_map(self, event=None):
+        """Создает виджеты при первом показе вкладки и отображает отложенный отчет."""
+        if self.gains_table is None:
+            self._create_widgets()
+        if self._pending_gains is not None:
+            self.update_gains(self._pending_gains)
+
+    def _show_gains(self, gains: List[MarginalGain]):
+        """
+        Заполняет таблицу и подсказку о лучшем улучшении.
+
+        Args:
+            gains: Приросты
+        """
+        best_boss = best_upgrade(gains, "jade_total_damage_boss")
+        best_monster = best_upgrade(gains, "jade_total_damage_monster")
+
+        self.gains_table.delete(*self.gains_table.get_children())
+        for gain in gains:
+            tags = ("best",) if gain is best_boss or gain is best_monster else ()
+            values = [format_delta(gain.changes[key]) for key, _ in GAIN_COLUMNS]
+            self.gains_table.insert("", tk.END, text=gain.name, values=values, tags=tags)
+
+        hints = []
+        if best_boss is not None:
+            hints.append(f"по боссам - {best_boss.name} ({format_delta(best_boss.changes['jade_total_damage_boss'])})")
+        if best_monster is not None:
+            hints.append(f"по монстрам - {best_monster.name} "
+                         f"({format_delta(best_monster.changes['jade_total_damage_monster'])})")
+        if hints:
+            self.best_var.set("Наибольший прирост урона нефрита: " + "; ".join(hints) + ".")
+        else:
+            self.best_var.set("Ни одно улучшение не увеличивает урон нефрита.")
@@ -10,13 +10,59 @@ from tkinter import ttk
 from tkinter import messagebox
 from typing import List, Dict, Any, Callable
 
-from models.jade import JadeConfig, calculate_jade_bonuses
+from models.jade import JadeConfig, JadeStat, calculate_jade_bonuses
 from config import JADE_STAT_TYPES, FUSION_VALUES
 from utils.helpers import format_percent, create_tooltip
 from utils.focus_handlers import add_focus_handler
 from ui.theme import create_modern_button
 
 
+class JadeStatVars:
+    """Tk-переменные ячейки нефрита, синхронизируемые с записью JadeStat."""
+
+    def __init__(self, stat: JadeStat):
+        """
+        Инициализация переменных ячейки.
+
+        Args:
+            stat: Стат нефрита, в который переносятся изменения
+        """
+        self.stat = stat
+        self.type = tk.StringVar(value=stat.type)
+        self.value = tk.StringVar(value=stat.value)
+        self._value_listeners = []
+
+        self.type.trace_add("write", self._on_type_write)
+        self.value.trace_add("write", self._on_value_write)
+
+    def trace_value(self, callback: Callable) -> None:
+        """
+        Подписаться на изменение значения.
+
+        Колбэк вызывается после того, как значение перенесено в JadeStat.
+
+        Args:
+            callback: Функция без аргументов
+        """
+        self._value_listeners.append(callback)
+
+    def refresh(self) -> None:
+        """Обновляет переменные по текущему состоянию JadeStat."""
+        stat_type, value = self.stat.type, self.stat.value
+        if self.type.get() != stat_type:
+            self.type.set(stat_type)
+        if self.value.get() != value:
+            self.value.set(value)
+
+    def _on_type_write(self, *args):
+        self.stat.type = self.type.get()
+
+    def _on_value_write(self, *args):
+        self.stat.value = self.value.get()
+        for callback in self._value_listeners:
+            callback()
+
+
 class JadePanel(ttk.Frame):
     """Панель для настройки нефритов."""
 
@@ -33,6 +79,9 @@ class JadePanel(ttk.Frame):
         self.jade_configs = jade_configs
         self.theme = theme
         self.update_callback = None
+        self.optimize_callback = None
+        self.stat_vars: List[List[JadeStatVars]] = []
+        self._value_widget_updaters: List[Callable] = []
 
         # Переменные для отображения итоговых бонусов - убираем, так как перенесли в блок статов
         # self.jade_attack_bonus_var = tk.StringVar(value="0.00 (0%)")
@@ -50,6 +99,15 @@ class JadePanel(ttk.Frame):
         """
         self.update_callback = callback
 
+    def set_optimize_callback(self, callback: Callable):
+        """
+        Устанавливает функцию обратного вызова для подбора статов нефритов.
+
+        Args:
+            callback: Функция для вызова при нажатии кнопки подбора
+        """
+        self.optimize_callback = callback
+
     def _create_widgets(self):
         """Создает виджеты панели настройки нефритов."""
         # Заголовок
@@ -97,6 +155,16 @@ class JadePanel(ttk.Frame):
         )
         apply_button.pack(pady=self.theme.SMALL_PADDING, anchor=tk.CENTER)
 
+        # Кнопка подбора статов: подбор выполняется в фоне, прогресс виден в строке состояния
+        optimize_button = create_modern_button(
+            button_container,
+            "Подобрать статы",
+            command=self._on_optimize,
+            accent=False,
+            width=self.theme.BUTTON_WIDTH
+        )
+        optimize_button.pack(pady=self.theme.SMALL_PADDING, anchor=tk.CENTER)
+
         # Удаляем создание информационной панели с результатами, т.к. перенесли в блок статов
 
     def _create_jade_config_frame(self, parent, jade_config: JadeConfig, row: int, col: int):
@@ -138,8 +206,12 @@ class JadePanel(ttk.Frame):
         ttk.Label(jade_frame, text="Значение (%)").grid(
             row=0, column=1, sticky=tk.W)
 
+        # Создаем Tk-переменные для статов нефрита
+        jade_stat_vars = [JadeStatVars(stat) for stat in jade_config.stats]
+        self.stat_vars.append(jade_stat_vars)
+
         # Добавляем статы
-        for i, stat in enumerate(jade_config.stats):
+        for i, stat in enumerate(jade_stat_vars):
             row_idx = i + 1  # Начинаем с 2-й строки (индекс 1), т.к. чекбокса больше нет
 
             # Выпадающий список типов статов
@@ -158,45 +230,63 @@ class JadePanel(ttk.Frame):
                 sticky=tk.W
             )
 
-            # Виджеты для ввода значений
-
-            # 1. Entry для обычных статов
-            value_entry = ttk.Entry(jade_frame, textvariable=stat.value, width=8)
-
-            # 2. Combobox для слияния
-            fusion_combo = ttk.Combobox(
-                jade_frame,
-                textvariable=stat.value,
-                values=FUSION_VALUES,
-                width=7,
-                state="readonly"
-            )
+            # Виджеты для ввода значений создаются при первом выборе соответствующего
+            # типа стата: по умолчанию все ячейки пустые, и поля ввода и списки
+            # слияния большинству ячеек не нужны
+            value_widgets = {}
+
+            def get_value_widget(kind, stat_obj=stat, widgets=value_widgets, with_tooltip=(i == 0)):
+                widget = widgets.get(kind)
+                if widget is not None:
+                    return widget
+
+                if kind == "entry":
+                    # 1. Entry для обычных статов
+                    widget = ttk.Entry(jade_frame, textvariable=stat_obj.value, width=8)
+                    if with_tooltip:
+                        create_tooltip(widget, "Введите значение стата в процентах")
+                elif kind == "fusion":
+                    # 2. Combobox для слияния
+                    widget = ttk.Combobox(
+                        jade_frame,
+                        textvariable=stat_obj.value,
+                        values=FUSION_VALUES,
+                        width=7,
+                        state="readonly"
+                    )
+                    # Привязываем к событию выбора значения слияния
+                    widget.bind("<<ComboboxSelected>>", lambda event: self._update_jade_bonuses())
+                    if with_tooltip:
+                        create_tooltip(widget, "Выберите процент слияния")
+                else:
+                    # 3. Label для "Пусто"
+                    widget = ttk.Label(jade_frame, text="0", width=8)
 
-            # 3. Label для "Пусто"
-            empty_label = ttk.Label(jade_frame, text="0", width=8)
+                widgets[kind] = widget
+                return widget
 
             # Функция для обновления виджета значения при изменении типа
-            def update_value_widget(event=None, stat_obj=stat, entry=value_entry,
-                                    combo=fusion_combo, label=empty_label, row_num=row_idx):
+            def update_value_widget(event=None, stat_obj=stat, widgets=value_widgets,
+                                    get_widget=get_value_widget, row_num=row_idx):
                 # Удаляем все виджеты
-                entry.grid_forget()
-                combo.grid_forget()
-                label.grid_forget()
+                for widget in widgets.values():
+                    widget.grid_forget()
 
                 selected_type = stat_obj.type.get()
 
                 # Показываем нужный виджет в зависимости от типа
                 if selected_type == "Пусто":
                     stat_obj.value.set("0")
-                    label.grid(row=row_num, column=1, pady=self.theme.SMALL_PADDING, sticky=tk.W)
+                    widget = get_widget("empty")
                 elif selected_type == "Слияние":
                     if stat_obj.value.get() not in FUSION_VALUES:
                         stat_obj.value.set(FUSION_VALUES[0])
-                    combo.grid(row=row_num, column=1, pady=self.theme.SMALL_PADDING, sticky=tk.W)
+                    widget = get_widget("fusion")
                 else:
                     if stat_obj.value.get() == "0":
                         stat_obj.value.set("")
-                    entry.grid(row=row_num, column=1, pady=self.theme.SMALL_PADDING, sticky=tk.W)
+                    widget = get_widget("entry")
+                widget.grid(row=row_num, column=1, pady=self.theme.SMALL_PADDING, sticky=tk.W)
 
                 # Убираем фокус, чтобы убрать синее выделение
                 jade_frame.focus_set()
@@ -206,6 +296,7 @@ class JadePanel(ttk.Frame):
 
             # Привязываем функцию обновления к событию выбора
             stat_type_combo.bind("<<ComboboxSelected>>", update_value_widget)
+            self._value_widget_updaters.append(update_value_widget)
 
             # Добавляем отслеживание изменений значения для обновления бонусов
             def update_on_value_change(*args, stat_obj=stat):
@@ -221,25 +312,32 @@ class JadePanel(ttk.Frame):
                     pass  # Игнорируем некорректные значения
 
             # Привязываем отслеживание изменений к переменной значения
-            stat.value.trace_add("write", update_on_value_change)
-
-            # Привязываем отслеживание изменений для Combobox слияния
-            def update_on_fusion_change(*args, stat_obj=stat):
-                if stat_obj.type.get() == "Слияние":
-                    self._update_jade_bonuses()
-
-            # Привязываем к событию выбора значения слияния
-            fusion_combo.bind("<<ComboboxSelected>>", lambda event, stat_obj=stat:
-            self._update_jade_bonuses())
+            stat.trace_value(update_on_value_change)
 
             # Вызываем функцию проверки сразу для инициализации состояния
             update_value_widget()
 
-            # Добавляем подсказки
+            # Добавляем подсказку (подсказки полей значений добавляются при их создании)
             if i == 0:
                 create_tooltip(stat_type_combo, "Выберите тип стата для этой ячейки")
-                create_tooltip(value_entry, "Введите значение стата в процентах")
-                create_tooltip(fusion_combo, "Выберите процент слияния")
+
+    def refresh(self):
+        """
+        Обновляет панель по текущему состоянию конфигураций нефритов,
+        например после загрузки результата подбора статов.
+        """
+        for jade_stat_vars in self.stat_vars:
+            for stat_vars in jade_stat_vars:
+                stat_vars.refresh()
+
+        # Переключаем виджеты значений под новые типы статов
+        for update_value_widget in self._value_widget_updaters:
+            update_value_widget()
+
+    def _on_optimize(self):
+        """Обработчик нажатия кнопки подбора статов."""
+        if self.optimize_callback:
+            self.optimize_callback()
 
     def _update_jade_bonuses(self):
         """Обновляет отображение бонусов от нефритов и вызывает callback для обновления блока статов."""
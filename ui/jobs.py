@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Фоновые задачи для интерфейса "Калькулятора урона".
+
+Долгие расчеты (подбор нефритов, перебор параметров, моделирование)
+выполняются в отдельном потоке, чтобы не блокировать главный цикл Tk.
+Поток не обращается к виджетам: прогресс и результаты передаются через
+очередь, которую главный поток опрашивает с помощью after(), и все
+обработчики вызываются уже в главном потоке.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+
+# Период опроса очереди задач (мс)
+POLL_INTERVAL_MS = 50
+
+
+class JobCancelled(Exception):
+    """Задача прервана пользователем."""
+
+
+class Job:
+    """Фоновая задача. Передается функции задачи первым аргументом."""
+
+    def __init__(self, name: str, messages: "queue.Queue",
+                 on_done: Optional[Callable[[Any], None]] = None,
+                 on_error: Optional[Callable[[BaseException], None]] = None):
+        """
+        Инициализация задачи.
+
+        Args:
+            name: Название задачи для строки состояния
+            messages: Очередь сообщений для главного потока
+            on_done: Обработчик результата (вызывается в главном потоке)
+            on_error: Обработчик исключения (вызывается в главном потоке)
+        """
+        self.name = name
+        self.on_done = on_done
+        self.on_error = on_error
+        self._messages = messages
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        """Запрошена ли отмена задачи."""
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        """Запросить отмену. Задача прервется при следующем вызове check() или progress()."""
+        self._cancel.set()
+
+    def check(self) -> None:
+        """
+        Проверить, не запрошена ли отмена.
+
+        Raises:
+            JobCancelled: Если отмена запрошена
+        """
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def progress(self, done: int, total: int, text: Optional[str] = None) -> None:
+        """
+        Сообщить о прогрессе; вызывается из потока задачи.
+
+        Подходит как колбэк progress(готово, всего) для models.sweep.run_sweep
+        и models.optimizer.optimize_loadout.
+
+        Args:
+            done: Сколько выполнено
+            total: Сколько всего
+            text: Необязательное пояснение
+
+        Raises:
+            JobCancelled: Если отмена запрошена
+        """
+        self.check()
+        self._messages.put(("progress", self, (done, total, text)))
+
+
+class JobRunner:
+    """Выполняет задачи в фоновом потоке и доставляет их результаты в главный поток Tk."""
+
+    def __init__(self, widget,
+                 on_progress: Optional[Callable[[Job, int, int, Optional[str]], None]] = None,
+                 on_finish: Optional[Callable[[Job, str], None]] = None,
+                 max_workers: int = 1):
+        """
+        Инициализация исполнителя задач.
+
+        Args:
+            widget: Виджет, через планировщик которого опрашивается очередь
+            on_progress: Обработчик прогресса (job, готово, всего, пояснение)
+            on_finish: Обработчик завершения (job, состояние: "done", "cancelled" или "error")
+            max_workers: Число одновременно выполняемых задач
+        """
+        self.widget = widget
+        self.on_progress = on_progress
+        self.on_finish = on_finish
+        self.jobs: List[Job] = []
+        self._messages: "queue.Queue" = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._after_id: Optional[str] = None
+
+    @property
+    def busy(self) -> bool:
+        """Есть ли незавершенные задачи."""
+        return bool(self.jobs)
+
+    def submit(self, name: str, function: Callable[..., Any], *args,
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None) -> Job:
+        """
+        Запустить задачу.
+
+        Args:
+            name: Название задачи
+            function: Функция function(job, *args), выполняемая в фоновом потоке;
+                      она не должна обращаться к виджетам и к объектам, которые меняет интерфейс
+            *args: Аргументы функции
+            on_done: Обработчик результата
+            on_error: Обработчик исключения
+
+        Returns:
+            Задача
+        """
+        job = Job(name, self._messages, on_done, on_error)
+        self.jobs.append(job)
+        self._executor.submit(self._run, job, function, args)
+        if self._after_id is None:
+            self._after_id = self.widget.after(POLL_INTERVAL_MS, self._poll)
+        return job
+
+    def cancel_all(self) -> None:
+        """Запросить отмену всех задач."""
+        for job in self.jobs:
+            job.cancel()
+
+    def shutdown(self) -> None:
+        """Отменить задачи и остановить опрос (при закрытии окна)."""
+        self.cancel_all()
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: Job, function: Callable[..., Any], args) -> None:
+        """Выполняет задачу в фоновом потоке и отправляет итог в очередь."""
+        try:
+            job.check()
+            result = function(job, *args)
+        except JobCancelled:
+            self._messages.put(("cancelled", job, None))
+        except BaseException as e:
+            self._messages.put(("error", job, e))
+        else:
+            self._messages.put(("done", job, result))
+
+    def _poll(self) -> None:
+        """Разбирает очередь сообщений в главном потоке."""
+        self._after_id = None
+        progress = {}
+        finished = []
+        while True:
+            try:
+                kind, job, payload = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                # Из нескольких сообщений о прогрессе за период показываем только последнее
+                progress[job] = payload
+            else:
+                progress.pop(job, None)
+                finished.append((kind, job, payload))
+
+        if self.on_progress is not None:
+            for job, (done, total, text) in progress.items():
+                if not job.cancelled:
+                    self.on_progress(job, done, total, text)
+
+        for kind, job, payload in finished:
+            self.jobs.remove(job)
+            if kind == "done" and job.on_done is not None:
+                job.on_done(payload)
+            elif kind == "error" and job.on_error is not None:
+                job.on_error(payload)
+            if self.on_finish is not None:
+                self.on_finish(job, kind)
+
+        if self.jobs:
+            self._after_id = self.widget.after(POLL_INTERVAL_MS, self._poll)
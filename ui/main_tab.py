@@ -12,11 +12,108 @@ from typing import List, Dict, Any, Callable, Optional
 from models.damage_calculator import DamageCalculatorModel
 from models.jade import JadeConfig, calculate_jade_bonuses
 from ui.jade_panel import JadePanel
-from config import DEFAULT_CONSCIOUSNESS, DEFAULT_HERO_LEVEL, HERO_LEVEL_ATTACK_BONUS
+from config import DEFAULT_CONSCIOUSNESS, DEFAULT_HERO_LEVEL, LIVE_RECALC_DELAY_MS
 from utils.helpers import validate_float_input
 from utils.focus_handlers import add_focus_handler
+from utils.debounce import Debouncer
 from ui.theme import create_modern_button
 
+
+def _format_value(value: float) -> str:
+    """Форматирует значение с двумя знаками после запятой."""
+    return f"{value:.2f}"
+
+
+def _format_percent(value: float) -> str:
+    """Форматирует долю вместе с процентами."""
+    return f"{value:.2f} ({value * 100:.0f}%)"
+
+
+def _format_bonus(value: float) -> str:
+    """Форматирует процент с базой в 100% как бонус (без базовых 100%)."""
+    return _format_percent(value - 1.0)
+
+
+def _format_count(value: int) -> str:
+    """Форматирует целое значение урона."""
+    return f"{value}"
+
+
+# Поля панели результатов: (переменная вкладки, ключ результата, формат)
+RESULT_FIELDS = (
+    # Базовые и боевые статы
+    ("base_attack_result_var", "base_attack", _format_value),
+    ("base_ice_blast_result_var", "base_ice_blast_percent", _format_bonus),
+    ("final_attack_result_var", "final_attack", _format_value),
+    # Боевой % ледяного взрыва остается с базой в 100%
+    ("final_ice_blast_result_var", "final_ice_blast_percent", _format_percent),
+    ("physical_damage_var", "physical_damage", _format_value),
+
+    # Боссы
+    ("boss_attack_bonus_var", "boss_attack_bonus", _format_percent),
+    ("boss_ice_blast_percent_var", "boss_ice_blast_percent", _format_percent),
+    ("boss_damage_var", "boss_damage", _format_value),
+    ("boss_flower_damage_var", "boss_flower_damage", _format_value),
+    ("jade_first_blast_boss_var", "jade_first_blast_boss", _format_count),
+    ("jade_second_blast_boss_var", "jade_second_blast_boss", _format_count),
+    ("jade_third_blast_boss_var", "jade_third_blast_boss", _format_count),
+    ("jade_total_damage_boss_var", "jade_total_damage_boss", _format_count),
+
+    # Обычные монстры
+    ("monster_attack_bonus_var", "monster_attack_bonus", _format_percent),
+    ("monster_ice_blast_percent_var", "monster_ice_blast_percent", _format_percent),
+    ("monster_damage_var", "monster_damage", _format_value),
+    ("monster_flower_damage_var", "monster_flower_damage", _format_value),
+    ("jade_first_blast_monster_var", "jade_first_blast_monster", _format_count),
+    ("jade_second_blast_monster_var", "jade_second_blast_monster", _format_count),
+    ("jade_third_blast_monster_var", "jade_third_blast_monster", _format_count),
+    ("jade_total_damage_monster_var", "jade_total_damage_monster", _format_count),
+)
+
+
+def format_delta(delta) -> str:
+    """
+    Форматирует изменение результата со знаком.
+
+    Args:
+        delta: Разность нового и прошлого значения
+
+    Returns:
+        Строка вида "+12.50" (для целых значений - "+12")
+    """
+    if isinstance(delta, int):
+        return f"{delta:+d}"
+    return f"{delta:+.2f}"
+
+
+def diff_results(previous: Optional[Dict[str, Any]],
+                 results: Dict[str, Any],
+                 shown_texts: Dict[str, str]) -> Dict[str, tuple]:
+    """
+    Находит поля панели результатов, отображение которых изменилось.
+
+    Новый текст поля сравнивается с уже показанным, поэтому прошлые значения
+    повторно не форматируются.
+
+    Args:
+        previous: Прошлые результаты или None, если расчета еще не было
+        results: Новые результаты
+        shown_texts: Показанный текст полей {переменная: текст}
+
+    Returns:
+        Словарь {переменная: (новый текст, изменение или None)}; изменения
+        нет, если прошлых результатов нет
+    """
+    changes = {}
+    for var_name, key, formatter in RESULT_FIELDS:
+        text = formatter(results[key])
+        if previous is None:
+            changes[var_name] = (text, None)
+        elif text != shown_texts.get(var_name):
+            changes[var_name] = (text, results[key] - previous[key])
+    return changes
+
+
 class MainTab(ttk.Frame):
     """Вкладка основных настроек."""
 
@@ -35,16 +132,24 @@ class MainTab(ttk.Frame):
         self.jade_configs = jade_configs
         self.theme = theme
         self.calculate_callback = None
+        self.live_callback = None
 
         # Импортируем нужные модули
         from models.jade import calculate_jade_bonuses
 
+        # Автоматический пересчет: серия изменений ввода объединяется в один расчет
+        self.live_debouncer = Debouncer(self, LIVE_RECALC_DELAY_MS, self._on_live_recalc)
+
         # Создаем переменные для элементов управления
         self._init_variables()
 
         # Создаем виджеты
         self._create_widgets()
 
+        # Любое изменение ввода планирует автоматический пересчет
+        for var in self.input_vars():
+            var.trace_add("write", self._on_input_changed)
+
     def _init_variables(self):
         """Инициализирует переменные для элементов управления."""
         # Сознание
@@ -71,6 +176,9 @@ class MainTab(ttk.Frame):
         self.tessa_f_var = tk.BooleanVar(value=False)
         self.consciousness_match_var = tk.BooleanVar(value=False)  # Новый параметр: совпадение уровня сознания
 
+        # Автоматический пересчет при изменении ввода (выключен по умолчанию)
+        self.live_var = tk.BooleanVar(value=False)
+
         # Результаты расчетов базовых статов
         self.base_attack_result_var = tk.StringVar(value="0.00")
         self.base_ice_blast_result_var = tk.StringVar(value="0.00 (0%)")
@@ -108,6 +216,12 @@ class MainTab(ttk.Frame):
         self.jade_third_blast_monster_var = tk.StringVar(value="0")
         self.jade_total_damage_monster_var = tk.StringVar(value="0")
 
+        # Последние отображенные результаты и метки изменений значений
+        self._shown_results: Optional[Dict[str, Any]] = None
+        self._shown_texts: Dict[str, str] = {}
+        self._delta_labels: Dict[str, ttk.Label] = {}
+        self._shown_deltas = set()
+
     def set_calculate_callback(self, callback: Callable):
         """
         Устанавливает функцию обратного вызова для расчета урона.
@@ -117,6 +231,29 @@ class MainTab(ttk.Frame):
         """
         self.calculate_callback = callback
 
+    def set_live_callback(self, callback: Callable):
+        """
+        Устанавливает функцию обратного вызова для автоматического пересчета.
+
+        Args:
+            callback: Функция, которая вызывается после паузы во вводе, если автоматический пересчет включен
+        """
+        self.live_callback = callback
+
+    def input_vars(self) -> List[tk.Variable]:
+        """
+        Получить переменные всех полей ввода вкладки (без нефритов).
+
+        Returns:
+            Список Tk-переменных
+        """
+        return [
+            self.consciousness_var, self.hero_level_var,
+            self.untouchable_talent_var, self.power_var, self.ice_root_var, self.ice_flash_var,
+            self.aroma_aura_var, self.frost_bloom_var, self.frost_seal_var, self.tundra_power_var,
+            self.frostbound_lotus_var, self.tessa_f_var, self.consciousness_match_var,
+        ]
+
     def _create_widgets(self):
         """Создает виджеты вкладки."""
         # Создаем основную рамку
@@ -224,21 +361,10 @@ class MainTab(ttk.Frame):
         self.level_bonus_var = tk.StringVar(value="0.00 (0%)")
 
         # Обновляем бонус при изменении уровня героя
-        def update_level_bonus(*args):
-            try:
-                level = int(self.hero_level_var.get())
-                bonus = 0.0
-                for lvl, val in sorted(HERO_LEVEL_ATTACK_BONUS.items()):
-                    if level >= lvl:
-                        bonus += val
-                self.level_bonus_var.set(f"{bonus:.2f} ({bonus * 100:.0f}%)")
-            except ValueError:
-                self.level_bonus_var.set("0.00 (0%)")
-
-        self.hero_level_var.trace_add("write", update_level_bonus)
+        self.hero_level_var.trace_add("write", self.update_level_bonus)
 
         # Вызываем функцию сразу для инициализации
-        update_level_bonus()
+        self.update_level_bonus()
 
         # Базовые параметры
         base_frame = ttk.LabelFrame(
@@ -291,13 +417,11 @@ class MainTab(ttk.Frame):
 
         ttk.Label(stats_frame, text="Атака:", style="Result.TLabel").grid(
             row=1, column=0, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(stats_frame, textvariable=self.base_attack_result_var,
-                  style="ResultValue.TLabel").grid(row=1, column=1, pady=2)
+        self._create_result_value(stats_frame, "base_attack_result_var").grid(row=1, column=1, pady=2)
 
         ttk.Label(stats_frame, text="% лед. взрыва:", style="Result.TLabel").grid(
             row=2, column=0, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(stats_frame, textvariable=self.base_ice_blast_result_var,
-                  style="ResultValue.TLabel").grid(row=2, column=1, pady=2)
+        self._create_result_value(stats_frame, "base_ice_blast_result_var").grid(row=2, column=1, pady=2)
 
         # Боевые статы
         ttk.Label(stats_frame, text="Боевые:", style="Result.TLabel").grid(
@@ -305,18 +429,15 @@ class MainTab(ttk.Frame):
 
         ttk.Label(stats_frame, text="Атака:", style="Result.TLabel").grid(
             row=4, column=0, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(stats_frame, textvariable=self.final_attack_result_var,
-                  style="ResultValue.TLabel").grid(row=4, column=1, pady=2)
+        self._create_result_value(stats_frame, "final_attack_result_var").grid(row=4, column=1, pady=2)
 
         ttk.Label(stats_frame, text="% лед. взрыва:", style="Result.TLabel").grid(
             row=5, column=0, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(stats_frame, textvariable=self.final_ice_blast_result_var,
-                  style="ResultValue.TLabel").grid(row=5, column=1, pady=2)
+        self._create_result_value(stats_frame, "final_ice_blast_result_var").grid(row=5, column=1, pady=2)
 
         ttk.Label(stats_frame, text="Физический урон:", style="Result.TLabel").grid(
             row=6, column=0, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(stats_frame, textvariable=self.physical_damage_var,
-                  style="ResultValue.TLabel").grid(row=6, column=1, pady=2)
+        self._create_result_value(stats_frame, "physical_damage_var").grid(row=6, column=1, pady=2)
 
         # # Бонусы от нефритов (добавляем в блок статов)
         # ttk.Label(stats_frame, text="Бонусы от нефритов:", style="Result.TLabel").grid(
@@ -358,11 +479,29 @@ class MainTab(ttk.Frame):
             accent=True,
             width=self.theme.BUTTON_WIDTH
         )
-        calculate_button.pack(pady=self.theme.LARGE_PADDING)
+        calculate_button.pack(pady=(self.theme.LARGE_PADDING, 0))
+
+        # Переключатель автоматического пересчета
+        live_checkbox = ttk.Checkbutton(
+            parent,
+            text="Пересчитывать автоматически",
+            variable=self.live_var,
+            command=self._on_live_toggled
+        )
+        live_checkbox.pack(pady=(self.theme.SMALL_PADDING, self.theme.LARGE_PADDING))
 
         # Фрейм с результатами
         self._create_results_frame(parent)
 
+    def update_level_bonus(self, *args):
+        """Показывает бонус от уровня героя по текущему набору правил модели."""
+        try:
+            level = int(self.hero_level_var.get())
+            bonus = self.model.ruleset.hero_level_bonus(level)
+            self.level_bonus_var.set(f"{bonus:.2f} ({bonus * 100:.0f}%)")
+        except ValueError:
+            self.level_bonus_var.set("0.00 (0%)")
+
     def _create_parameter_checkbox(self, parent, text, variable):
         """
         Создает чекбокс для параметра с улучшенным стилем.
@@ -425,45 +564,37 @@ class MainTab(ttk.Frame):
         # Бонусы по боссам
         ttk.Label(boss_damage_frame, text="Бонус атаки:", style="Result.TLabel").grid(
             row=0, column=0, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(boss_damage_frame, textvariable=self.boss_attack_bonus_var,
-                  style="ResultValue.TLabel").grid(row=0, column=1, pady=2)
+        self._create_result_value(boss_damage_frame, "boss_attack_bonus_var").grid(row=0, column=1, pady=2)
 
         ttk.Label(boss_damage_frame, text="% лед. взрыва:", style="Result.TLabel").grid(
             row=0, column=2, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(boss_damage_frame, textvariable=self.boss_ice_blast_percent_var,
-                  style="ResultValue.TLabel").grid(row=0, column=3, pady=2)
+        self._create_result_value(boss_damage_frame, "boss_ice_blast_percent_var").grid(row=0, column=3, pady=2)
 
         # Урон по боссам
         ttk.Label(boss_damage_frame, text="Урон лед. взрыва:", style="Result.TLabel").grid(
             row=2, column=2, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(boss_damage_frame, textvariable=self.boss_damage_var,
-                  style="ResultValue.TLabel").grid(row=2, column=3, pady=2)
+        self._create_result_value(boss_damage_frame, "boss_damage_var").grid(row=2, column=3, pady=2)
 
         ttk.Label(boss_damage_frame, text="Урон цветочного взрыва:", style="Result.TLabel").grid(
             row=1, column=2, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(boss_damage_frame, textvariable=self.boss_flower_damage_var,
-                  style="ResultValue.TLabel").grid(row=1, column=3, pady=2)
+        self._create_result_value(boss_damage_frame, "boss_flower_damage_var").grid(row=1, column=3, pady=2)
 
         # Нефрит x3 по боссам
         ttk.Label(boss_damage_frame, text="Первый взрыв:", style="Result.TLabel").grid(
             row=1, column=0, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(boss_damage_frame, textvariable=self.jade_first_blast_boss_var,
-                  style="ResultValue.TLabel").grid(row=1, column=1, pady=2)
+        self._create_result_value(boss_damage_frame, "jade_first_blast_boss_var").grid(row=1, column=1, pady=2)
 
         ttk.Label(boss_damage_frame, text="Второй взрыв:", style="Result.TLabel").grid(
             row=2, column=0, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(boss_damage_frame, textvariable=self.jade_second_blast_boss_var,
-                  style="ResultValue.TLabel").grid(row=2, column=1, pady=2)
+        self._create_result_value(boss_damage_frame, "jade_second_blast_boss_var").grid(row=2, column=1, pady=2)
 
         ttk.Label(boss_damage_frame, text="Третий взрыв:", style="Result.TLabel").grid(
             row=3, column=0, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(boss_damage_frame, textvariable=self.jade_third_blast_boss_var,
-                  style="ResultValue.TLabel").grid(row=3, column=1, pady=2)
+        self._create_result_value(boss_damage_frame, "jade_third_blast_boss_var").grid(row=3, column=1, pady=2)
 
         ttk.Label(boss_damage_frame, text="Суммарно x3 взрыв:", style="Result.TLabel").grid(
             row=3, column=2, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(boss_damage_frame, textvariable=self.jade_total_damage_boss_var,
-                  style="ResultValue.TLabel").grid(row=3, column=3, pady=2)
+        self._create_result_value(boss_damage_frame, "jade_total_damage_boss_var").grid(row=3, column=3, pady=2)
 
         # ТРЕТИЙ РЯД - урон по монстрам
 
@@ -485,45 +616,57 @@ class MainTab(ttk.Frame):
         # Бонусы по монстрам
         ttk.Label(monster_damage_frame, text="Бонус атаки:", style="Result.TLabel").grid(
             row=0, column=0, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(monster_damage_frame, textvariable=self.monster_attack_bonus_var,
-                  style="ResultValue.TLabel").grid(row=0, column=1, pady=2)
+        self._create_result_value(monster_damage_frame, "monster_attack_bonus_var").grid(row=0, column=1, pady=2)
 
         ttk.Label(monster_damage_frame, text="% лед. взрыва:", style="Result.TLabel").grid(
             row=0, column=2, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(monster_damage_frame, textvariable=self.monster_ice_blast_percent_var,
-                  style="ResultValue.TLabel").grid(row=0, column=3, pady=2)
+        self._create_result_value(monster_damage_frame, "monster_ice_blast_percent_var").grid(row=0, column=3, pady=2)
 
         # Урон по монстрам
         ttk.Label(monster_damage_frame, text="Урон лед. взрыва:", style="Result.TLabel").grid(
             row=2, column=2, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(monster_damage_frame, textvariable=self.monster_damage_var,
-                  style="ResultValue.TLabel").grid(row=2, column=3, pady=2)
+        self._create_result_value(monster_damage_frame, "monster_damage_var").grid(row=2, column=3, pady=2)
 
         ttk.Label(monster_damage_frame, text="Урон цветочного взрыва:", style="Result.TLabel").grid(
             row=1, column=2, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(monster_damage_frame, textvariable=self.monster_flower_damage_var,
-                  style="ResultValue.TLabel").grid(row=1, column=3, pady=2)
+        self._create_result_value(monster_damage_frame, "monster_flower_damage_var").grid(row=1, column=3, pady=2)
 
         # Нефрит x3 по монстрам
         ttk.Label(monster_damage_frame, text="Первый взрыв:", style="Result.TLabel").grid(
             row=1, column=0, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(monster_damage_frame, textvariable=self.jade_first_blast_monster_var,
-                  style="ResultValue.TLabel").grid(row=1, column=1, pady=2)
+        self._create_result_value(monster_damage_frame, "jade_first_blast_monster_var").grid(row=1, column=1, pady=2)
 
         ttk.Label(monster_damage_frame, text="Второй взрыв:", style="Result.TLabel").grid(
             row=2, column=0, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(monster_damage_frame, textvariable=self.jade_second_blast_monster_var,
-                  style="ResultValue.TLabel").grid(row=2, column=1, pady=2)
+        self._create_result_value(monster_damage_frame, "jade_second_blast_monster_var").grid(row=2, column=1, pady=2)
 
         ttk.Label(monster_damage_frame, text="Третий взрыв:", style="Result.TLabel").grid(
             row=3, column=0, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(monster_damage_frame, textvariable=self.jade_third_blast_monster_var,
-                  style="ResultValue.TLabel").grid(row=3, column=1, pady=2)
+        self._create_result_value(monster_damage_frame, "jade_third_blast_monster_var").grid(row=3, column=1, pady=2)
 
         ttk.Label(monster_damage_frame, text="Суммарно x3 взрыв:", style="Result.TLabel").grid(
             row=3, column=2, sticky=tk.W, pady=2, padx=(10, 0))
-        ttk.Label(monster_damage_frame, textvariable=self.jade_total_damage_monster_var,
-                  style="ResultValue.TLabel").grid(row=3, column=3, pady=2)
+        self._create_result_value(monster_damage_frame, "jade_total_damage_monster_var").grid(row=3, column=3, pady=2)
+
+    def _create_result_value(self, parent, var_name: str) -> ttk.Frame:
+        """
+        Создает значение результата с меткой изменения с прошлого расчета.
+
+        Args:
+            parent: Родительский виджет
+            var_name: Имя переменной вкладки с текстом значения
+
+        Returns:
+            Фрейм со значением (размещается вызывающим кодом)
+        """
+        frame = ttk.Frame(parent, style="Result.TFrame")
+        ttk.Label(frame, textvariable=getattr(self, var_name),
+                  style="ResultValue.TLabel").pack(side=tk.LEFT)
+
+        delta_label = ttk.Label(frame, style="ResultDeltaUp.TLabel")
+        delta_label.pack(side=tk.LEFT, padx=(3, 0))
+        self._delta_labels[var_name] = delta_label
+        return frame
 
     def _create_right_panel(self, parent):
         """
@@ -533,67 +676,61 @@ class MainTab(ttk.Frame):
             parent: Родительский виджет
         """
         # Создаем панель настройки нефритов
-        jade_panel = JadePanel(parent, self.jade_configs, self.theme)
-        jade_panel.pack(fill=tk.BOTH, expand=True)
+        self.jade_panel = JadePanel(parent, self.jade_configs, self.theme)
+        self.jade_panel.pack(fill=tk.BOTH, expand=True)
+
+        # Изменения нефритов тоже планируют автоматический пересчет
+        self.jade_panel.set_update_callback(self._on_input_changed)
 
     def _on_calculate(self):
         """Обработчик события нажатия на кнопку расчета урона."""
+        # Ручной расчет заменяет запланированный автоматический
+        self.live_debouncer.cancel()
         if self.calculate_callback:
             self.calculate_callback()
 
+    def _on_input_changed(self, *args):
+        """Планирует автоматический пересчет, если он включен."""
+        if self.live_var.get():
+            self.live_debouncer.trigger()
+
+    def _on_live_toggled(self):
+        """При включении автоматического пересчета сразу обновляет результаты."""
+        if self.live_var.get():
+            self.live_debouncer.trigger()
+        else:
+            self.live_debouncer.cancel()
+
+    def _on_live_recalc(self):
+        """Выполняет автоматический пересчет после паузы во вводе."""
+        if self.live_var.get() and self.live_callback:
+            self.live_callback()
+
     def update_results(self, results: Dict[str, Any]):
         """
         Обновляет результаты расчетов.
 
+        Меняются только поля, текст которых отличается от показанного; рядом с
+        ними выводится изменение с прошлого расчета, а метки изменений
+        неизменившихся полей скрываются.
+
         Args:
             results: Словарь с результатами расчетов
         """
-        # Обновляем базовые результаты
-        self.base_attack_result_var.set(f"{results['base_attack']:.2f}")
-
-        # Отображение без базовых 100%
-        base_ice_blast_bonus = results['base_ice_blast_percent'] - 1.0
-        self.base_ice_blast_result_var.set(
-            f"{base_ice_blast_bonus:.2f} ({base_ice_blast_bonus * 100:.0f}%)")
-
-        # Обновляем боевые результаты
-        self.final_attack_result_var.set(f"{results['final_attack']:.2f}")
-
-        # Боевой % ледяного взрыва остается с базой в 100%
-        self.final_ice_blast_result_var.set(
-            f"{results['final_ice_blast_percent']:.2f} ({results['final_ice_blast_percent'] * 100:.0f}%)")
-
-        # Обновляем физический урон
-        self.physical_damage_var.set(f"{results['physical_damage']:.2f}")
-
-        # Обновляем бонусы по боссам
-        self.boss_attack_bonus_var.set(
-            f"{results['boss_attack_bonus']:.2f} ({results['boss_attack_bonus'] * 100:.0f}%)")
-        self.boss_ice_blast_percent_var.set(
-            f"{results['boss_ice_blast_percent']:.2f} ({results['boss_ice_blast_percent'] * 100:.0f}%)")
-
-        # Обновляем урон по боссам
-        self.boss_damage_var.set(f"{results['boss_damage']:.2f}")
-        self.boss_flower_damage_var.set(f"{results['boss_flower_damage']:.2f}")
-
-        # Обновляем результаты по нефриту (x3 взрыв) для боссов
-        self.jade_first_blast_boss_var.set(f"{results['jade_first_blast_boss']}")
-        self.jade_second_blast_boss_var.set(f"{results['jade_second_blast_boss']}")
-        self.jade_third_blast_boss_var.set(f"{results['jade_third_blast_boss']}")
-        self.jade_total_damage_boss_var.set(f"{results['jade_total_damage_boss']}")
-
-        # Обновляем бонусы по монстрам
-        self.monster_attack_bonus_var.set(
-            f"{results['monster_attack_bonus']:.2f} ({results['monster_attack_bonus'] * 100:.0f}%)")
-        self.monster_ice_blast_percent_var.set(
-            f"{results['monster_ice_blast_percent']:.2f} ({results['monster_ice_blast_percent'] * 100:.0f}%)")
-
-        # Обновляем урон по монстрам
-        self.monster_damage_var.set(f"{results['monster_damage']:.2f}")
-        self.monster_flower_damage_var.set(f"{results['monster_flower_damage']:.2f}")
-
-        # Обновляем результаты по нефриту (x3 взрыв) для монстров
-        self.jade_first_blast_monster_var.set(f"{results['jade_first_blast_monster']}")
-        self.jade_second_blast_monster_var.set(f"{results['jade_second_blast_monster']}")
-        self.jade_third_blast_monster_var.set(f"{results['jade_third_blast_monster']}")
-        self.jade_total_damage_monster_var.set(f"{results['jade_total_damage_monster']}")
\ No newline at end of file
+        changes = diff_results(self._shown_results, results, self._shown_texts)
+        self._shown_results = results
+
+        # Сначала сравниваем все поля, затем одним проходом обновляем только измененные
+        deltas = set()
+        for var_name, (text, delta) in changes.items():
+            getattr(self, var_name).set(text)
+            self._shown_texts[var_name] = text
+            if delta is not None:
+                deltas.add(var_name)
+                self._delta_labels[var_name].configure(
+                    text=format_delta(delta),
+                    style="ResultDeltaUp.TLabel" if delta > 0 else "ResultDeltaDown.TLabel")
+
+        for var_name in self._shown_deltas - deltas:
+            self._delta_labels[var_name].configure(text="")
+        self._shown_deltas = deltas
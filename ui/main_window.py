@@ -8,13 +8,20 @@
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
+from tkinter import filedialog
 import os
 
-from config import WINDOW_TITLE, WINDOW_SIZE, DEFAULT_HERO_LEVEL
+from config import WINDOW_TITLE, WINDOW_SIZE, DEFAULT_HERO_LEVEL, RULESET_POLL_INTERVAL_MS
 from models.jade import JadeConfig
+from models.build import Build
 from models.damage_calculator import DamageCalculatorModel
+from models.cache import CachedCalculator
+from models.optimizer import LoadoutConstraints, optimize_loadout
+from models.ruleset import RULESETS_DIR, RulesetFile
 from ui.main_tab import MainTab
 from ui.details_tab import DetailsTab
+from ui.gains_tab import GainsTab
+from ui.jobs import JobRunner
 from ui.theme import apply_theme
 from utils.focus_handlers import add_focus_handler
 
@@ -22,8 +29,15 @@ from utils.focus_handlers import add_focus_handler
 class DamageCalculatorWindow(tk.Tk):
     """Главное окно приложения."""
 
-    def __init__(self):
-        """Инициализация главного окна приложения."""
+    def __init__(self, build_widgets: bool = True):
+        """
+        Инициализация главного окна приложения.
+
+        Args:
+            build_widgets: Создать виджеты сразу. Если False, их создает
+                вызывающий код по шагам build_steps(), например показывая
+                между шагами экран загрузки.
+        """
         super().__init__()
 
         # Настройка окна
@@ -44,9 +58,21 @@ class DamageCalculatorWindow(tk.Tk):
 
         # Создаем модель для расчетов
         self.model = DamageCalculatorModel(self.jade_configs)
+        # Повторные расчеты тех же входных данных берутся из кеша
+        self.calculator = CachedCalculator(self.model)
+
+        # Файл загруженного набора правил; пока он открыт, изменения подхватываются на лету
+        self.ruleset_file = None
+        self._ruleset_after_id = None
+
+        # Фоновые задачи: прогресс и завершение отображаются в строке состояния
+        self.jobs = JobRunner(self, on_progress=self._on_job_progress, on_finish=self._on_job_finish)
+
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # Создаем интерфейс
-        self._create_widgets()
+        if build_widgets:
+            self._create_widgets()
 
     def _set_icon(self):
         """Устанавливает иконку приложения."""
@@ -60,42 +86,67 @@ class DamageCalculatorWindow(tk.Tk):
 
     def _create_widgets(self):
         """Создает основные виджеты интерфейса."""
+        for _ in self.build_steps():
+            pass
+
+    def build_steps(self):
+        """
+        Создает виджеты интерфейса по шагам.
+
+        Yields:
+            Тройки (выполнено шагов, всего шагов, описание следующего шага)
+        """
+        steps = [
+            ("Создание окна", self._create_container),
+            ("Создание основной вкладки", self._create_main_tab),
+            ("Создание вкладки деталей", self._create_details_tab),
+            ("Создание вкладки прироста", self._create_gains_tab),
+            ("Создание строки состояния", self._create_statusbar),
+        ]
+        for done, (text, step) in enumerate(steps):
+            yield done, len(steps), text
+            step()
+        yield len(steps), len(steps), "Готово"
+
+    def _create_container(self):
+        """Создает главный контейнер и notebook."""
         # Создаем главный контейнер с отступами
-        main_container = ttk.Frame(self, padding=self.theme.PADDING)
-        main_container.pack(fill=tk.BOTH, expand=True)
+        self.main_container = ttk.Frame(self, padding=self.theme.PADDING)
+        self.main_container.pack(fill=tk.BOTH, expand=True)
 
         # Добавляем обработчик клика для снятия фокуса
-        add_focus_handler(main_container)
+        add_focus_handler(self.main_container)
 
         # Создаем notebook (вкладки)
-        self.notebook = ttk.Notebook(main_container)
+        self.notebook = ttk.Notebook(self.main_container)
         self.notebook.pack(fill=tk.BOTH, expand=True)
 
         # Добавляем обработчик клика для вкладок
         add_focus_handler(self.notebook)
 
-        # Вкладка основных настроек
+    def _create_main_tab(self):
+        """Создает вкладку основных настроек."""
         self.main_tab = MainTab(self.notebook, self.model, self.jade_configs, self.theme)
         self.notebook.add(self.main_tab, text="Основные настройки")
 
-        # Вкладка детали расчетов
-        self.details_tab = DetailsTab(self.notebook, self.theme)
-        self.notebook.add(self.details_tab, text="Детали расчетов")
-
         # Привязываем обработчик расчета
         self.main_tab.set_calculate_callback(self._on_calculate)
+        self.main_tab.set_live_callback(self._on_live_calculate)
+        self.main_tab.jade_panel.set_optimize_callback(self._on_optimize)
 
-        # Добавляем строку состояния
-        self._create_statusbar(main_container)
+    def _create_details_tab(self):
+        """Создает вкладку деталей расчетов."""
+        self.details_tab = DetailsTab(self.notebook, self.theme)
+        self.notebook.add(self.details_tab, text="Детали расчетов")
 
-    def _create_statusbar(self, parent):
-        """
-        Создает строку состояния в нижней части окна.
+    def _create_gains_tab(self):
+        """Создает вкладку прироста от улучшений."""
+        self.gains_tab = GainsTab(self.notebook, self.theme)
+        self.notebook.add(self.gains_tab, text="Что улучшать")
 
-        Args:
-            parent: Родительский виджет
-        """
-        statusbar = ttk.Frame(parent, relief=tk.SUNKEN)
+    def _create_statusbar(self):
+        """Создает строку состояния в нижней части окна."""
+        statusbar = ttk.Frame(self.main_container, relief=tk.SUNKEN)
         statusbar.pack(side=tk.BOTTOM, fill=tk.X)
 
         # Создаем специальный стиль для статусбара, чтобы обеспечить читаемость текста
@@ -114,6 +165,24 @@ class DamageCalculatorWindow(tk.Tk):
         )
         status_label.pack(side=tk.LEFT, fill=tk.X)
 
+        # Прогресс и отмена фоновой задачи (показываются только во время ее выполнения)
+        self.job_cancel_button = ttk.Button(statusbar, text="Отмена", command=self.jobs.cancel_all)
+        self.job_progress = ttk.Progressbar(statusbar, mode="determinate", length=200)
+
+        # Набор правил расчета
+        ruleset_button = ttk.Button(statusbar, text="Правила...", command=self._on_choose_ruleset)
+        ruleset_button.pack(side=tk.RIGHT, padx=self.theme.SMALL_PADDING)
+
+        self.ruleset_var = tk.StringVar(value=self._ruleset_text())
+        ruleset_label = ttk.Label(
+            statusbar,
+            textvariable=self.ruleset_var,
+            anchor=tk.E,
+            style="Status.TLabel",
+            padding=(self.theme.SMALL_PADDING, 2)
+        )
+        ruleset_label.pack(side=tk.RIGHT)
+
         # Версия приложения
         version_label = ttk.Label(
             statusbar,
@@ -127,53 +196,254 @@ class DamageCalculatorWindow(tk.Tk):
     def _on_calculate(self):
         """Обработчик события расчета урона."""
         try:
-            # Устанавливаем статус "Расчет..."
-            self.status_var.set("Идет расчет...")
-            self.update_idletasks()
-
-            # Получаем значение сознания
-            consciousness = float(self.main_tab.consciousness_var.get())
-            self.model.set_consciousness(consciousness)
-
-            # Получаем уровень героя
-            try:
-                hero_level = int(self.main_tab.hero_level_var.get())
-                self.model.set_hero_level(hero_level)
-            except ValueError:
-                # Если уровень героя не указан или указан неправильно, используем значение по умолчанию
-                self.model.set_hero_level(DEFAULT_HERO_LEVEL)
-                self.main_tab.hero_level_var.set(str(DEFAULT_HERO_LEVEL))
-
-            # Получаем базовые параметры
-            self.model.set_base_params(
-                self.main_tab.untouchable_talent_var.get(),
-                self.main_tab.power_var.get(),
-                self.main_tab.ice_root_var.get(),
-                self.main_tab.ice_flash_var.get()
-            )
-
-            # Получаем боевые параметры (включая совпадение уровня сознания)
-            self.model.set_combat_params(
-                self.main_tab.aroma_aura_var.get(),
-                self.main_tab.frost_bloom_var.get(),
-                self.main_tab.frost_seal_var.get(),
-                self.main_tab.tundra_power_var.get(),
-                self.main_tab.frostbound_lotus_var.get(),
-                self.main_tab.tessa_f_var.get(),
-                self.main_tab.consciousness_match_var.get(),  # Учитываем совпадение уровня сознания
-                self.main_tab.jade_active_var.get()  # Этот параметр игнорируется в модели
-            )
+            self._apply_inputs()
 
             # Выполняем расчет
-            results = self.model.calculate()
+            results = self.calculator.calculate()
 
             # Обновляем результаты
-            self.main_tab.update_results(results)
-            self.details_tab.update_calculation_text(results["calculation_steps"])
+            self._show_results(results)
 
             # Обновляем статус
             self.status_var.set(f"Расчет выполнен.")
 
         except ValueError as e:
             messagebox.showerror("Ошибка", f"Пожалуйста, введите корректные числовые значения: {str(e)}")
-            self.status_var.set("Ошибка при расчете. Проверьте введенные данные.")
\ No newline at end of file
+            self.status_var.set("Ошибка при расчете. Проверьте введенные данные.")
+
+    def _on_live_calculate(self):
+        """
+        Автоматический пересчет после паузы во вводе.
+
+        В отличие от ручного расчета не показывает диалогов и не исправляет
+        поля: пока ввод некорректен (например, поле еще не дописано),
+        результаты просто не обновляются. Модель пересчитывает только узлы,
+        зависящие от изменившихся полей.
+        """
+        try:
+            self._apply_inputs(live=True)
+        except ValueError:
+            self.status_var.set("Автоматический пересчет: ожидается корректный ввод")
+            return
+
+        self._show_results(self.calculator.calculate())
+        self.status_var.set("Результаты обновлены автоматически.")
+
+    def _on_optimize(self):
+        """Запускает подбор статов нефритов в фоновой задаче."""
+        if self.jobs.busy:
+            self.status_var.set("Дождитесь завершения текущей задачи или отмените ее.")
+            return
+
+        try:
+            self._apply_inputs()
+        except ValueError as e:
+            messagebox.showerror("Ошибка", f"Пожалуйста, введите корректные числовые значения: {str(e)}")
+            return
+
+        # Задача работает с копией сборки: интерфейс может менять модель, пока идет подбор
+        build = Build.from_model(self.model)
+        snapshot = DamageCalculatorModel.from_build(build)
+        snapshot.set_ruleset(self.model.ruleset)
+        constraints = LoadoutConstraints.from_jades(self.jade_configs)
+
+        def run(job, model, constraints):
+            return optimize_loadout(model, constraints, "boss", progress=job.progress)
+
+        self.start_job("Подбор статов нефритов", run, snapshot, constraints,
+                       on_done=lambda result: self._on_optimize_done(result, build))
+
+    def _on_optimize_done(self, result, build):
+        """
+        Переносит найденные статы в панель нефритов и пересчитывает урон.
+
+        Если во время подбора сборка изменилась (например, пользователь
+        поправил статы нефритов), найденные статы переносятся только после
+        подтверждения: иначе правки были бы молча перезаписаны.
+
+        Args:
+            result: Результат подбора (models.optimizer.LoadoutResult)
+            build: Сборка, для которой выполнялся подбор
+        """
+        if Build.from_model(self.model).to_dict() != build.to_dict():
+            if not messagebox.askyesno(
+                    "Подбор статов нефритов",
+                    "Пока выполнялся подбор, сборка изменилась, а найденные статы рассчитаны "
+                    "для прежней сборки.\n\nЗаменить текущие статы нефритов найденными?"):
+                return
+
+        result.apply_to(self.jade_configs)
+        self.main_tab.jade_panel.refresh()
+        self._on_calculate()
+
+    def _on_job_progress(self, job, done, total, text):
+        """Показывает прогресс фоновой задачи в строке состояния."""
+        self.job_progress.configure(maximum=max(total, 1), value=done)
+        self.status_var.set(text or f"{job.name}: {done} из {total}")
+
+    def _on_job_finish(self, job, state):
+        """Отображает итог фоновой задачи и скрывает прогресс, если задач больше нет."""
+        if state == "done":
+            self.status_var.set(f"{job.name}: выполнено.")
+        elif state == "cancelled":
+            self.status_var.set(f"{job.name}: отменено.")
+        else:
+            self.status_var.set(f"{job.name}: ошибка.")
+        self._update_job_widgets()
+
+    def _update_job_widgets(self):
+        """Показывает или скрывает прогресс и кнопку отмены."""
+        if self.jobs.busy:
+            self.job_cancel_button.pack(side=tk.RIGHT, padx=self.theme.SMALL_PADDING)
+            self.job_progress.pack(side=tk.RIGHT, padx=self.theme.SMALL_PADDING)
+        else:
+            self.job_cancel_button.pack_forget()
+            self.job_progress.pack_forget()
+
+    def start_job(self, name, function, *args, on_done=None):
+        """
+        Запускает фоновую задачу с отображением прогресса и кнопкой отмены.
+
+        Args:
+            name: Название задачи
+            function: Функция function(job, *args), выполняемая в фоновом потоке
+            *args: Аргументы функции
+            on_done: Обработчик результата (вызывается в главном потоке)
+
+        Returns:
+            Задача (ui.jobs.Job)
+        """
+        job = self.jobs.submit(name, function, *args, on_done=on_done, on_error=self._on_job_error)
+        self.job_progress.configure(value=0)
+        self.status_var.set(f"{name}...")
+        self._update_job_widgets()
+        return job
+
+    def _on_job_error(self, error):
+        """Сообщает об ошибке фоновой задачи."""
+        messagebox.showerror("Ошибка", f"Не удалось выполнить задачу: {error}")
+
+    def _ruleset_text(self):
+        """Описание текущего набора правил для строки состояния."""
+        ruleset = self.model.ruleset
+        return f"Правила: {ruleset.name} ({ruleset.version})"
+
+    def _on_choose_ruleset(self):
+        """Загружает набор правил из выбранного пользователем файла."""
+        path = filedialog.askopenfilename(
+            title="Набор правил",
+            initialdir=RULESETS_DIR,
+            filetypes=[("Наборы правил", "*.json"), ("Все файлы", "*.*")]
+        )
+        if not path:
+            return
+
+        try:
+            ruleset_file = RulesetFile(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Ошибка", f"Не удалось загрузить набор правил: {e}")
+            return
+
+        self.ruleset_file = ruleset_file
+        self._apply_ruleset(ruleset_file.ruleset)
+
+        # Следим за изменениями файла
+        if self._ruleset_after_id is None:
+            self._ruleset_after_id = self.after(RULESET_POLL_INTERVAL_MS, self._poll_ruleset)
+
+    def _poll_ruleset(self):
+        """Перечитывает файл набора правил, если он изменился."""
+        self._ruleset_after_id = None
+        try:
+            ruleset = self.ruleset_file.reload_if_changed()
+        except (OSError, ValueError) as e:
+            # Продолжаем считать по прежним правилам, пока файл не исправят
+            self.status_var.set(f"Набор правил не обновлен: {e}")
+        else:
+            if ruleset is not None:
+                self._apply_ruleset(ruleset)
+        self._ruleset_after_id = self.after(RULESET_POLL_INTERVAL_MS, self._poll_ruleset)
+
+    def _apply_ruleset(self, ruleset):
+        """
+        Подключает набор правил к модели и пересчитывает показанные результаты.
+
+        Интерфейс не пересоздается: модель пересчитывает узлы по новым
+        правилам, а кеш результатов различает наборы по их ключу.
+
+        Args:
+            ruleset: Набор правил (models.ruleset.Ruleset)
+        """
+        self.model.set_ruleset(ruleset)
+        self.ruleset_var.set(self._ruleset_text())
+        self.main_tab.update_level_bonus()
+
+        try:
+            self._apply_inputs(live=True)
+        except ValueError:
+            # Некорректный ввод: результаты обновятся при следующем расчете
+            pass
+        else:
+            self._show_results(self.calculator.calculate())
+        self.status_var.set(f"Загружен набор правил «{ruleset.name}», версия {ruleset.version}.")
+
+    def _on_close(self):
+        """Останавливает фоновые задачи и закрывает окно."""
+        self.jobs.shutdown()
+        if self._ruleset_after_id is not None:
+            self.after_cancel(self._ruleset_after_id)
+        self.destroy()
+
+    def _apply_inputs(self, live=False):
+        """
+        Переносит значения полей вкладки в модель.
+
+        Args:
+            live: Автоматический пересчет - некорректный уровень героя не
+                  заменяется значением по умолчанию, а вызывает ValueError
+        """
+        # Получаем значение сознания
+        consciousness = float(self.main_tab.consciousness_var.get())
+        self.model.set_consciousness(consciousness)
+
+        # Получаем уровень героя
+        try:
+            hero_level = int(self.main_tab.hero_level_var.get())
+            self.model.set_hero_level(hero_level)
+        except ValueError:
+            if live:
+                raise
+            # Если уровень героя не указан или указан неправильно, используем значение по умолчанию
+            self.model.set_hero_level(DEFAULT_HERO_LEVEL)
+            self.main_tab.hero_level_var.set(str(DEFAULT_HERO_LEVEL))
+
+        # Получаем базовые параметры
+        self.model.set_base_params(
+            self.main_tab.untouchable_talent_var.get(),
+            self.main_tab.power_var.get(),
+            self.main_tab.ice_root_var.get(),
+            self.main_tab.ice_flash_var.get()
+        )
+
+        # Получаем боевые параметры (включая совпадение уровня сознания)
+        self.model.set_combat_params(
+            self.main_tab.aroma_aura_var.get(),
+            self.main_tab.frost_bloom_var.get(),
+            self.main_tab.frost_seal_var.get(),
+            self.main_tab.tundra_power_var.get(),
+            self.main_tab.frostbound_lotus_var.get(),
+            self.main_tab.tessa_f_var.get(),
+            self.main_tab.consciousness_match_var.get(),  # Учитываем совпадение уровня сознания
+            self.main_tab.jade_active_var.get()  # Этот параметр игнорируется в модели
+        )
+
+    def _show_results(self, results):
+        """
+        Показывает результаты расчета на вкладках.
+
+        Args:
+            results: Словарь с результатами расчетов
+        """
+        self.main_tab.update_results(results)
+        self.details_tab.update_calculation_text(results["calculation_steps"])
+        self.gains_tab.update_gains(self.calculator.marginal_gains)
\ No newline at end of file
@@ -236,6 +236,20 @@ class ModernTheme:
                         foreground=self.PRIMARY_COLOR,
                         font=("Segoe UI", self.LARGE_FONT_SIZE, "bold"))
 
+        # Изменения результатов с прошлого расчета
+        style.configure("Result.TFrame",
+                        background=self.RESULT_BG_COLOR)
+
+        style.configure("ResultDeltaUp.TLabel",
+                        background=self.RESULT_BG_COLOR,
+                        foreground=self.SECONDARY_COLOR,
+                        font=("Segoe UI", self.SMALL_FONT_SIZE, "bold"))
+
+        style.configure("ResultDeltaDown.TLabel",
+                        background=self.RESULT_BG_COLOR,
+                        foreground=self.ACCENT_COLOR,
+                        font=("Segoe UI", self.SMALL_FONT_SIZE, "bold"))
+
         # Информационные метки
         style.configure("Info.TLabel",
                         background=self.BG_COLOR,
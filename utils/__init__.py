@@ -4,5 +4,6 @@
 
 from utils.helpers import create_tooltip, validate_float_input
 from utils.focus_handlers import add_focus_handler
+from utils.debounce import Debouncer
 
-__all__ = ['create_tooltip', 'validate_float_input', 'add_focus_handler']
\ No newline at end of file
+__all__ = ['create_tooltip', 'validate_float_input', 'add_focus_handler', 'Debouncer']
\ No newline at end of file
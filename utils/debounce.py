@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Отложенный вызов функций через планировщик Tk.
+"""
+
+from typing import Callable, Optional
+
+
+class Debouncer:
+    """
+    Объединяет серию вызовов в один.
+
+    Каждый вызов trigger() переносит срабатывание на delay_ms миллисекунд
+    вперед, поэтому функция выполняется один раз - после того, как вызовы
+    прекратились.
+    """
+
+    def __init__(self, widget, delay_ms: int, callback: Callable[[], None]):
+        """
+        Инициализация отложенного вызова.
+
+        Args:
+            widget: Виджет, через планировщик которого (after) выполняется вызов
+            delay_ms: Задержка в миллисекундах
+            callback: Функция без аргументов
+        """
+        self.widget = widget
+        self.delay_ms = delay_ms
+        self.callback = callback
+        self._after_id: Optional[str] = None
+
+    def trigger(self, *args) -> None:
+        """Запланировать вызов, отменив ранее запланированный. Аргументы игнорируются."""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+        self._after_id = self.widget.after(self.delay_ms, self._fire)
+
+    def cancel(self) -> None:
+        """Отменить запланированный вызов."""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def flush(self) -> None:
+        """Выполнить запланированный вызов немедленно."""
+        if self._after_id is not None:
+            self.cancel()
+            self.callback()
+
+    @property
+    def pending(self) -> bool:
+        """Запланирован ли вызов."""
+        return self._after_id is not None
+
+    def _fire(self) -> None:
+        self._after_id = None
+        self.callback()